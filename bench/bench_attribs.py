@@ -0,0 +1,99 @@
+# bench_attribs
+#
+# micro-benchmark of the parsing of GKLM "Custom Attributes" strings.
+# The previous parsers of netappfilters.py (createNameValueDict) and
+# krestcmds.py (bracketsToDict) are reproduced below and compared with
+# the single pass parser (parseCustomAttributes) that both now use.
+#
+#   Usage: python bench/bench_attribs.py [-attribs N] [-objects N]
+#
+######################################################################
+import  argparse
+import  os
+import  sys
+import  timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from    krestcmds import parseCustomAttributes
+
+# Attributes that NetApp ONTAP stores with each of its keys
+NETAPP_ATTRIBS = ["x-NETAPP-ClusterName", "x-NETAPP-ClusterUUID", "x-NETAPP-KeyId", "x-NETAPP-KeyTag",
+                  "x-NETAPP-KeyUsage", "x-NETAPP-NodeId", "x-NETAPP-Product", "x-NETAPP-Product-Version",
+                  "x-NETAPP-Vserverid", "x-NETAPP-Vserver-Name"]
+
+def makeCustomAttribStr(t_attribCnt, t_seed):
+    t_itemList = []
+    for t_idx in range(t_attribCnt):
+        t_name  = NETAPP_ATTRIBS[t_idx % len(NETAPP_ATTRIBS)] + ("" if t_idx < len(NETAPP_ATTRIBS) else "-%s" %(t_idx))
+        t_value = "%064x" %(hash((t_seed, t_idx)) & ((1 << 256) - 1))
+        t_itemList.append("[[NAME %s] [[INDEX 0] [TYPE JAVA_STRING] [VALUE %s]]]" %(t_name, t_value))
+
+    return " ".join(t_itemList)
+
+# ---------------- PREVIOUS PARSERS ----------------------------------------------
+
+def legacyGetAttribValue(t_attribKey, t_attribStr):
+    t_header    = "["+t_attribKey+" "
+    t_lenH      = len(t_header)
+    t_startPos  = t_attribStr.find(t_header)
+    if t_startPos > -1:
+        t_endPos    = t_attribStr.find("]", t_startPos+t_lenH)
+        return t_attribStr[t_startPos+t_lenH:t_endPos]
+
+    return ""
+
+def legacyCreateNameValueDict(t_str):
+    t_nvPairDict    = {}
+    t_shrinkingStr  = t_str
+    while True:
+        t_nameVal   = legacyGetAttribValue("NAME", t_shrinkingStr)
+        t_valueVal  = legacyGetAttribValue("VALUE", t_shrinkingStr)
+        if len(t_nameVal) == 0 or len(t_valueVal) == 0:
+            return t_nvPairDict
+
+        t_nvPairDict[t_nameVal] = t_valueVal
+        t_shrinkingStr = t_shrinkingStr[t_shrinkingStr.find("VALUE")+len(t_valueVal)+1:]
+
+def legacyBracketsToDict(t_stringWithBrackets):
+    t_dict      = {}
+    t_nameStr   = t_stringWithBrackets.strip()
+    while "NAME " in t_nameStr:
+        t_begin         = t_nameStr.find("NAME ") + 5
+        t_end           = t_nameStr.find("]", t_begin)
+        t_subStrName    = t_nameStr[t_begin:t_end].strip()
+        t_nameStr       = t_nameStr[t_end:]
+
+        t_begin         = t_nameStr.find("VALUE ") + 5
+        t_end           = t_nameStr.find("]", t_begin)
+        t_dict[t_subStrName] = t_nameStr[t_begin:t_end].strip()
+        t_nameStr       = t_nameStr[t_end:]
+
+    return t_dict
+
+# ---------------- BENCHMARK -----------------------------------------------------
+
+def timeParser(t_parser, t_strList, t_repeat):
+    return min(timeit.repeat(lambda: [t_parser(t_str) for t_str in t_strList], number=1, repeat=t_repeat))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="bench_attribs.py")
+    parser.add_argument("-attribs", nargs="+", type=int, default=[4, 10, 50, 200])
+    parser.add_argument("-objects", type=int, default=2000)
+    parser.add_argument("-repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print("%8s %8s %16s %16s %16s %9s" %("attribs", "objects", "createNameValue", "bracketsToDict", "parseCustomAttr", "speed-up"))
+    for t_attribCnt in args.attribs:
+        t_strList = [makeCustomAttribStr(t_attribCnt, t_obj) for t_obj in range(args.objects)]
+
+        # all three parsers must agree
+        for t_str in t_strList[:10]:
+            assert legacyCreateNameValueDict(t_str) == legacyBracketsToDict(t_str) == parseCustomAttributes(t_str)
+
+        t_nvTime    = timeParser(legacyCreateNameValueDict, t_strList, args.repeat)
+        t_btdTime   = timeParser(legacyBracketsToDict, t_strList, args.repeat)
+        t_newTime   = timeParser(parseCustomAttributes, t_strList, args.repeat)
+
+        print("%8s %8s %14.1fms %14.1fms %14.1fms %8.1fx" %(t_attribCnt, args.objects, t_nvTime * 1000, t_btdTime * 1000, t_newTime * 1000,
+                                                           min(t_nvTime, t_btdTime) / t_newTime))
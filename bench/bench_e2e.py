@@ -0,0 +1,143 @@
+# bench_e2e
+#
+# end-to-end benchmark of k-rest.py against the local mock servers (see
+# mock_servers.py).  For each number of keys, fresh mock servers are
+# started, a full migration (source retrieval, import and destination
+# retrieval) is run and the number of keys per second of each phase is
+# reported, along with the number of requests sent to the servers.
+#
+# The phases are timed from the progress lines that k-rest.py prints,
+# so the per-object output is suppressed (-quiet) and does not affect
+# the measurement.
+#
+#   Usage: python bench/bench_e2e.py [-keys N ...] [-clients N] [-latency SECS] [-srcWorkers N] [-dstWorkers N]
+#
+######################################################################
+import  argparse
+import  json
+import  os
+import  shutil
+import  socket
+import  subprocess
+import  sys
+import  tempfile
+import  time
+
+BENCH_DIR   = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR    = os.path.dirname(BENCH_DIR)
+
+sys.path.insert(0, BENCH_DIR)
+
+from    mock_servers import READY_MSG
+
+# Progress lines of k-rest.py that start (and end) each phase.  A phase ends when the next one starts.
+PHASE_MARKER_LIST = [
+    ("source",      " PROCESSING ---"),
+    ("import",      "*** Importing KEY material"),
+    ("stream",      "*** Streaming KEY"),
+    ("destination", "Retrieving list of objects from destination"),
+    (None,          "--- DST OBJECT RETRIEVAL COMPLETE ---"),
+]
+
+def getFreePort():
+    with socket.socket() as t_sock:
+        t_sock.bind(("127.0.0.1", 0))
+        return t_sock.getsockname()[1]
+
+def startMockServers(t_keyCnt, t_clientCnt, t_latency, t_certDir):
+    # Returns the mock server process and its source and destination ports once it is ready
+    t_srcPort, t_dstPort = getFreePort(), getFreePort()
+    t_mock = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "mock_servers.py"), "-srcPort", str(t_srcPort), "-dstPort", str(t_dstPort),
+                               "-clients", str(t_clientCnt), "-keys", str(t_keyCnt // t_clientCnt), "-secrets", "0",
+                               "-latency", str(t_latency), "-certDir", t_certDir],
+                              stdout=subprocess.PIPE, text=True)
+
+    t_line = t_mock.stdout.readline()
+    if not t_line.startswith(READY_MSG):
+        t_mock.kill()
+        raise RuntimeError("mock servers did not start: %s" %(t_line))
+
+    return t_mock, t_srcPort, t_dstPort
+
+def stopMockServers(t_mock):
+    # Returns the number of requests of each kind received by the mock servers
+    t_mock.terminate()
+    t_out, t_err = t_mock.communicate()
+    t_lineList = t_out.strip().splitlines()
+
+    return json.loads(t_lineList[-1]) if len(t_lineList) > 0 else {}
+
+def runKRest(t_srcPort, t_dstPort, t_argList):
+    # Returns the time at which each phase started, the total time and the output of k-rest.py
+    t_cmd = [sys.executable, "-u", os.path.join(REPO_DIR, "k-rest.py"),
+             "-srcHost", "127.0.0.1", "-srcPort", str(t_srcPort), "-srcUser", "bench", "-srcPass", "bench",
+             "-dstHost", "127.0.0.1", "-dstPort", str(t_dstPort), "-dstUser", "bench", "-dstPass", "bench", "-quiet"] + t_argList
+
+    t_phaseDict = {}
+    t_lineList  = []
+    t_start     = time.perf_counter()
+    t_krest     = subprocess.Popen(t_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, cwd=REPO_DIR)
+
+    for t_line in t_krest.stdout:
+        t_now = time.perf_counter()
+        t_lineList.append(t_line)
+        for t_phase, t_marker in PHASE_MARKER_LIST:
+            if t_marker in t_line and t_marker not in t_phaseDict:
+                t_phaseDict[t_marker] = t_now
+
+    t_krest.wait()
+    t_total = time.perf_counter() - t_start
+    if t_krest.returncode != 0:
+        raise RuntimeError("k-rest.py failed (%s):\n%s" %(t_krest.returncode, "".join(t_lineList[-20:])))
+
+    return t_phaseDict, t_total, t_lineList
+
+def getPhaseTimes(t_phaseDict):
+    # Returns [(phase, seconds)] for each phase that was reached
+    t_markerList    = [(t_phase, t_phaseDict[t_marker]) for t_phase, t_marker in PHASE_MARKER_LIST if t_marker in t_phaseDict]
+    t_timeList      = []
+    for t_idx in range(len(t_markerList) - 1):
+        t_phase, t_start = t_markerList[t_idx]
+        if t_phase is not None:
+            t_timeList.append((t_phase, t_markerList[t_idx + 1][1] - t_start))
+
+    return t_timeList
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="bench_e2e.py")
+    parser.add_argument("-keys", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("-clients", type=int, default=10)
+    parser.add_argument("-latency", type=float, default=0.0, help="seconds added to every mock request")
+    parser.add_argument("-srcWorkers", type=int, default=8)
+    parser.add_argument("-srcClientWorkers", type=int, default=1)
+    parser.add_argument("-dstWorkers", type=int, default=8)
+    parser.add_argument("-engine", default="REQUESTS", choices=["REQUESTS", "ASYNCIO"])
+    parser.add_argument("-stream", action="store_true", help="stream the objects into the destination")
+    parser.add_argument("-verify", action="store_true", help="verify the destination listing instead of exporting it")
+    args = parser.parse_args()
+
+    krestArgList = ["-srcWorkers", str(args.srcWorkers), "-srcClientWorkers", str(args.srcClientWorkers),
+                    "-dstWorkers", str(args.dstWorkers), "-engine", args.engine]
+    if args.stream:
+        krestArgList.append("-stream")
+    if args.verify:
+        krestArgList.append("-verify")
+
+    certDir = tempfile.mkdtemp(prefix="krest-bench-")
+    try:
+        print("%8s %12s %10s %12s" %("keys", "phase", "seconds", "keys/sec"))
+        for keyCnt in args.keys:
+            keyCnt = max(keyCnt // args.clients, 1) * args.clients     # same number of keys per client
+            mock, srcPort, dstPort = startMockServers(keyCnt, args.clients, args.latency, certDir)
+            try:
+                phaseDict, total, lineList = runKRest(srcPort, dstPort, krestArgList)
+            finally:
+                cntDict = stopMockServers(mock)
+
+            for phase, secs in getPhaseTimes(phaseDict) + [("total", total)]:
+                print("%8s %12s %10.2f %12.1f" %(keyCnt, phase, secs, keyCnt / secs if secs > 0 else 0))
+
+            print("%8s %12s %10s" %(keyCnt, "requests", sum(cntDict.values())))
+
+    finally:
+        shutil.rmtree(certDir, ignore_errors=True)
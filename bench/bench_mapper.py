@@ -0,0 +1,298 @@
+# bench_mapper
+#
+# benchmark of the mapping of source (GKLM) objects to destination (CM)
+# objects.  Synthetic GKLM key and secret records (with a few hundred
+# distinct usage masks and, for some keys, NetApp Custom Attributes) are
+# mapped by the previous per-object functions of krestcmds.py (reproduced
+# below as the reference) and by the KRestMapper used by k-rest.py, and
+# the number of records per second of each is reported.  The payloads of
+# both are compared first, so the benchmark also checks that they are
+# identical.
+#
+# The records are generated once (as a pool that is mapped repeatedly),
+# so that only the mapping is measured.
+#
+#   Usage: python bench/bench_mapper.py [-records N] [-pool N] [-group NAME]
+#
+######################################################################
+import  argparse
+import  json
+import  os
+import  random
+import  sys
+import  time
+import  uuid
+
+BENCH_DIR   = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR    = os.path.dirname(BENCH_DIR)
+
+sys.path.insert(0, REPO_DIR)
+
+from    krestcmds import createDictFromEnum, getGroupPermissions, parseCustomAttributes, returnBracketValue
+from    krestenums import *
+from    krestmapper import KRestMapper, mapUsageMask
+
+USAGE_NAME_LIST     = ["SIGN", "VERIFY", "ENCRYPT", "DECRYPT", "WRAP_KEY", "UNWRAP_KEY", "EXPORT", "MAC_GENERATE", "MAC_VERIFY", "DERIVE"]
+SECRET_FRACTION     = 0.1   # fraction of the records that are secrets
+NETAPP_FRACTION     = 0.5   # fraction of the keys with NetApp Custom Attributes
+
+# ---------------- PREVIOUS MAPPER -----------------------------------------------
+
+def legacyCheckForSrcCustomAttributes(t_srcKeyObjDataList):
+# -----------------------------------------------------------------------------
+# Some KMIP clients (i.e. NetApp) will store custom attributes in the KMIP
+# server.  However, each KMIP server stores that information differently.
+# This code checks for the existance of custom attributes in SKLM by looking
+# to see if "Custom Attributes" key is present, and if it contains NetApp-
+# specific elements.
+# -----------------------------------------------------------------------------
+
+    t_srcCustomAttributesIsPresent      = False
+    t_srcNetAppAttributesArePresent     = False
+
+    if GKLMAttributeType.CUSTOM_ATTRIBUTES.value in t_srcKeyObjDataList:
+        if len(t_srcKeyObjDataList[GKLMAttributeType.CUSTOM_ATTRIBUTES.value]) > 0:
+            t_srcCustomAttributesIsPresent    = True
+            if NetAppCustomAttribute.NETAPPHEADER.value in t_srcKeyObjDataList[GKLMAttributeType.CUSTOM_ATTRIBUTES.value]:
+                t_srcNetAppAttributesArePresent = True
+
+    return t_srcCustomAttributesIsPresent, t_srcNetAppAttributesArePresent
+
+def legacyMapKeyUsage(t_srcKeyObjDataListUMStr, t_keyUsageDict):
+# ---------------------------------------------------------------------------------
+# GKLM stores the Key Usage Mask as a string.  CM stores it a the associated KMIP 
+# value.  As such, the GKLM Key Usage Mask string must be replaced with the 
+# appropriate value before storing it in CM.
+# ---------------------------------------------------------------------------------
+
+    t_xKeyObjUMask    = CryptographicUsageMask.NULL.value  # Initialize
+    t_srcUMask        = t_srcKeyObjDataListUMStr
+    t_srcUMask        = t_srcUMask.strip()      # trim leading and trailing spaces from srcUM strin
+    t_srcUMList       = t_srcUMask.split(' ')   # break string into list
+
+    for t_srcUM in t_srcUMList:
+        if t_srcUM in t_keyUsageDict.keys():
+            t_xKeyObjUMask    = t_xKeyObjUMask  | t_keyUsageDict[t_srcUM]
+
+    return t_xKeyObjUMask 
+
+def legacyMapSrcNetAppMeta(t_srcObjData):
+# ---------------------------------------------------------------------------------
+# If NetApp custom attributes are present in the source object, return them in the
+# CipherTrust (KMIP meta) format.  Otherwise, return None.
+# ---------------------------------------------------------------------------------
+    srcCustomAttributesIsPresent, srcNetAppAttributesArePresent = legacyCheckForSrcCustomAttributes(t_srcObjData)
+    if not srcNetAppAttributesArePresent:
+        return None
+
+    custSrcAttribDict = parseCustomAttributes(t_srcObjData[GKLMAttributeType.CUSTOM_ATTRIBUTES.value])
+
+    # Now trim out all non-NetApp keys and update custSrcAttribDict.
+    tmpDict = {}
+    for t_key in custSrcAttribDict.keys():
+        if NetAppCustomAttribute.NETAPPHEADER.value in t_key:
+            tmpDict[t_key] = custSrcAttribDict[t_key]
+    custSrcAttribDict = tmpDict.copy()
+
+    # Finally, place it in the CipherTrust format and copy it over.
+    custAttribList = []
+    for t_key in custSrcAttribDict:
+        tmpDict.clear()
+        tmpDict[NetAppMetaAttribute.TYPE.value] = NetAppMetaAttribute.TYPE_VALUE.value
+        tmpDict[NetAppMetaAttribute.INDEX.value] = 0
+        tmpDict[t_key] = custSrcAttribDict[t_key]
+
+        # add each attribute dictionary to the overall list of attributes
+        custAttribList.append(tmpDict.copy()) 
+
+    return {NetAppMetaAttribute.CUSTOM.value: custAttribList}
+
+def legacyMapSrcKeyObj(t_srcKeyObjData, t_keyUsageDict, t_userID, t_dstGrp=None):
+# ---------------------------------------------------------------------------------
+# Map a source (GKLM) KEY object with the proper dictionary keys to a destination
+# (CM) key object that can be uploaded with importDstDataKeyObject.  The key is
+# owned by t_userID on the destination.
+#
+# If t_dstGrp is provided, the group permissions and the alias are included so
+# that the key is assigned to the group when it is imported (rather than with
+# a PATCH of each key afterwards).
+# ---------------------------------------------------------------------------------
+    xKeyObj = {}
+
+    # The GKLM Alias seems to match the pattern of the CM Name key.  
+    # However, GKLM includes brakcets ("[]") in the string
+    # and they need to be removed before copying the true alias value to CM
+    tmpStr = t_srcKeyObjData[GKLMAttributeType.ALIAS.value]
+    xKeyObj[CMAttributeType.NAME.value]         = tmpStr.strip("[]")
+
+    # Map the string format of key usage to a binary format (used by CM)
+    xKeyObj[CMAttributeType.USAGE_MASK.value]   = legacyMapKeyUsage(t_srcKeyObjData[GKLMAttributeType.CRYPTOGRAPHIC_USAGE_MASK.value], t_keyUsageDict)
+    xKeyObj[CMAttributeType.ALGORITHM.value]    = t_srcKeyObjData[GKLMAttributeType.KEY_ALGORITHM.value]
+    xKeyObj[CMAttributeType.SIZE.value]         = int(t_srcKeyObjData[GKLMAttributeType.KEY_LENGTH.value])
+
+    # In GKLM, the Object Type uses underscores intead of spaces ("SYMMETRIC_KEY" vs "Symmetric Key")
+    # and, therefore, needs some adjusting before it can be sent to CM.
+    tmpStr  = t_srcKeyObjData[GKLMAttributeType.KEY_TYPE.value]
+    tmpStr2 = tmpStr.replace("_", " ")  # SYMMETRIC_KEY -> SYMMETRIC KEY
+    
+    xKeyObj[CMAttributeType.OBJECT_TYPE.value]  = tmpStr2.title()   # SYMMETRIC KEY -> Symmetric Key
+    xKeyObj[CMAttributeType.MATERIAL.value]     = t_srcKeyObjData[GKLMAttributeType.KEY_BLOCK.value]['KEY_MATERIAL']
+    xKeyObj[CMAttributeType.FORMAT.value]       = t_srcKeyObjData[GKLMAttributeType.KEY_BLOCK.value]['KEY_FORMAT'].lower()
+    
+    # Add a userID to the associated key object so it can be made owner of the key
+    # when uploaded to CM
+    xKeyObj[CMAttributeType.META.value]= {CMAttributeType.OWNER_ID.value: t_userID}
+
+    # Check for Custom Attributes and if they exist, add them as Meta data to destination
+    t_kmipMeta = legacyMapSrcNetAppMeta(t_srcKeyObjData)
+    if t_kmipMeta is not None:
+        xKeyObj[CMAttributeType.META.value][NetAppMetaAttribute.KMIP.value] = t_kmipMeta
+
+    # Assign the key to the group (if any) as part of the import
+    if t_dstGrp is not None:
+        xKeyObj[CMAttributeType.META.value][CMMetaAttribute.GROUP_PERMISSIONS.value] = getGroupPermissions(t_dstGrp)
+        xKeyObj[CMAttributeType.ALIASES.value] = [{CMAliasesAttribute.ALIAS.value:xKeyObj[CMAttributeType.NAME.value], CMAliasesAttribute.TYPE.value:"string"}]
+
+    return xKeyObj
+
+def legacyMapSrcSecretObj(t_srcSecretObjData, t_keyUsageDict, t_userID, t_dstGrp=None):
+# ---------------------------------------------------------------------------------
+# Map a source (GKLM) SECRET object with the proper dictionary keys to a destination
+# (CM) secret object that can be uploaded with importDstDataSecretObject.  The 
+# secret is owned by t_userID on the destination.
+#
+# If t_dstGrp is provided, the group permissions are included so that the secret
+# is assigned to the group when it is imported. 
+# ---------------------------------------------------------------------------------
+    xSecretObj = {}
+
+    # GKLM does not use alias for Secrets.  So we are copying the Name into the CM Alias.  
+    # However, GKLM includes brakcets ("[]") in the string and they need to be removed 
+    # before copying the true name value to CM
+    t_name  = returnBracketValue(t_srcSecretObjData[GKLMAttributeType.NAME.value])
+    xSecretObj[CMAttributeType.NAME.value] = t_name
+
+    # Copy name into Alias component of dst object
+    t_aliasList = [{CMAliasesAttribute.ALIAS.value:t_name, CMAliasesAttribute.TYPE.value:"string", CMAliasesAttribute.INDEX.value:0}]
+    xSecretObj[CMAttributeType.ALIASES.value] = t_aliasList
+
+    # GKLM stores the Usage Mask as a string.  CM stores it a the associated KMIP value.  As such,
+    # The GKLM Usage Mask string must be replaced with the appropriate value before storing it in CM.
+    xSecretObj[CMAttributeType.USAGE_MASK.value]    = legacyMapKeyUsage(t_srcSecretObjData[GKLMAttributeType.CRYPTOGRAPHIC_USAGE_MASK.value], t_keyUsageDict)
+    xSecretObj[CMAttributeType.STATE.value]         = t_srcSecretObjData[GKLMAttributeType.SECRET_STATE.value].replace("_","-").title()
+    xSecretObj[CMAttributeType.ALGORITHM.value]     = CMSecretAlgorithType.SECRET_SEED.value # CM seems to store them all as "SECRETESEED"
+    xSecretObj[CMAttributeType.OBJECT_TYPE.value]   = CMSecretObjectType.SECRET_DATA.value # CM seems to store them all as "Secret Data"
+    xSecretObj[CMAttributeType.SIZE.value]          = int(t_srcSecretObjData[GKLMAttributeType.SECRET_CRYPOGRAPHIC_LENGTH.value])
+
+    # In GKLM, the Secret Object Type appears as "PASSWORD".  However, CM uses the term "Secret Data" for 
+    # CM Object Type and "seed" for Data Type.  Let's copy the OBJECT TYPE string for now into CMs dataType.
+    xSecretObj[CMSecretAttributeType.DATA_TYPE.value] = str(t_srcSecretObjData[GKLMAttributeType.TYPE.value]).lower()
+
+    # Finally, copy the actual material and format
+    xSecretObj[CMAttributeType.MATERIAL.value]     = t_srcSecretObjData[GKLMAttributeType.KEY_BLOCK.value]['KEY_MATERIAL']
+    xSecretObj[CMAttributeType.FORMAT.value]       = t_srcSecretObjData[GKLMAttributeType.KEY_BLOCK.value]['KEY_FORMAT'].lower()
+
+    # Add a userID to the associated Secret object so it can be made owner of the Secret
+    # when uploaded to CM
+    xSecretObj[CMAttributeType.META.value]= {CMAttributeType.OWNER_ID.value: t_userID}
+
+    # Check for Custom Attributes and if they exist, add them as Meta data to destination
+    t_kmipMeta = legacyMapSrcNetAppMeta(t_srcSecretObjData)
+    if t_kmipMeta is not None:
+        xSecretObj[CMAttributeType.META.value][NetAppMetaAttribute.KMIP.value] = t_kmipMeta
+
+    # Assign the secret to the group (if any) as part of the import
+    if t_dstGrp is not None:
+        xSecretObj[CMAttributeType.META.value][CMMetaAttribute.GROUP_PERMISSIONS.value] = getGroupPermissions(t_dstGrp)
+
+    return xSecretObj
+
+# ---------------- BENCHMARK -----------------------------------------------------
+
+def createUsageMaskList(t_random, t_cnt):
+    # Returns t_cnt distinct usage mask strings, as GKLM lists them (e.g. "ENCRYPT DECRYPT ")
+    t_usageSet = set()
+    while len(t_usageSet) < t_cnt:
+        t_usageSet.add(" ".join(t_random.sample(USAGE_NAME_LIST, t_random.randint(1, 4))) + t_random.choice(["", " "]))
+
+    return sorted(t_usageSet)
+
+def createSrcRecord(t_random, t_idx, t_usageMaskList):
+    # Returns (object type, GKLM record) of a key or secret
+    t_uuid = str(uuid.UUID(int=t_random.getrandbits(128)))
+    if t_random.random() < SECRET_FRACTION:
+        return GKLMAttributeType.SECRET_DATA.value, {
+            "uuid":"SECRET-" + t_uuid, "Name":"[[INDEX 0] [TYPE UNINTERPRETED_TEXT_STRING] [VALUE s%s]]" %(t_idx),
+            "Type":"PASSWORD", "State":t_random.choice(["PRE_ACTIVE", "ACTIVE"]), "Cryptographic Length":"64",
+            "Cryptographic Usage Mask":t_random.choice(t_usageMaskList),
+            "KEY_BLOCK":{"KEY_MATERIAL":"%016x" %(t_random.getrandbits(64)), "KEY_FORMAT":"OPAQUE"}}
+
+    t_record = {"uuid":"KEY-" + t_uuid, "alias":"[k%s]" %(t_idx), "key type":"SYMMETRIC_KEY", "key algorithm":"AES",
+                "key length (in bits)":"256", "Cryptographic Usage Mask":t_random.choice(t_usageMaskList),
+                "KEY_BLOCK":{"KEY_MATERIAL":"%064x" %(t_random.getrandbits(256)), "KEY_FORMAT":"RAW"}}
+
+    if t_random.random() < NETAPP_FRACTION:
+        t_record["Custom Attributes"] = ("[[NAME x-NETAPP-NodeId] [[INDEX 0] [TYPE JAVA_STRING] [VALUE node%s]]] "
+                                         "[[NAME x-NETAPP-ClusterName] [[INDEX 0] [TYPE JAVA_STRING] [VALUE AFF%s]]] "
+                                         "[[NAME x-OTHER-Tag] [[INDEX 0] [TYPE JAVA_STRING] [VALUE t%s]]]" %(t_idx % 8, t_idx % 3, t_idx))
+
+    return GKLMAttributeType.SYMMETRIC_KEY.value, t_record
+
+def mapPerObject(t_recordList, t_recordCnt, t_userID, t_dstGrp):
+    # the previous per-object functions, as called by k-rest.py before KRestMapper
+    t_keyUsageDict = createDictFromEnum(CryptographicUsageMask)
+    for t_idx in range(t_recordCnt):
+        t_objectType, t_record = t_recordList[t_idx % len(t_recordList)]
+        if t_objectType == GKLMAttributeType.SYMMETRIC_KEY.value:
+            legacyMapSrcKeyObj(t_record, t_keyUsageDict, t_userID, t_dstGrp)
+        else:
+            legacyMapSrcSecretObj(t_record, t_keyUsageDict, t_userID, t_dstGrp)
+
+def mapWithMapper(t_recordList, t_recordCnt, t_userID, t_dstGrp):
+    t_mapper = KRestMapper(t_userID, t_dstGrp)
+    for t_idx in range(t_recordCnt):
+        t_objectType, t_record = t_recordList[t_idx % len(t_recordList)]
+        t_mapper.mapObj(t_objectType, t_record)
+
+def checkPayloads(t_recordList, t_userID, t_dstGrp):
+    # Returns the number of records whose payloads differ (as JSON, i.e. as imported)
+    t_keyUsageDict  = createDictFromEnum(CryptographicUsageMask)
+    t_mapper        = KRestMapper(t_userID, t_dstGrp)
+    t_diffCnt       = 0
+    for t_objectType, t_record in t_recordList:
+        if t_objectType == GKLMAttributeType.SYMMETRIC_KEY.value:
+            t_expected = legacyMapSrcKeyObj(t_record, t_keyUsageDict, t_userID, t_dstGrp)
+        else:
+            t_expected = legacyMapSrcSecretObj(t_record, t_keyUsageDict, t_userID, t_dstGrp)
+
+        if json.dumps(t_mapper.mapObj(t_objectType, t_record)) != json.dumps(t_expected):
+            t_diffCnt = t_diffCnt + 1
+
+    return t_diffCnt
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="bench_mapper.py")
+    parser.add_argument("-records", type=int, default=1000000, help="records mapped by each mapper")
+    parser.add_argument("-pool", type=int, default=50000, help="distinct synthetic records")
+    parser.add_argument("-usageMasks", type=int, default=300, help="distinct usage mask strings")
+    parser.add_argument("-group", default=None, help="destination group assigned to the objects")
+    args = parser.parse_args()
+
+    rnd             = random.Random(1)
+    usageMaskList   = createUsageMaskList(rnd, args.usageMasks)
+    recordList      = [createSrcRecord(rnd, idx, usageMaskList) for idx in range(args.pool)]
+    userID          = "local|" + str(uuid.UUID(int=rnd.getrandbits(128)))
+
+    diffCnt = checkPayloads(recordList, userID, args.group)
+    print("payloads compared: %s records, %s different" %(len(recordList), diffCnt))
+    if diffCnt > 0:
+        sys.exit(1)
+
+    print("%-12s %10s %10s %14s" %("mapper", "records", "seconds", "records/sec"))
+    for label, mapFn in [("per-object", mapPerObject), ("KRestMapper", mapWithMapper)]:
+        start = time.perf_counter()
+        mapFn(recordList, args.records, userID, args.group)
+        secs = time.perf_counter() - start
+        print("%-12s %10s %10.2f %14.0f" %(label, args.records, secs, args.records / secs))
+
+    print("usage masks memoized: %s" %(mapUsageMask.cache_info().currsize))
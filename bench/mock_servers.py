@@ -0,0 +1,438 @@
+# mock_servers
+#
+# local stand-ins for the GKLM (source) and CipherTrust Manager
+# (destination) REST servers, so that k-rest.py can be run and measured
+# without production servers.  Only the endpoints used by k-rest.py are
+# served:
+#
+#   GKLM /SKLM/rest/v1/:  ckms/login, clients, clients/{name}/assignUsers
+#                         (and removeUsers), objects, objects/{uuid}
+#   CM   /api/v1/:        auth/tokens, vault/keys2 (list, create, export,
+#                         patch), vault/secrets, usermgmt/users,
+#                         usermgmt/groups
+#
+# Both servers use TLS (a self-signed certificate is created with
+# openssl) on localhost.  If the source and destination ports are the
+# same, one server provides both APIs.  The number of clients, keys and
+# secrets, the latency of every request, the capacity of the servers, the
+# rate of transient (503) errors, the lifetime of the tokens and the clients
+# whose users cannot be changed (403) are configurable.  The number of
+# requests of each kind is printed when the servers stop (SIGINT or
+# SIGTERM).
+#
+#   Usage: python bench/mock_servers.py [-srcPort N] [-dstPort N] [-clients N] [-keys N] [-secrets N] [-latency SECS]
+#
+######################################################################
+import  argparse
+import  hashlib
+import  json
+import  os
+import  random
+import  re
+import  signal
+import  ssl
+import  subprocess
+import  sys
+import  tempfile
+import  threading
+import  time
+import  uuid
+from    http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from    urllib.parse import urlparse, parse_qs
+
+# ---------------- CONSTANTS -----------------------------------------------------
+DEFAULT_SRC_PORT        = 9443
+DEFAULT_DST_PORT        = 8443
+DEFAULT_LISTEN_BACKLOG  = 512       # pending connections (many workers connect at once)
+DEFAULT_DST_PAGE_LIMIT  = 10        # CM default when a listing does not specify its limit
+DEFAULT_TOKEN_DURATION  = 300       # seconds, reported by CM with each token
+NEVER_EXPIRES           = 1e12
+
+SRC_REST_PREAMBLE       = "/SKLM/rest/v1/"
+DST_REST_PREAMBLE       = "/api/v1/"
+LOGIN_PATH_LIST         = [SRC_REST_PREAMBLE + "ckms/login", DST_REST_PREAMBLE + "auth/tokens", DST_REST_PREAMBLE + "auth/tokens/"]
+
+CM_USER                 = {"name":"bench", "nickname":"bench", "user_id":"local|bench"}
+CM_GROUP                = {"name":"Key Users"}
+
+READY_MSG               = "MOCK SERVERS READY"
+
+def createCertificate(t_certDir):
+# -------------------------------------------------------------------------------
+# Create (once) a self-signed certificate and key for localhost in t_certDir
+# -------------------------------------------------------------------------------
+    t_certFile  = os.path.join(t_certDir, "mock-cert.pem")
+    t_keyFile   = os.path.join(t_certDir, "mock-key.pem")
+
+    if not os.path.exists(t_certFile):
+        subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", t_keyFile, "-out", t_certFile,
+                        "-days", "2", "-subj", "/CN=localhost"], check=True, capture_output=True)
+
+    return t_certFile, t_keyFile
+
+class MockState:
+# -------------------------------------------------------------------------------
+# Objects of the source and destination servers, shared by both servers.  The
+# source objects are generated from a fixed seed so that every run (and every
+# size) uses the same UUIDs, names and material.
+# -------------------------------------------------------------------------------
+    def __init__(self, t_clientCnt, t_keyCnt, t_secretCnt, t_latency=0.0, t_tokenTTL=0, t_etags=False, t_capacity=0, t_errorRate=0.0,
+                 t_failClientList=None):
+        self.latency        = t_latency
+        self.capacity       = t_capacity
+        self.errorRate      = t_errorRate
+        self.errorRandom    = random.Random(2)
+        self.inFlight       = 0
+        self.tokenTTL       = t_tokenTTL
+        self.etags          = t_etags
+        self.failClientSet  = set(t_failClientList or [])   # clients whose users cannot be changed
+        self.lock           = threading.Lock()
+        self.cntDict        = {}    # requests per method and path
+        self.tokenDict      = {}    # token -> expiry
+        self.refreshSet     = set() # refresh tokens issued by the destination
+
+        self.clientList     = []
+        self.srcObjDict     = {}    # uuid -> source object (with key block)
+        self.dstObjDict     = {}    # id -> destination object
+        self.dstNameDict    = {}    # name -> destination object
+        self.dstObjList     = []    # destination objects in creation order
+
+        t_random = random.Random(1)
+        for t_clientIdx in range(t_clientCnt):
+            t_keyList       = [self.createSrcKey(t_random, t_clientIdx, t_idx) for t_idx in range(t_keyCnt)]
+            t_secretList    = [self.createSrcSecret(t_random, t_clientIdx, t_idx) for t_idx in range(t_secretCnt)]
+
+            self.clientList.append({"clientName":"CLIENT%s" %(t_clientIdx), "managedObjectCount":t_keyCnt + t_secretCnt,
+                                    "object":"Symmetric Key (%s) Secret Data (%s)" %(t_keyCnt, t_secretCnt), "users":[],
+                                    "keys":t_keyList, "secrets":t_secretList})
+
+    def createSrcKey(self, t_random, t_clientIdx, t_idx):
+        t_uuid      = "KEY-%s" %(uuid.UUID(int=t_random.getrandbits(128)))
+        t_custom    = "[[NAME x-NETAPP-NodeId] [[INDEX 0] [TYPE JAVA_STRING] [VALUE node%s]]] " \
+                      "[[NAME x-NETAPP-ClusterName] [[INDEX 0] [TYPE JAVA_STRING] [VALUE AFF%s]]]" %(t_idx % 3, t_clientIdx)
+
+        self.srcObjDict[t_uuid] = {"uuid":t_uuid, "alias":"[k%s_%s]" %(t_clientIdx, t_idx), "key type":"SYMMETRIC_KEY",
+                                   "key algorithm":"AES", "key length (in bits)":"256", "Cryptographic Usage Mask":"ENCRYPT DECRYPT",
+                                   "Digest":"[[INDEX 0] [HASH SHA256] [VALUE x00] [DIGESTED_KEY_FORMAT RAW]]",
+                                   "Custom Attributes":t_custom,
+                                   "KEY_BLOCK":{"KEY_MATERIAL":"%064x" %(t_random.getrandbits(256)), "KEY_FORMAT":"RAW"}}
+        return t_uuid
+
+    def createSrcSecret(self, t_random, t_clientIdx, t_idx):
+        t_uuid      = "SECRET-%s" %(uuid.UUID(int=t_random.getrandbits(128)))
+
+        self.srcObjDict[t_uuid] = {"uuid":t_uuid, "Name":"[[INDEX 0] [TYPE UNINTERPRETED_TEXT_STRING] [VALUE s%s_%s]]" %(t_clientIdx, t_idx),
+                                   "Type":"PASSWORD", "State":"PRE_ACTIVE", "Cryptographic Length":"64", "Cryptographic Usage Mask":"ENCRYPT",
+                                   "Digest":"[[INDEX 0] [HASH SHA256] [VALUE x01] [DIGESTED_KEY_FORMAT RAW]]",
+                                   "KEY_BLOCK":{"KEY_MATERIAL":"%016x" %(t_random.getrandbits(64)), "KEY_FORMAT":"OPAQUE"}}
+        return t_uuid
+
+    def enter(self):
+        # Returns the number of requests being processed, including this one
+        with self.lock:
+            self.inFlight = self.inFlight + 1
+            return self.inFlight
+
+    def leave(self):
+        with self.lock:
+            self.inFlight = self.inFlight - 1
+
+    def isError(self):
+        # Returns True if the request is to fail with a transient error
+        with self.lock:
+            return self.errorRate > 0 and self.errorRandom.random() < self.errorRate
+
+    def count(self, t_key):
+        with self.lock:
+            self.cntDict[t_key] = self.cntDict.get(t_key, 0) + 1
+
+    def issueToken(self):
+        t_token = uuid.uuid4().hex
+        with self.lock:
+            self.tokenDict[t_token] = time.time() + (self.tokenTTL or NEVER_EXPIRES)
+
+        return t_token
+
+    def isTokenValid(self, t_authStr):
+        # "SKLMAuth UserAuthId=<token>" or "Bearer <token>"
+        t_token = t_authStr.split("=")[-1].split(" ")[-1]
+        with self.lock:
+            return self.tokenDict.get(t_token, 0) > time.time()
+
+    def createDstObj(self, t_body):
+        # Returns the new destination object, or None if the name already exists
+        t_material = t_body.get("material", "")
+        try:
+            t_fingerprint = hashlib.sha256(bytes.fromhex(t_material)).hexdigest()
+        except ValueError:
+            t_fingerprint = hashlib.sha256(t_material.encode()).hexdigest()
+
+        t_id = uuid.uuid4().hex + uuid.uuid4().hex
+        t_obj = {"id":t_id, "uri":"kylo:" + t_id, "name":t_body.get("name"), "uuid":str(uuid.uuid4()),
+                 "objectType":t_body.get("objectType", "Symmetric Key"), "sha256Fingerprint":t_fingerprint,
+                 "meta":t_body.get("meta", {}), "aliases":t_body.get("aliases", [{"alias":t_body.get("name"), "type":"string", "index":0}]),
+                 "unexportable":False, "material":t_material}
+
+        with self.lock:
+            if t_obj["name"] in self.dstNameDict:
+                return None
+
+            self.dstObjDict[t_id] = t_obj
+            self.dstNameDict[t_obj["name"]] = t_obj
+            self.dstObjList.append(t_obj)
+
+        return t_obj
+
+def listedDstObj(t_obj):
+    # destination objects are listed without their material
+    return {t_key:t_val for t_key, t_val in t_obj.items() if t_key != "material"}
+
+def createHandler(t_state):
+# -------------------------------------------------------------------------------
+# Return the request handler class of the servers, bound to t_state
+# -------------------------------------------------------------------------------
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive, as with the real servers
+        disable_nagle_algorithm = True  # headers and body are written separately
+
+        def log_message(self, *t_args):
+            pass
+
+        def send(self, t_code, t_obj):
+            t_body = json.dumps(t_obj).encode()
+
+            # Source listings carry an ETag (if enabled) and are revalidated with If-None-Match
+            t_etag = None
+            if t_state.etags and t_code == 200 and self.command == "GET" and self.path.startswith(SRC_REST_PREAMBLE) and "objects/" not in self.path:
+                t_etag = '"%s"' %(hashlib.sha256(t_body).hexdigest()[:32])
+                if self.headers.get("If-None-Match") == t_etag:
+                    t_state.count("304")
+                    t_code, t_body = 304, b""
+
+            self.send_response(t_code)
+            if t_etag is not None:
+                self.send_header("ETag", t_etag)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(t_body)))
+            self.end_headers()
+            self.wfile.write(t_body)
+
+        def handle(self):
+            try:
+                BaseHTTPRequestHandler.handle(self)
+            except (ConnectionError, ssl.SSLError):
+                pass    # client went away
+
+        def handleRequest(self, t_method):
+            t_len = int(self.headers.get("Content-Length") or 0)
+            self.body = json.loads(self.rfile.read(t_len) or b"{}") if t_len > 0 else {}
+
+            # Beyond its capacity, a server queues the requests (so the latency grows with the
+            # load) and rejects them once the queue is as long as the capacity
+            t_inFlight = t_state.enter()
+            try:
+                if t_state.capacity > 0 and t_inFlight > 2 * t_state.capacity:
+                    t_state.count("429")
+                    return self.send(429, {"code":429, "codeDesc":"Too many requests"})
+
+                if t_state.isError():
+                    t_state.count("503")
+                    return self.send(503, {"code":503, "codeDesc":"Service unavailable"})
+
+                if t_state.latency > 0:
+                    t_load = t_inFlight / t_state.capacity if t_state.capacity > 0 else 1.0
+                    time.sleep(t_state.latency * max(1.0, t_load))
+            finally:
+                t_state.leave()
+
+            t_url   = urlparse(self.path)
+            t_query = parse_qs(t_url.query)
+            t_path  = t_url.path
+            t_state.count(t_method + " " + re.sub(r"(KEY|SECRET)-[0-9a-f-]+|[0-9a-f]{32,}", "{id}", t_path))
+
+            if t_path not in LOGIN_PATH_LIST and not t_state.isTokenValid(self.headers.get("Authorization", "")):
+                t_state.count("401")
+                return self.send(401, {"code":401, "codeDesc":"Unauthorized"})
+
+            if t_path.startswith(SRC_REST_PREAMBLE):
+                return self.handleSrc(t_method, t_path[len(SRC_REST_PREAMBLE):], t_query)
+
+            if t_path.startswith(DST_REST_PREAMBLE):
+                return self.handleDst(t_method, t_path[len(DST_REST_PREAMBLE):].rstrip("/"), t_query)
+
+            return self.send(404, {"error":"unknown path " + t_path})
+
+        def handleSrc(self, t_method, t_cmd, t_query):
+            if t_cmd == "ckms/login":
+                return self.send(200, {"UserAuthId":t_state.issueToken()})
+
+            if t_cmd == "clients":
+                return self.send(200, {"client":[{t_key:t_val for t_key, t_val in t_client.items() if t_key not in ("keys", "secrets")}
+                                                 for t_client in t_state.clientList]})
+
+            if t_cmd.startswith("clients/"):    # assignUsers and removeUsers
+                if t_cmd.split("/")[1] in t_state.failClientSet:
+                    return self.send(403, {"code":"CTGKM0403E", "message":"not authorized"})
+
+                return self.send(200, {"code":"0"})
+
+            if t_cmd == "objects":
+                t_objectType    = t_query.get("objectType", [""])[0]
+                t_clientName    = t_query.get("clientName", [""])[0]
+                t_objList       = []
+                for t_client in t_state.clientList:
+                    if len(t_clientName) > 0 and t_client["clientName"] != t_clientName:
+                        continue
+
+                    for t_uuid in t_client["keys" if t_objectType == "SYMMETRIC_KEY" else "secrets"]:
+                        t_objList.append({t_key:t_val for t_key, t_val in t_state.srcObjDict[t_uuid].items() if t_key != "KEY_BLOCK"})
+
+                return self.send(200, {"managedObject":t_objList})
+
+            if t_cmd.startswith("objects/"):
+                t_obj = t_state.srcObjDict.get(t_cmd[len("objects/"):])
+                if t_obj is None:
+                    return self.send(404, {"code":"CTGKM0001E", "message":"object not found"})
+
+                return self.send(200, {"managedObject":t_obj})
+
+            return self.send(404, {"error":"unknown command " + t_cmd})
+
+        def handleDst(self, t_method, t_cmd, t_query):
+            if t_cmd == "auth/tokens":
+                if self.body.get("grant_type") == "refresh_token":
+                    t_state.count("refresh")
+                    if self.body.get("refresh_token") not in t_state.refreshSet:
+                        return self.send(401, {"code":401, "codeDesc":"Invalid refresh token"})
+
+                t_refreshToken = self.body.get("refresh_token") or uuid.uuid4().hex
+                with t_state.lock:
+                    t_state.refreshSet.add(t_refreshToken)
+
+                return self.send(200, {"jwt":t_state.issueToken(), "refresh_token":t_refreshToken,
+                                       "duration":t_state.tokenTTL or DEFAULT_TOKEN_DURATION})
+
+            if t_cmd == "usermgmt/users/self":
+                return self.send(200, CM_USER)
+
+            if t_cmd == "usermgmt/users":
+                return self.send(200, {"resources":[CM_USER]})
+
+            if t_cmd == "usermgmt/groups":
+                if t_method == "GET":
+                    return self.send(200, {"resources":[CM_GROUP]})
+
+                return self.send(201, {"name":self.body.get("name")})
+
+            if t_cmd.startswith("usermgmt/groups/"):    # add user to group
+                return self.send(200, {})
+
+            if t_cmd in ("vault/keys2", "vault/secrets") and t_method == "POST":
+                t_obj = t_state.createDstObj(self.body)
+                if t_obj is None:
+                    return self.send(409, {"code":409, "codeDesc":"Resource already exists"})
+
+                return self.send(201, listedDstObj(t_obj))
+
+            if t_cmd == "vault/keys2" and t_method == "GET":
+                with t_state.lock:
+                    t_objList = list(t_state.dstObjList)
+
+                if "name" in t_query:
+                    t_objList = [t_obj for t_obj in t_objList if t_obj["name"] == t_query["name"][0]]
+
+                t_skip  = int(t_query.get("skip", ["0"])[0])
+                t_limit = int(t_query.get("limit", [str(DEFAULT_DST_PAGE_LIMIT)])[0])
+                return self.send(200, {"skip":t_skip, "limit":t_limit, "total":len(t_objList),
+                                       "resources":[listedDstObj(t_obj) for t_obj in t_objList[t_skip:t_skip + t_limit]]})
+
+            t_match = re.match(r"vault/keys2/([0-9a-f]+)(/export)?$", t_cmd)
+            if t_match:
+                t_obj = t_state.dstObjDict.get(t_match.group(1))
+                if t_obj is None:
+                    return self.send(404, {"code":404, "codeDesc":"Resource not found"})
+
+                if t_match.group(2) is not None:
+                    return self.send(200, t_obj)
+
+                if t_method == "PATCH":
+                    t_obj.setdefault("meta", {}).update(self.body.get("meta", {}))
+                    if "aliases" in self.body:
+                        t_obj["aliases"] = self.body["aliases"]
+
+                return self.send(200, listedDstObj(t_obj))
+
+            return self.send(404, {"error":"unknown command " + t_cmd})
+
+        def do_GET(self):
+            self.handleRequest("GET")
+
+        def do_POST(self):
+            self.handleRequest("POST")
+
+        def do_PUT(self):
+            self.handleRequest("PUT")
+
+        def do_PATCH(self):
+            self.handleRequest("PATCH")
+
+    return MockHandler
+
+def startServer(t_port, t_state, t_sslContext):
+# -------------------------------------------------------------------------------
+# Start a TLS server on localhost:t_port in a background thread
+# -------------------------------------------------------------------------------
+    ThreadingHTTPServer.request_queue_size = DEFAULT_LISTEN_BACKLOG
+    t_server = ThreadingHTTPServer(("127.0.0.1", t_port), createHandler(t_state))
+    t_server.daemon_threads = True
+
+    # the handshake is performed by the handler thread, so a slow handshake does not block accept()
+    t_server.socket = t_sslContext.wrap_socket(t_server.socket, server_side=True, do_handshake_on_connect=False)
+
+    threading.Thread(target=t_server.serve_forever, name="mock%s" %(t_port), daemon=True).start()
+    return t_server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="mock_servers.py", description="Mock GKLM and CipherTrust Manager REST servers")
+    parser.add_argument("-srcPort", type=int, default=DEFAULT_SRC_PORT)
+    parser.add_argument("-dstPort", type=int, default=DEFAULT_DST_PORT)
+    parser.add_argument("-clients", type=int, default=3)
+    parser.add_argument("-keys", type=int, default=5, help="symmetric keys per client")
+    parser.add_argument("-secrets", type=int, default=2, help="secrets per client")
+    parser.add_argument("-latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("-capacity", type=int, default=0, help="requests processed at once before they queue (0 = unlimited)")
+    parser.add_argument("-errorRate", type=float, default=0.0, help="fraction of requests that fail with 503")
+    parser.add_argument("-tokenTTL", type=float, default=0, help="token lifetime in seconds (0 = tokens never expire)")
+    parser.add_argument("-etags", action="store_true", help="send ETags with source listings")
+    parser.add_argument("-failClient", action="append", default=[], help="client whose users cannot be changed (403)")
+    parser.add_argument("-certDir", default=tempfile.gettempdir())
+    args = parser.parse_args()
+
+    state = MockState(args.clients, args.keys, args.secrets, args.latency, args.tokenTTL, args.etags, args.capacity, args.errorRate,
+                      args.failClient)
+
+    certFile, keyFile = createCertificate(args.certDir)
+    sslContext = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    sslContext.load_cert_chain(certFile, keyFile)
+
+    serverList = [startServer(args.srcPort, state, sslContext)]
+    if args.dstPort != args.srcPort:
+        serverList.append(startServer(args.dstPort, state, sslContext))
+
+    stopEvent = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *t_args: stopEvent.set())
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda *t_args: print(json.dumps(state.cntDict), flush=True))
+
+    print("%s (source port %s, destination port %s, %s source objects)" %(READY_MSG, args.srcPort, args.dstPort, len(state.srcObjDict)), flush=True)
+    try:
+        while not stopEvent.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+
+    for server in serverList:
+        server.shutdown()
+
+    print(json.dumps(state.cntDict), flush=True)
+    sys.exit(0)
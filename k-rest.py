@@ -9,10 +9,25 @@
 #####################################################################################
 
 import  argparse
+import  atexit
 from    pickle import TRUE
 from    kerrors import *
 from    krestcmds import *
+from    krestasync import *
+from    krestcache import *
+from    krestauth import *
 from    krestenums import *
+from    krestjournal import *
+from    krestledger import *
+from    krestlimiter import *
+from    krestmapper import *
+from    krestmetrics import *
+from    krestpipeline import *
+from    krestreport import *
+from    krestretry import *
+from    krestsession import *
+from    krestshard import *
+from    krestworkers import *
 from    netappfilters import *
 from    termcolor import colored
 import  colorama
@@ -20,6 +35,17 @@ import  colorama
 # ---------------- Constants ----------------------------------------------------
 DEFAULT_SRC_PORT    = ["9443"]
 DEFAULT_DST_PORT    = ["443"]
+DEFAULT_SRC_WORKERS = [1]
+DEFAULT_DST_WORKERS = [1]
+DEFAULT_HTTP_TIMEOUT = [DEFAULT_TIMEOUT]
+DEFAULT_IN_FLIGHT_LIMIT = [DEFAULT_IN_FLIGHT]
+DEFAULT_STREAM_QUEUE = [DEFAULT_STREAM_QUEUE_SIZE]
+DEFAULT_DST_PAGE    = [DEFAULT_DST_PAGE_SIZE]
+DEFAULT_DST_LIST_WORKER_CNT = [DEFAULT_DST_LIST_WORKERS]
+DEFAULT_VERIFY_WORKERS = [4]
+DEFAULT_LISTING_CACHE_TTL = [DEFAULT_CACHE_TTL]
+DEFAULT_RETRY_CNT   = [DEFAULT_RETRIES]
+DEFAULT_RETRY_LIMIT = [DEFAULT_RETRY_BUDGET]
 
 # ################################################################################
 
@@ -87,6 +113,133 @@ resolveSrcClientOwnership = False   #set default to be false
 parser.add_argument("-includeSecrets", action="store_true", dest="includeSecrets", required=False)
 includeSecrets = False   #set default to be false
 
+# Added ability to divide a migration among several processes or hosts.  If populated (e.g. 2/4),
+# only the objects (or clients) whose UUID (or client name) hashes to the shard are processed.
+parser.add_argument("-shard", nargs=1, action="store", dest="shard", required=False)
+parser.add_argument("-shardKey", nargs=1, action="store", dest="shardKey", required=False, 
+                    choices=[shardKeyOption.UUID.value,
+                             shardKeyOption.CLIENT.value
+                            ],
+                    default=[shardKeyOption.UUID.value] )
+shard = None   #set default to no sharding
+
+# Number of concurrent requests used to retrieve the key blocks of the source objects.
+parser.add_argument("-srcWorkers", nargs=1, action="store", dest="srcWorkers", type=int, required=False, default=DEFAULT_SRC_WORKERS)
+srcWorkers = 1   #set default to serial retrieval
+
+# Number of source clients whose objects are retrieved at the same time.
+parser.add_argument("-srcClientWorkers", nargs=1, action="store", dest="srcClientWorkers", type=int, required=False, default=DEFAULT_SRC_WORKERS)
+srcClientWorkers = 1   #set default to one client at a time
+
+# Number of objects imported into the destination at the same time.
+parser.add_argument("-dstWorkers", nargs=1, action="store", dest="dstWorkers", type=int, required=False, default=DEFAULT_DST_WORKERS)
+dstWorkers = 1   #set default to serial import
+
+# Number of destination objects per listing page and number of pages read at the same time.
+parser.add_argument("-dstPageSize", nargs=1, action="store", dest="dstPageSize", type=int, required=False, default=DEFAULT_DST_PAGE)
+dstPageSize = DEFAULT_DST_PAGE_SIZE
+
+parser.add_argument("-dstListWorkers", nargs=1, action="store", dest="dstListWorkers", type=int, required=False, default=DEFAULT_DST_LIST_WORKER_CNT)
+dstListWorkers = DEFAULT_DST_LIST_WORKERS
+
+# Timeout, in seconds, applied to every REST request sent to the source or destination.
+parser.add_argument("-httpTimeout", nargs=1, action="store", dest="httpTimeout", type=float, required=False, default=DEFAULT_HTTP_TIMEOUT)
+httpTimeout = DEFAULT_TIMEOUT
+
+# Number of times a request that failed with a transient error (no response, 408, 429 or 5xx)
+# is retried, and the number of retries allowed for the whole run.
+parser.add_argument("-retries", nargs=1, action="store", dest="retries", type=int, required=False, default=DEFAULT_RETRY_CNT)
+retries = DEFAULT_RETRIES
+
+parser.add_argument("-retryBudget", nargs=1, action="store", dest="retryBudget", type=int, required=False, default=DEFAULT_RETRY_LIMIT)
+retryBudget = DEFAULT_RETRY_BUDGET
+
+# Directory of the on-disk cache of source client and object listings (never key blocks).
+parser.add_argument("-cacheDir", nargs=1, action="store", dest="cacheDir", required=False)
+cacheDir = ""   #set default to no cache
+
+# Age, in seconds, after which a cached listing is revalidated with (or read again from) the source.
+parser.add_argument("-cacheTTL", nargs=1, action="store", dest="cacheTTL", type=float, required=False, default=DEFAULT_LISTING_CACHE_TTL)
+cacheTTL = DEFAULT_CACHE_TTL
+
+# Read every listing from the source again (and update the cache).
+parser.add_argument("-refreshCache", action="store_true", dest="refreshCache", required=False)
+
+# Transport engine.  REQUESTS uses blocking requests with worker threads.  ASYNCIO uses
+# coroutines over a single event loop (requires the aiohttp package).
+parser.add_argument("-engine", nargs=1, action="store", dest="engine", required=False, 
+                    choices=[engineOption.REQUESTS.value,
+                             engineOption.ASYNCIO.value
+                            ],
+                    default=[engineOption.REQUESTS.value] )
+engine = engineOption.REQUESTS.value   #set default to the requests engine
+
+# Adjust the number of requests outstanding to each server to its latency and overload responses.
+# The number of workers (or the in-flight limit of the ASYNCIO engine) is then the maximum.
+parser.add_argument("-adaptive", action="store_true", dest="adaptive", required=False)
+adaptiveLimit = False   #set default to be false
+
+# Maximum number of outstanding requests of the ASYNCIO engine
+parser.add_argument("-inFlight", nargs=1, action="store", dest="inFlight", type=int, required=False, default=DEFAULT_IN_FLIGHT_LIMIT)
+inFlight = DEFAULT_IN_FLIGHT
+
+# Stream each source object into the destination as soon as it has been retrieved, rather 
+# than reading the entire source before importing.
+parser.add_argument("-stream", action="store_true", dest="stream", required=False)
+streamObjects = False   #set default to be false
+
+# Maximum number of mapped objects waiting to be imported when streaming
+parser.add_argument("-streamQueueSize", nargs=1, action="store", dest="streamQueueSize", type=int, required=False, default=DEFAULT_STREAM_QUEUE)
+streamQueueSize = DEFAULT_STREAM_QUEUE_SIZE
+
+# Journal file to which the outcome of each imported object is appended.
+parser.add_argument("-journal", nargs=1, action="store", dest="journal", required=False)
+journalFile = ""   #set default to a zero length string
+
+# Skip the source objects that the journal shows were already imported.
+parser.add_argument("-resume", action="store_true", dest="resume", required=False)
+resumeUUIDSet = set()   #set default to no objects skipped
+
+# SQLite ledger recording what each run read and imported.
+parser.add_argument("-ledger", nargs=1, action="store", dest="ledger", required=False)
+ledgerFile = ""   #set default to a zero length string
+
+# Only migrate the source objects that are new or have changed since they were recorded in the ledger.
+parser.add_argument("-delta", action="store_true", dest="delta", required=False)
+deltaOnly = False   #set default to be false
+
+# Index the destination objects once and skip source objects that are already present.
+parser.add_argument("-skipExisting", action="store_true", dest="skipExisting", required=False)
+skipExisting = False   #set default to be false
+
+# Verify the destination objects against the SHA-256 fingerprints of the source objects
+# instead of exporting the destination material.
+parser.add_argument("-verify", action="store_true", dest="verify", required=False)
+verifyObjects = False   #set default to be false
+
+# Number of threads calculating the fingerprints of the source objects when verifying.
+parser.add_argument("-verifyWorkers", nargs=1, action="store", dest="verifyWorkers", type=int, required=False, default=DEFAULT_VERIFY_WORKERS)
+verifyWorkers = 1
+
+# File to which the outcome of each object is streamed (one JSON line or CSV row per object).
+parser.add_argument("-report", nargs=1, action="store", dest="report", required=False)
+reportFile = ""   #set default to a zero length string
+
+parser.add_argument("-reportFormat", nargs=1, action="store", dest="reportFormat", required=False, 
+                    choices=[reportFormatOption.JSONL.value,
+                             reportFormatOption.CSV.value
+                            ],
+                    default=[reportFormatOption.JSONL.value] )
+reportFormat = reportFormatOption.JSONL.value   #set default to JSON lines
+
+# Display only the aggregated counts (and errors) rather than the details of each object.
+parser.add_argument("-quiet", action="store_true", dest="quiet", required=False)
+quietConsole = False   #set default to be false
+
+# Prometheus textfile to which the request metrics (per endpoint and phase) are written at the end of the run.
+parser.add_argument("-metricsFile", nargs=1, action="store", dest="metricsFile", required=False)
+metricsFile = ""   #set default to a zero length string
+
 # Args are returned as a LIST.  Separate them into individual strings
 args = parser.parse_args()
 
@@ -110,6 +263,99 @@ dstPass = str(" ".join(args.dstPass))
 tmpStr = " DstHost: %s\n DstPort: %s\n DstUser: %s\n" %(dstHost, dstPort, dstUser)
 print(tmpStr)
 
+# ------------- Source Workers --------------------------------------
+# Set the number of concurrent source key block requests
+# -------------------------------------------------------------------
+srcWorkers = args.srcWorkers[0]
+if srcWorkers < 1:
+    parser.error("-srcWorkers must be 1 or greater")
+print(" Source Workers:", srcWorkers)
+
+srcClientWorkers = args.srcClientWorkers[0]
+if srcClientWorkers < 1:
+    parser.error("-srcClientWorkers must be 1 or greater")
+print(" Source Client Workers:", srcClientWorkers)
+
+dstWorkers = args.dstWorkers[0]
+if dstWorkers < 1:
+    parser.error("-dstWorkers must be 1 or greater")
+print(" Destination Workers:", dstWorkers)
+
+dstPageSize = args.dstPageSize[0]
+if dstPageSize < 1:
+    parser.error("-dstPageSize must be 1 or greater")
+
+dstListWorkers = args.dstListWorkers[0]
+if dstListWorkers < 1:
+    parser.error("-dstListWorkers must be 1 or greater")
+print(" Destination Listing (page size, workers): %s, %s" %(dstPageSize, dstListWorkers))
+
+# ------------- HTTPS Sessions --------------------------------------
+# All REST Commands to a server share one pool of keep-alive connections.
+# The pool is sized to the number of concurrent requests for the server.
+# -------------------------------------------------------------------
+httpTimeout = args.httpTimeout[0]
+print(" HTTP Timeout (secs):", httpTimeout)
+
+configureSession(srcHost, srcPort, srcWorkers * srcClientWorkers, httpTimeout)
+configureSession(dstHost, dstPort, max(dstWorkers, dstListWorkers), httpTimeout)
+
+# ------------- Retries ---------------------------------------------
+# Requests that fail with a transient error are retried with an
+# exponential backoff, within a retry budget for the whole run.
+# -------------------------------------------------------------------
+retries = args.retries[0]
+if retries < 0:
+    parser.error("-retries must be 0 or greater")
+
+retryBudget = args.retryBudget[0]
+if retryBudget < 0:
+    parser.error("-retryBudget must be 0 or greater")
+print(" Retries (per request, per run): %s, %s" %(retries, retryBudget))
+
+configureRetry(retries, retryBudget)
+
+# ------------- Listing Cache ---------------------------------------
+# If a cache directory is specified, source listings are read from
+# (and saved to) the cache.
+# -------------------------------------------------------------------
+listingCache = None
+if args.cacheDir is not None:
+    cacheDir = str(" ".join(args.cacheDir))
+    cacheTTL = args.cacheTTL[0]
+    listingCache = configureListingCache(cacheDir, cacheTTL, args.refreshCache)
+    print(" Listing Cache: %s (TTL %s secs, refresh: %s)" %(cacheDir, cacheTTL, args.refreshCache))
+
+# ------------- Transport Engine ------------------------------------
+# Set the engine used for the bulk of the source retrieval and the
+# destination import.
+# -------------------------------------------------------------------
+engine = str(" ".join(args.engine))
+print(" Engine:", engine)
+
+asyncEngine = None
+if engine == engineOption.ASYNCIO.value:
+    inFlight = args.inFlight[0]
+    if inFlight < 1:
+        parser.error("-inFlight must be 1 or greater")
+    print(" In-Flight Limit:", inFlight)
+    asyncEngine = KRestAsyncEngine(inFlight, httpTimeout)
+
+# ------------- Adaptive Concurrency --------------------------------
+# If requested, the requests outstanding to each server are governed by
+# an adaptive limiter.  The limit starts low and never exceeds the
+# number of workers (or the in-flight limit) for the server.
+# -------------------------------------------------------------------
+adaptiveLimit = args.adaptive
+print(" Adaptive Concurrency:", adaptiveLimit)
+if adaptiveLimit:
+    if asyncEngine is not None:
+        configureLimiter(srcHost, srcPort, inFlight)
+        configureLimiter(dstHost, dstPort, inFlight)
+    else:
+        configureLimiter(srcHost, srcPort, srcWorkers * srcClientWorkers)
+        configureLimiter(dstHost, dstPort, max(dstWorkers, dstListWorkers))
+
 # ------------- Group Management ------------------------------------
 # If a Group is specified, then capture the group name and check to 
 # see if it is present. The flag variable will be used later to create
@@ -117,14 +363,16 @@ print(tmpStr)
 # to the desitation.
 # -------------------------------------------------------------------
 t_flagGroupIsAbsent = False
+dstGroupName = None     # group name, if one is specified
 if args.dstUserGroupName is not None:
     dstUserGroupName = str(" ".join(args.dstUserGroupName))
+    dstGroupName = dstUserGroupName
     print(" DstUserGroupName: %s" %(dstUserGroupName))
     
     # If Group is specified, download the existing groups from the destination
     # and see if the group is already present.
-    dstAuthStr, dstAuthBornOn = createDstAuthStr(dstHost, dstPort, dstUser, dstPass)
-    dstGrpList = getDstGroupsAll(dstHost, dstPort, dstAuthStr)
+    dstAuth     = getDstAuth(dstHost, dstPort, dstUser, dstPass)
+    dstGrpList  = getDstGroupsAll(dstHost, dstPort, dstAuth.getAuthStr())
     # printJList("dstGrpList:", dstGrpList)
     
     # Presume the group is not present, unless it is found within
@@ -142,6 +390,162 @@ if args.dstUserGroupName is not None:
 listOnly = str(" ".join(args.listOnly))
 print(" ListOnly:", listOnly)
 
+# ---- Streaming ------------------------------------------------------
+# Streaming only applies when objects are migrated (not listed) and
+# is provided by the REQUESTS engine.
+# ---------------------------------------------------------------------
+if args.stream and listOnly == listOnlyOption.NEITHER.value:
+    if asyncEngine is not None:
+        parser.error("-stream is not supported by the %s engine" %(engineOption.ASYNCIO.value))
+    streamQueueSize = args.streamQueueSize[0]
+    if streamQueueSize < 1:
+        parser.error("-streamQueueSize must be 1 or greater")
+    streamObjects = True
+    print(" Stream Objects: True (queue size %s)" %(streamQueueSize))
+
+# ---- Verification ---------------------------------------------------
+# Verification compares source objects with the destination listing, so
+# it requires both servers and the source objects to be retained.
+# ---------------------------------------------------------------------
+if args.verify:
+    if listOnly not in (listOnlyOption.NEITHER.value, listOnlyOption.BOTH.value):
+        parser.error("-verify requires -listOnly %s or %s" %(listOnlyOption.NEITHER.value, listOnlyOption.BOTH.value))
+    if streamObjects:
+        parser.error("-verify is not supported with -stream")
+    verifyWorkers = args.verifyWorkers[0]
+    if verifyWorkers < 1:
+        parser.error("-verifyWorkers must be 1 or greater")
+    verifyObjects = True
+    print(" Verify Objects: True (%s workers)" %(verifyWorkers))
+
+# ---- Journal --------------------------------------------------------
+# If a journal is specified, each import outcome is recorded in it.  If 
+# resuming, the objects that were already imported are not retrieved.
+# ---------------------------------------------------------------------
+journal = None
+if args.resume and args.journal is None:
+    parser.error("-resume requires -journal")
+
+if args.journal is not None:
+    journalFile = str(" ".join(args.journal))
+    print(" Journal:", journalFile)
+
+    if args.resume and listOnly == listOnlyOption.NEITHER.value:
+        resumeUUIDSet = readJournalImportedUUIDs(journalFile)
+        print(" Resume: %s objects previously imported will be skipped" %(len(resumeUUIDSet)))
+
+    if listOnly == listOnlyOption.NEITHER.value:
+        journal = KRestJournal(journalFile)
+
+# ---- Ledger ---------------------------------------------------------
+# If a ledger is specified, each object read from the source and each
+# import outcome is recorded in it.  If only the delta is migrated, the
+# unchanged objects that were already migrated are not retrieved.
+# ---------------------------------------------------------------------
+ledger = None
+if args.delta and args.ledger is None:
+    parser.error("-delta requires -ledger")
+
+if args.ledger is not None and listOnly == listOnlyOption.NEITHER.value:
+    ledgerFile = str(" ".join(args.ledger))
+    deltaOnly = args.delta
+    print(" Ledger: %s (delta only: %s)" %(ledgerFile, deltaOnly))
+    ledger = KRestLedger(ledgerFile)
+
+# ---- Report ---------------------------------------------------------
+# If a report is specified, the outcome of each object is streamed to it.
+# If quiet, the details of each object are not displayed.
+# ---------------------------------------------------------------------
+if args.report is not None:
+    reportFile = str(" ".join(args.report))
+    reportFormat = str(" ".join(args.reportFormat))
+    print(" Report: %s (%s)" %(reportFile, reportFormat))
+    configureReport(reportFile, reportFormat)
+
+quietConsole = args.quiet
+setQuiet(quietConsole)
+print(" Quiet:", quietConsole)
+
+# ---- Metrics --------------------------------------------------------
+# The request metrics are displayed when the run ends (even if it ends
+# early) and, if a metrics file is specified, written to it.
+# ---------------------------------------------------------------------
+if args.metricsFile is not None:
+    metricsFile = str(" ".join(args.metricsFile))
+    print(" Metrics File:", metricsFile)
+
+def dumpMetrics():
+    getMetrics().printSummary()
+    if len(metricsFile) > 0:
+        getMetrics().writePrometheusFile(metricsFile)
+
+atexit.register(dumpMetrics)
+
+def reportSrcObjDataList(t_srcObjDataList, t_objectType):
+    # report each object retrieved from the source
+    for t_obj in t_srcObjDataList:
+        if t_objectType == GKLMAttributeType.SYMMETRIC_KEY.value:
+            t_name = str(t_obj[GKLMAttributeType.ALIAS.value]).strip("[]")
+        else:
+            t_name = returnBracketValue(str(t_obj[GKLMAttributeType.NAME.value]))
+
+        reportObj(reportStage.SOURCE.value, t_obj[GKLMAttributeType.UUID.value], t_name, t_objectType, REPORT_STATUS_RETRIEVED,
+                  t_obj[GKLMAttributeType.CLIENT_NAME.value])
+
+def recordDstObjStatus(t_srcUUID, t_xObj, t_status):
+    # record the outcome of an object in the journal, the ledger and the report (if any)
+    reportObj(reportStage.IMPORT.value, t_srcUUID, t_xObj[CMAttributeType.NAME.value], t_xObj[CMAttributeType.OBJECT_TYPE.value], t_status)
+
+    if journal is not None:
+        journal.record(t_srcUUID, t_xObj[CMAttributeType.NAME.value], t_status)
+
+    if ledger is not None:
+        ledger.recordResult(t_srcUUID, t_xObj[CMAttributeType.NAME.value], getDataObjFingerprint(t_xObj), t_status)
+
+def recordDstImport(t_srcUUID, t_xObj, t_success):
+    # record the outcome of each object import
+    if t_success:
+        recordDstObjStatus(t_srcUUID, t_xObj, journalStatus.IMPORTED.value)
+    else:
+        recordDstObjStatus(t_srcUUID, t_xObj, journalStatus.FAILED.value)
+
+# ---- Skip Existing --------------------------------------------------
+# If requested, an index of the destination object names (and their
+# fingerprints) is created once before the import and every object that
+# is already present is skipped rather than imported.
+# ---------------------------------------------------------------------
+skipExisting = args.skipExisting
+print(" Skip Existing:", skipExisting)
+
+dstObjIndex = None
+dstExistingCntDict = {dstIndexStatus.IDENTICAL.value:0, dstIndexStatus.PRESENT.value:0, dstIndexStatus.CONFLICT.value:0}
+
+def isExistingDstObj(t_srcUUID, t_xObj):
+    # returns True if the object should be skipped because its name is already in the destination.
+    t_status = checkDstObjIndex(t_xObj, dstObjIndex)
+    if t_status == dstIndexStatus.ABSENT.value:
+        return False
+
+    t_xObjName = t_xObj[CMAttributeType.NAME.value]
+    dstExistingCntDict[t_status] = dstExistingCntDict[t_status] + 1
+
+    if t_status == dstIndexStatus.CONFLICT.value:
+        if not quietConsole:
+            tmpStr = "    CONFLICT: %s (source UUID %s) exists in the destination with different material." %(t_xObjName, t_srcUUID)
+            print(colored(tmpStr, "light_red", attrs=["bold"]))
+        recordDstObjStatus(t_srcUUID, t_xObj, journalStatus.CONFLICT.value)
+    else:
+        recordDstObjStatus(t_srcUUID, t_xObj, journalStatus.EXISTS.value)
+
+    return True
+
+def skipExistingDstObjs(t_xObjList, t_srcObjDataList):
+    # remove the objects that are already in the destination from the mapped and source lists
+    t_keepList = [k for k in range(len(t_xObjList)) 
+                  if not isExistingDstObj(t_srcObjDataList[k][GKLMAttributeType.UUID.value], t_xObjList[k])]
+
+    return [t_xObjList[k] for k in t_keepList], [t_srcObjDataList[k] for k in t_keepList]
+
 # ---- List srcUUID ---------------------------------------------------
 # Collect the UUID string and print it
 # ---------------------------------------------------------------------
@@ -172,6 +576,55 @@ if args.srcNAVserverID is not None:
 # DEBUG - this is a custom attribute that appears occastionally for non-NetApp objects
 # srcNetAppFilterDict['y-RNGSimulation'] = 'Qg'
 
+# ---- Shard ----------------------------------------------------------
+# If a shard is specified, only the objects (or clients) of the shard
+# are processed.  The names of the objects processed are kept so that
+# the destination objects of the shard can be exported.
+# ---------------------------------------------------------------------
+shardObjNameSet = set()
+if args.shard is not None:
+    try:
+        shard = parseShard(str(" ".join(args.shard)), str(" ".join(args.shardKey)))
+    except ValueError as e:
+        parser.error("-shard: %s" %(e))
+
+    if args.resolveSrcClientOwnership and shard.count > 1 and shard.key != shardKeyOption.CLIENT.value:
+        parser.error("-resolveSrcClientOwnership requires -shardKey %s, so that each client is changed by one shard only" %(shardKeyOption.CLIENT.value))
+    print(" Shard:", shard)
+
+# ---- Source Listing Filter ------------------------------------------
+# Objects are excluded from the source listing, before their key blocks
+# are retrieved, if they were already imported (resume), do not match
+# the NetApp filter (if the listing carries their Custom Attributes),
+# have not changed since the last migration (delta) or belong to
+# another shard.
+#
+# The destination name of every listed object of the shard is kept,
+# including the objects skipped by resume or delta, so that the shard
+# exports the destination objects of all of its source objects.
+# ---------------------------------------------------------------------
+srcListingFilter = None
+if len(resumeUUIDSet) > 0 or len(srcNetAppFilterDict) > 0 or ledger is not None or shard is not None:
+    def srcListingFilter(t_srcObj):
+        if shard is not None:
+            if not shard.isObjOwned(t_srcObj):
+                return False
+
+            t_name = mapSrcObjName(t_srcObj)
+            if t_name is not None:
+                shardObjNameSet.add(t_name)
+
+        if t_srcObj[GKLMAttributeType.UUID.value] in resumeUUIDSet:
+            return False
+
+        if len(srcNetAppFilterDict) > 0 and not isSrcNetAppListingMatch(t_srcObj, srcNetAppFilterDict):
+            return False
+
+        if ledger is not None:
+            return ledger.filterSrcObj(t_srcObj, deltaOnly)
+
+        return True
+
 # ------------- Source Client ------------------------------------
 # Set the client information if it is specified
 # -------------------------------------------------------------------
@@ -199,9 +652,12 @@ print("\n--------------- PROCESSING --------------------------------------------
 # ################################################################################
 # Get Source Information and Material
 # ################################################################################
+# The source token manager renews the authorization string if the source rejects it.
 srcAuthStr = ""
+setMetricsPhase(metricsPhase.SOURCE.value)
 if listOnly != listOnlyOption.DESTINATION.value:
-    srcAuthStr      = createSrcAuthStr(srcHost, srcPort, srcUser, srcPass)
+    srcAuth     = getSrcAuth(srcHost, srcPort, srcUser, srcPass)
+    srcAuthStr  = srcAuth.getAuthStr()
     print("  * Source Access Confirmed *")
     tmpStr = "    Username: %s\n" %(srcUser)
     print(tmpStr)
@@ -211,11 +667,13 @@ if listOnly != listOnlyOption.DESTINATION.value:
 # -------------------------------------------------------------------
 
     # Initialize for Client User List
-    clientList          = getSrcClients(srcHost, srcPort, srcAuthStr)
+    if asyncEngine is not None:
+        clientList      = asyncEngine.run(asyncEngine.getSrcClients(srcHost, srcPort, srcAuthStr))
+    else:
+        clientList      = getSrcClients(srcHost, srcPort, srcAuthStr)
     listLen             = len(clientList)
     srcClientFound      = False
-    t_srcUserList       = []
-    clientUserAdded     = False
+    srcClientWorkList   = []    # [client, key count, secret count] of each client whose objects are retrieved
 
     # Initialize for Symmetric Key Objects
     srcKeyObjDataList   = []
@@ -282,36 +740,45 @@ if listOnly != listOnlyOption.DESTINATION.value:
         
         if (t_srcClientNameLen == 0) or (t_srcClientNameLen > 0 and srcClientName == t_clientName):
             srcClientFound = True
-
-            # Before attempting to get the key material, ensure that the srcUser has the permissions to obtain objects
-            if addClientUser and (srcUser not in clientList[client][GKLMAttributeType.CLIENT_USERS.value]):
-                t_srcUserList.append(srcUser) # create list of user with the user associated with login
-                t_success = assignSrcClientUsers(srcHost, srcPort, srcAuthStr, t_clientName, t_srcUserList)
-                clientUserAdded = True
-
-            # RETRIEVE KEYS
-            if int(t_symKeyCount) > 0:
-                tmpStr = "       ...retrieving symmetric key information for %s... " %(t_clientName)
-                print(tmpStr)
-                # -------------- Retrieve the Key Material --------------------------------------------------------------
-                t_srcKeyObjDataList   = getSrcObjDataListByClient(srcHost, srcPort, srcAuthStr, srcUUID, GKLMAttributeType.SYMMETRIC_KEY.value, t_clientName)
-                srcKeyObjDataList.extend(t_srcKeyObjDataList) # Add client-specific information to total list of key objects
-                # -------------------------------------------------------------------------------------------------------
-
-            # RETRIEVE SECRETS (if requested)
-            if includeSecrets and int(t_secretCount) > 0:
-                tmpStr = "       ...retrieving secret data information for %s... " %(t_clientName)
-                print(tmpStr)
-                # -------------- Retrieve the Secret Data Material --------------------------------------------------------------
-                t_srcSecretObjDataList   = getSrcObjDataListByClient(srcHost, srcPort, srcAuthStr, srcUUID, GKLMAttributeType.SECRET_DATA.value, t_clientName)
-                srcSecretObjDataList.extend(t_srcSecretObjDataList) # Add client-specific information to total list of secrete data objects
-                # -------------------------------------------------------------------------------------------------------
-
-            # If a client user was added, remove it and restore the original ownership.
-            if clientUserAdded:
-                t_success = removeSrcClientUsers(srcHost, srcPort, srcAuthStr, t_clientName, t_srcUserList)
-                t_originalClientUserList = clientList[client][GKLMAttributeType.CLIENT_USERS.value] # retrieve original list of users
-                t_success = assignSrcClientUsers(srcHost, srcPort, srcAuthStr, t_clientName, t_originalClientUserList)
+            if shard is None or shard.isClientOwned(t_clientName):
+                srcClientWorkList.append([clientList[client], t_symKeyCount, t_secretCount])
+
+    # -------------- Retrieve the Key and Secret Material -------------------------------------------------------
+    # When streaming, the objects are retrieved later, while they are imported into the destination.
+    # Otherwise, clients are processed srcClientWorkers at a time.  A client that fails is reported and skipped
+    # without affecting the other clients.  The objects of all clients are then combined in client order.
+    # ------------------------------------------------------------------------------------------------------------
+    def retrieveSrcClient(t_work):
+        t_clientDict, t_symKeyCount, t_secretCount = t_work
+        try:
+            return getSrcClientObjDataLists(srcHost, srcPort, srcAuthStr, srcUser, t_clientDict, srcUUID, 
+                                            t_symKeyCount, t_secretCount, includeSecrets, addClientUser, srcWorkers, srcListingFilter)
+        except (Exception, SystemExit) as e:
+            tmpStr = "\n    ERROR: Retrieval of objects for client %s failed and was skipped (%s)." %(t_clientDict[GKLMAttributeType.CLIENT_NAME.value], repr(e))
+            print(colored(tmpStr, "light_red", attrs=["bold"]))
+            return None
+
+    if streamObjects:
+        srcClientResultList = []
+    elif asyncEngine is not None:
+        srcClientResultList = asyncEngine.run(asyncEngine.getSrcClientWorkList(srcHost, srcPort, srcAuthStr, srcUser, srcClientWorkList, 
+                                                                               srcUUID, includeSecrets, addClientUser, srcListingFilter, srcClientWorkers))
+    else:
+        srcClientResultList = runConcurrently(retrieveSrcClient, srcClientWorkList, srcClientWorkers)
+
+    srcClientFailedCnt = 0
+    for t_clientObjDataLists in srcClientResultList:
+        if t_clientObjDataLists is None:
+            srcClientFailedCnt = srcClientFailedCnt + 1
+            continue
+
+        t_srcKeyObjDataList, t_srcSecretObjDataList = t_clientObjDataLists
+        srcKeyObjDataList.extend(t_srcKeyObjDataList)           # Add client-specific information to total list of key objects
+        srcSecretObjDataList.extend(t_srcSecretObjDataList)     # Add client-specific information to total list of secret data objects
+
+    if srcClientFailedCnt > 0:
+        tmpStr = "\n    WARNING: Objects of %s source client(s) could not be retrieved." %(srcClientFailedCnt)
+        print(colored(tmpStr, "light_red", attrs=["bold"]))
 
     # Once list of clients has been parsed, if the srcClientName was specified but it is not present (or has no keys),
     # then bail and make the user correct and resubmit the command.
@@ -340,17 +807,27 @@ if listOnly != listOnlyOption.DESTINATION.value:
 
     # After iterating through all of the clients in the source, report the total of all key and secret material in the list
     srcKeyObjCnt        = len(srcKeyObjDataList)    # Key Objects
+    srcVerifyKeyObjDataList     = srcKeyObjDataList     # retained for verification, even if objects are skipped later
+    srcVerifySecretObjDataList  = srcSecretObjDataList
     srcSecretObjCnt     = len(srcSecretObjDataList) # Secret Objects
 
-    if listOnly != listOnlyOption.DESTINATION.value:
+    if streamObjects:
+        tmpstr = "\n --- SRC OBJECT RETRIEVAL STREAMED DURING IMPORT --- \n"
+        print(colored(tmpstr, "light_green", attrs=["bold"]))
+
+    elif listOnly != listOnlyOption.DESTINATION.value:
         tmpstr = "\n Number of Src List Keys: %s\n Number of filtered and exportable Src Key Objects: %s" %(srcKeyListCnt, srcKeyObjCnt)
         print(colored(tmpstr, "light_yellow", attrs=["bold"]))
-        printSrcKeyObjDataList(srcKeyObjDataList)
+        reportSrcObjDataList(srcKeyObjDataList, GKLMAttributeType.SYMMETRIC_KEY.value)
+        if not quietConsole:
+            printSrcKeyObjDataList(srcKeyObjDataList)
 
         if includeSecrets:
             tmpstr = "\n Number of Src List Secrets: %s\n Number of filtered and exportable Src Secret Objects: %s" %(srcSecretListCnt, srcSecretObjCnt)
             print(colored(tmpstr, "light_yellow", attrs=["bold"]))
-            printSrcSecretObjDataList(srcSecretObjDataList)
+            reportSrcObjDataList(srcSecretObjDataList, GKLMAttributeType.SECRET_DATA.value)
+            if not quietConsole:
+                printSrcSecretObjDataList(srcSecretObjDataList)
 
         tmpstr = "\n --- SRC OBJECT RETRIEVAL COMPLETE --- \n"
         print(colored(tmpstr, "light_green", attrs=["bold"]))
@@ -359,11 +836,14 @@ if listOnly != listOnlyOption.DESTINATION.value:
 # ################################################################################
 # Get Destination Information and Material
 # ################################################################################
+# The destination token manager is shared by every destination request and refreshes
+# its bearer token in the background, so long runs do not need to log in again.
 dstAuthStr = ""
-dstAuthBornOn = datetime.now()
+setMetricsPhase(metricsPhase.SETUP.value)
 
 if listOnly != listOnlyOption.SOURCE.value:
-    dstAuthStr, dstAuthBornOn = createDstAuthStr(dstHost, dstPort, dstUser, dstPass)
+    dstAuth     = getDstAuth(dstHost, dstPort, dstUser, dstPass)
+    dstAuthStr  = dstAuth.getAuthStr()
     print("  * Destination Access Confirmed *")
 
 # Get destination user meta data that will be used later for 
@@ -391,144 +871,25 @@ if listOnly == listOnlyOption.NEITHER.value:
 # Create and upload all of the key objects to the destination unless a flag to LIST ONLY has been specified. 
 ########################################################################################################### 
 
-    #  Create Key object dictionary and list to map GKLM keys and values to CM
-    xKeyObj     = {}
-    xKeyObjList = []
-
-    # Create a dictionary of Key Usage (it will make it simpler to map)
-    keyUsageDict =  createDictFromEnum(CryptographicUsageMask)
+    # One mapper (see KRestMapper) maps every object for the destination user and group
+    mapper = KRestMapper(CM_userID, dstGroupName)
     
     # -------------- KEY OBJECT MAPPING ------------------------------------------------------------- 
     # For each KEY object in the source, map it with the proper dictionary keys to a x-formed list of 
-    # dictionaries for later upload to the destination
+    # dictionaries for later upload to the destination (see KRestMapper.mapKeyObj).  When streaming, each 
+    # object is mapped as it is imported instead.
     # -----------------------------------------------------------------------------------------------
-    for k in range(srcKeyObjCnt):
-
-        # The GKLM Alias seems to match the pattern of the CM Name key.  
-        # However, GKLM includes brakcets ("[]") in the string
-        # and they need to be removed before copying the true alias value to CM
-        tmpStr = srcKeyObjDataList[k][GKLMAttributeType.ALIAS.value]
-        xKeyObj[CMAttributeType.NAME.value]         = tmpStr.strip("[]")
-
-        # Map the string format of key usage to a binary format (used by CM)
-        xKeyObj[CMAttributeType.USAGE_MASK.value]   = mapKeyUsage(srcKeyObjDataList[k][GKLMAttributeType.CRYPTOGRAPHIC_USAGE_MASK.value], keyUsageDict)
-        xKeyObj[CMAttributeType.ALGORITHM.value]    = srcKeyObjDataList[k][GKLMAttributeType.KEY_ALGORITHM.value]
-        xKeyObj[CMAttributeType.SIZE.value]         = int(srcKeyObjDataList[k][GKLMAttributeType.KEY_LENGTH.value])
-
-        # In GKLM, the Object Type uses underscores intead of spaces ("SYMMETRIC_KEY" vs "Symmetric Key")
-        # and, therefore, needs some adjusting before it can be sent to CM.
-        tmpStr  = srcKeyObjDataList[k][GKLMAttributeType.KEY_TYPE.value]
-        tmpStr2 = tmpStr.replace("_", " ")  # SYMMETRIC_KEY -> SYMMETRIC KEY
-        
-        xKeyObj[CMAttributeType.OBJECT_TYPE.value]  = tmpStr2.title()   # SYMMETRIC KEY -> Symmetric Key
-        xKeyObj[CMAttributeType.MATERIAL.value]     = srcKeyObjDataList[k][GKLMAttributeType.KEY_BLOCK.value]['KEY_MATERIAL']
-        xKeyObj[CMAttributeType.FORMAT.value]       = srcKeyObjDataList[k][GKLMAttributeType.KEY_BLOCK.value]['KEY_FORMAT'].lower()
-        
-        # Add a userID to the associated key object so it can be made owner of the key
-        # when uploaded to CM
-        xKeyObj[CMAttributeType.META.value]= {CMAttributeType.OWNER_ID.value: CM_userID}
-
-        # Check for Custom Attributes and if they exist, add them as Meta data to destination
-        srcCustomAttributesIsPresent, srcNetAppAttributesArePresent = checkForSrcCustomAttributes(srcKeyObjDataList[k])
-        if srcNetAppAttributesArePresent:
-            custSrcAttribDict = bracketsToDict(srcKeyObjDataList[k][GKLMAttributeType.CUSTOM_ATTRIBUTES.value])
-
-            # Now trim out all non-NetApp keys and update custSrCAttribDict.
-            tmpDict = {}
-            for t_key in custSrcAttribDict.keys():
-                if NetAppCustomAttribute.NETAPPHEADER.value in t_key:
-                    tmpDict[t_key] = custSrcAttribDict[t_key]
-            custSrcAttribDict = tmpDict.copy()
-
-            # Finally, place it in the CipherTrust format and copy it over.
-            custAttribList = []
-            for t_key in custSrcAttribDict:
-                tmpDict.clear()
-                tmpDict[NetAppMetaAttribute.TYPE.value] = NetAppMetaAttribute.TYPE_VALUE.value
-                tmpDict[NetAppMetaAttribute.INDEX.value] = 0
-                tmpDict[t_key] = custSrcAttribDict[t_key]
-
-                # add each attribute dictionary to the overall list of attributes
-                custAttribList.append(tmpDict.copy()) 
-
-            # Add the custom attribute list to the destination key object
-            xKeyObj[CMAttributeType.META.value][NetAppMetaAttribute.KMIP.value]= {NetAppMetaAttribute.CUSTOM.value: custAttribList}
-
-        # After assembling the key object, append it to the list of other key objects
-        xKeyObjList.append(xKeyObj.copy())
-
-        # print("\n Key Obj: ", json.dumps(xKeyObj, skipkeys = True, allow_nan = True, indent = 3))
-
+    xKeyObjList = []
+    if not streamObjects:
+        xKeyObjList = [mapper.mapKeyObj(t_obj) for t_obj in srcKeyObjDataList]
 
     # -------------- SECRET OBJECT MAPPING ------------------------------------------------------------- 
     # For each SECRET object in the source, map it with the proper dictionary keys to a x-formed list of 
-    # dictionaries for later upload to the destination
+    # dictionaries for later upload to the destination (see KRestMapper.mapSecretObj)
     # -----------------------------------------------------------------------------------------------
-    if includeSecrets: 
-        #  Create Secret object dictionary and list to map GKLM keys and values to CM
-        xSecretObj     = {}
-        xSecretObjList = []
-
-        for k in range(srcSecretObjCnt):
-            # GKLM does not use alias for Secrets.  So we are copying the Name into the CM Alias.  
-            # However, GKLM includes brakcets ("[]") in the string and they need to be removed 
-            # before copying the true name value to CM
-            t_name  = returnBracketValue(srcSecretObjDataList[k][GKLMAttributeType.NAME.value])
-            xSecretObj[CMAttributeType.NAME.value] = t_name
-
-            # Copy name into Alias component of dst object
-            t_aliasList = [{CMAliasesAttribute.ALIAS.value:t_name, CMAliasesAttribute.TYPE.value:"string", CMAliasesAttribute.INDEX.value:0}]
-            xSecretObj[CMAttributeType.ALIASES.value] = t_aliasList
-
-            # GKLM stores the Usage Mask as a string.  CM stores it a the associated KMIP value.  As such,
-            # The GKLM Usage Mask string must be replaced with the appropriate value before storing it in CM.
-            xSecretObj[CMAttributeType.USAGE_MASK.value]    = mapKeyUsage(srcSecretObjDataList[k][GKLMAttributeType.CRYPTOGRAPHIC_USAGE_MASK.value], keyUsageDict)
-            xSecretObj[CMAttributeType.STATE.value]         = srcSecretObjDataList[k][GKLMAttributeType.SECRET_STATE.value].replace("_","-").title()
-            xSecretObj[CMAttributeType.ALGORITHM.value]     = CMSecretAlgorithType.SECRET_SEED.value # CM seems to store them all as "SECRETESEED"
-            xSecretObj[CMAttributeType.OBJECT_TYPE.value]   = CMSecretObjectType.SECRET_DATA.value # CM seems to store them all as "Secret Data"
-            xSecretObj[CMAttributeType.SIZE.value]          = int(srcSecretObjDataList[k][GKLMAttributeType.SECRET_CRYPOGRAPHIC_LENGTH.value])
-
-            # In GKLM, the Secret Object Type appears as "PASSWORD".  However, CM uses the term "Secret Data" for 
-            # CM Object Type and "seed" for Data Type.  Let's copy the OBJECT TYPE string for now into CMs dataType.
-            xSecretObj[CMSecretAttributeType.DATA_TYPE.value] = str(srcSecretObjDataList[k][GKLMAttributeType.TYPE.value]).lower()
-
-            # Finally, copy the actual material and format
-            xSecretObj[CMAttributeType.MATERIAL.value]     = srcSecretObjDataList[k][GKLMAttributeType.KEY_BLOCK.value]['KEY_MATERIAL']
-            xSecretObj[CMAttributeType.FORMAT.value]       = srcSecretObjDataList[k][GKLMAttributeType.KEY_BLOCK.value]['KEY_FORMAT'].lower()
-        
-            # Add a userID to the associated Secret object so it can be made owner of the Secret
-            # when uploaded to CM
-            xSecretObj[CMAttributeType.META.value]= {CMAttributeType.OWNER_ID.value: CM_userID}
-
-            # Check for Custom Attributes and if they exist, add them as Meta data to destination
-            srcCustomAttributesIsPresent, srcNetAppAttributesArePresent = checkForSrcCustomAttributes(srcSecretObjDataList[k])
-            if srcNetAppAttributesArePresent:
-                custSrcAttribDict = bracketsToDict(srcSecretObjDataList[k][GKLMAttributeType.CUSTOM_ATTRIBUTES.value])
-
-                # Now trim out all non-NetApp keys and update custSrcAttribDict.
-                tmpDict = {}
-                for t_key in custSrcAttribDict.keys():
-                    if NetAppCustomAttribute.NETAPPHEADER.value in t_key:
-                        tmpDict[t_key] = custSrcAttribDict[t_key]
-                custSrcAttribDict = tmpDict.copy()
-
-                # Finally, place it in the CipherTrust format and copy it over.
-                custAttribList = []
-                for t_key in custSrcAttribDict:
-                    tmpDict.clear()
-                    tmpDict[NetAppMetaAttribute.TYPE.value] = NetAppMetaAttribute.TYPE_VALUE.value
-                    tmpDict[NetAppMetaAttribute.INDEX.value] = 0
-                    tmpDict[t_key] = custSrcAttribDict[t_key]
-
-                    # add each attribute dictionary to the overall list of attributes
-                    custAttribList.append(tmpDict.copy()) 
-
-                # Add the custom attribute list to the destination secret object
-                xSecretObj[CMAttributeType.META.value][NetAppMetaAttribute.KMIP.value]= {NetAppMetaAttribute.CUSTOM.value: custAttribList}
-
-            # After assembling the Secret object, append it to the list of other Secret objects
-            xSecretObjList.append(xSecretObj.copy())
-            # print("\n Secret Obj: ", json.dumps(xSecretObj, skipkeys = True, allow_nan = True, indent = 3))
+    xSecretObjList = []
+    if includeSecrets and not streamObjects: 
+        xSecretObjList = [mapper.mapSecretObj(t_obj) for t_obj in srcSecretObjDataList]
    
     # ----------------------------------------------------------------------------------------------
     # Now that the keys have been read and mapped, send them to the destiation.  
@@ -536,64 +897,90 @@ if listOnly == listOnlyOption.NEITHER.value:
     # The first step is to ensure that if the dstUserGroup name is provided, that it exists on the
     # destination server.  If it does not exist, create it and add the dstUsr to the group.
     # ----------------------------------------------------------------------------------------------
+    setMetricsPhase(metricsPhase.IMPORT.value)
 
     if args.dstUserGroupName is not None:
         if t_flagGroupIsAbsent:
-            if isAuthStrRefreshNeeded(dstAuthBornOn):  # test for refresh
-                dstAuthStr, dstAuthBornOn = createDstAuthStr(dstHost, dstPort, dstUser, dstPass)
-                print(colored("  --> Destination Authorization String Refreshed", "light_yellow", attrs=["bold"]))
+            dstAuthStr = dstAuth.getAuthStr()
             createDstUsrGroup(dstHost, dstPort, dstAuthStr, dstUserGroupName)
             addDstUsrToGroup(dstHost, dstPort, dstAuthStr, CM_userNickname, CM_userID, dstUserGroupName)
             print(" * ", dstUserGroupName, "group configuration complete. * ")
     
     # ----------------------------------------------------------------------------------------------
-    # IMPORT Key Material into Destination
+    # If skipping existing objects, index the destination (once) and remove the objects that
+    # are already present.  When streaming, the objects are checked as they are imported.
     # ----------------------------------------------------------------------------------------------
-    print("\n*** Importing KEY material into destination... ***")
-    
-    if isAuthStrRefreshNeeded(dstAuthBornOn):  # test for refresh
-        dstAuthStr, dstAuthBornOn = createDstAuthStr(dstHost, dstPort, dstUser, dstPass)
-        print(colored("  --> Destination Authorization String Refreshed", "light_yellow", attrs=["bold"]))
-
-    for xKeyObj in xKeyObjList:
-        t_keyObjName = xKeyObj[CMAttributeType.NAME.value]
-        print("\n xKeyObjName: ",  t_keyObjName)
+    if skipExisting:
+        print("\n*** Indexing existing destination objects... ***")
+        dstObjIndex = createDstObjIndex(getDstObjList(dstHost, dstPort, dstAuth.getAuthStr(), dstPageSize, dstListWorkers))
+        print("    %s destination objects indexed" %(len(dstObjIndex)))
 
-        if isAuthStrRefreshNeeded(dstAuthBornOn):  # test for refresh
-            dstAuthStr, dstAuthBornOn = createDstAuthStr(dstHost, dstPort, dstUser, dstPass)
-            print(colored("  --> Destination Authorization String Refreshed", "light_yellow", attrs=["bold"]))
-
-        success = importDstDataKeyObject(dstHost, dstPort, dstUser, dstAuthStr, xKeyObj)
-        print(" --> importDstDataKeyOjbect Success:", success)
-        
-        # After the object has been successfully created, assign it to the Group, if one has been provided.
-        if success:
-            if args.dstUserGroupName is not None:
-                xKeyObjFromDst = getDstKeyByName(dstHost, dstPort, dstAuthStr, t_keyObjName)                
-                addDataObjectToGroup(dstHost, dstPort, dstUserGroupName, dstAuthStr, xKeyObjFromDst)
+        if not streamObjects:
+            xKeyObjList, srcKeyObjDataList = skipExistingDstObjs(xKeyObjList, srcKeyObjDataList)
+            xSecretObjList, srcSecretObjDataList = skipExistingDstObjs(xSecretObjList, srcSecretObjDataList)
 
     # ----------------------------------------------------------------------------------------------
-    # IMPORT Secret Material into Destination
+    # STREAM Key and Secret Material into Destination
     # ----------------------------------------------------------------------------------------------
-    if includeSecrets:
-        print("\n*** Importing SECRET material into destination... ***")
+    if streamObjects:
+        print("\n*** Streaming KEY%s material into destination... ***" %(" and SECRET" if includeSecrets else ""))
+        setMetricsPhase(metricsPhase.STREAM.value)
+
+        streamCountDict = runStreamingMigration(srcHost, srcPort, srcAuthStr, srcUser, srcClientWorkList, srcUUID, 
+                                                includeSecrets, addClientUser, srcWorkers, srcNetAppFilterDict,
+                                                dstHost, dstPort, dstUser, dstPass, CM_userID, dstGroupName, streamQueueSize,
+                                                srcListingFilter, recordDstImport, isExistingDstObj if skipExisting else None, dstWorkers)
+
+        tmpstr = "\n Number of Src List Keys: %s\n Number of filtered and exportable Src Key Objects: %s\n Number of Key Objects imported: %s" %(srcKeyListCnt, streamCountDict["keys"], streamCountDict["keysImported"])
+        print(colored(tmpstr, "light_yellow", attrs=["bold"]))
+
+        if includeSecrets:
+            tmpstr = "\n Number of Src List Secrets: %s\n Number of filtered and exportable Src Secret Objects: %s\n Number of Secret Objects imported: %s" %(srcSecretListCnt, streamCountDict["secrets"], streamCountDict["secretsImported"])
+            print(colored(tmpstr, "light_yellow", attrs=["bold"]))
+
+    else:
+        # ----------------------------------------------------------------------------------------------
+        # IMPORT Key Material into Destination
+        # ----------------------------------------------------------------------------------------------
+        print("\n*** Importing KEY material into destination... ***")
+
+        if asyncEngine is not None:
+            keySuccessList = asyncEngine.run(asyncEngine.importDstObjList(dstHost, dstPort, dstUser, dstPass, xKeyObjList, False,
+                                                                          [t_obj[GKLMAttributeType.UUID.value] for t_obj in srcKeyObjDataList], recordDstImport))
+        else:
+            keySuccessList = importDstObjList(dstHost, dstPort, dstUser, dstAuth, xKeyObjList, False, dstWorkers,
+                                              [t_obj[GKLMAttributeType.UUID.value] for t_obj in srcKeyObjDataList], recordDstImport)
+
+        tmpstr = "\n Number of Key Objects imported: %s of %s" %(keySuccessList.count(True), len(keySuccessList))
+        print(colored(tmpstr, "light_yellow", attrs=["bold"]))
+
+        # ----------------------------------------------------------------------------------------------
+        # IMPORT Secret Material into Destination
+        # ----------------------------------------------------------------------------------------------
+        if includeSecrets:
+            print("\n*** Importing SECRET material into destination... ***")
     
-        for xSecretObj in xSecretObjList:
-            t_SecretObjName = xSecretObj[CMAttributeType.NAME.value]
-            print("\n xSecretObjName: ",  t_SecretObjName)
+            if asyncEngine is not None:
+                secretSuccessList = asyncEngine.run(asyncEngine.importDstObjList(dstHost, dstPort, dstUser, dstPass, xSecretObjList, True,
+                                                                                 [t_obj[GKLMAttributeType.UUID.value] for t_obj in srcSecretObjDataList], recordDstImport))
+            else:
+                secretSuccessList = importDstObjList(dstHost, dstPort, dstUser, dstAuth, xSecretObjList, True, dstWorkers,
+                                                     [t_obj[GKLMAttributeType.UUID.value] for t_obj in srcSecretObjDataList], recordDstImport)
+
+            tmpstr = "\n Number of Secret Objects imported: %s of %s" %(secretSuccessList.count(True), len(secretSuccessList))
+            print(colored(tmpstr, "light_yellow", attrs=["bold"]))
+
+    if skipExisting:
+        tmpstr = "\n Objects skipped as already present in destination: %s identical, %s without fingerprint, %s conflicting" %(dstExistingCntDict[dstIndexStatus.IDENTICAL.value], 
+                                                                                                                                  dstExistingCntDict[dstIndexStatus.PRESENT.value], 
+                                                                                                                                  dstExistingCntDict[dstIndexStatus.CONFLICT.value])
+        print(colored(tmpstr, "light_yellow", attrs=["bold"]))
 
-            if isAuthStrRefreshNeeded(dstAuthBornOn):  # test for refresh
-                dstAuthStr, dstAuthBornOn = createDstAuthStr(dstHost, dstPort, dstUser, dstPass)
-                print(colored("  --> Destination Authorization String Refreshed", "light_yellow", attrs=["bold"]))
+    if journal is not None:
+        journal.close()
 
-            success = importDstDataSecretObject(dstHost, dstPort, dstUser, dstAuthStr, xSecretObj)
-            print(" --> importDstDataSecretOjbect Success:", success)
-        
-            # After the object has been successfully created, assign it to the Group, if one has been provided.
-            if success:
-                if args.dstUserGroupName is not None:
-                    xSecretObjFromDst = getDstKeyByName(dstHost, dstPort, dstAuthStr, t_SecretObjName)                
-                    addDataObjectToGroup(dstHost, dstPort, dstUserGroupName, dstAuthStr, xSecretObjFromDst)
+    if ledger is not None:
+        ledger.close()
 
 if listOnly != listOnlyOption.SOURCE.value:
 ###########################################################################################################        
@@ -601,17 +988,57 @@ if listOnly != listOnlyOption.SOURCE.value:
 ########################################################################################################### 
 
     print("\nRetrieving list of objects from destination...")
-    dstAuthStr, dstAuthBornOn = createDstAuthStr(dstHost, dstPort, dstUser, dstPass) # refresh authStr
-
-    dstObjList      = getDstObjList(dstHost, dstPort, dstAuthStr)
+    setMetricsPhase(metricsPhase.DESTINATION.value)
+    dstObjList      = getDstObjList(dstHost, dstPort, dstAuth.getAuthStr(), dstPageSize, dstListWorkers)
     dstObjListCnt   = len(dstObjList)
     tmpstr = "\n Dst Object List Count: %s" %(dstObjListCnt)
     print(colored(tmpstr, "light_yellow", attrs=["bold"]))
 
-    # Now that name information has been collected, export the data for each key
+    if verifyObjects:
+        # The listing already includes the fingerprint of each object, so the source objects are 
+        # verified against it and the destination material is not exported.
+        print("\nVerifying source objects against destination fingerprints...")
+        t_mapper        = KRestMapper(CM_userID)
+        t_xObjList      = [t_mapper.mapKeyObj(t_obj) for t_obj in srcVerifyKeyObjDataList]
+        t_srcUUIDList   = [t_obj[GKLMAttributeType.UUID.value] for t_obj in srcVerifyKeyObjDataList]
+        if includeSecrets:
+            t_xObjList.extend([t_mapper.mapSecretObj(t_obj) for t_obj in srcVerifySecretObjDataList])
+            t_srcUUIDList.extend([t_obj[GKLMAttributeType.UUID.value] for t_obj in srcVerifySecretObjDataList])
+
+        t_verifyList    = verifyDstObjList(t_xObjList, createDstObjIndex(dstObjList), verifyWorkers)
+        for t_srcUUID, t_xObj, t_status in zip(t_srcUUIDList, t_xObjList, t_verifyList):
+            reportObj(reportStage.VERIFY.value, t_srcUUID, t_xObj[CMAttributeType.NAME.value], t_xObj[CMAttributeType.OBJECT_TYPE.value], t_status)
+            if quietConsole:
+                continue
+
+            if t_status == dstIndexStatus.ABSENT.value:
+                print(colored("    MISSING:  %s" %(t_xObj[CMAttributeType.NAME.value]), "light_red", attrs=["bold"]))
+            elif t_status == dstIndexStatus.CONFLICT.value:
+                print(colored("    MISMATCH: %s" %(t_xObj[CMAttributeType.NAME.value]), "light_red", attrs=["bold"]))
+
+        tmpstr = "\n Verified Objects: %s of %s (%s missing, %s mismatched, %s without fingerprint)" %(t_verifyList.count(dstIndexStatus.IDENTICAL.value), len(t_verifyList),
+                                                                                                        t_verifyList.count(dstIndexStatus.ABSENT.value),
+                                                                                                        t_verifyList.count(dstIndexStatus.CONFLICT.value),
+                                                                                                        t_verifyList.count(dstIndexStatus.PRESENT.value))
+        print(colored(tmpstr, "light_yellow", attrs=["bold"]))
+
+    # A shard only exports (and reports) the destination objects of the source objects it listed (see
+    # srcListingFilter), so that the shards do not all export the whole destination.  Verification uses
+    # the whole listing.
+    if shard is not None and listOnly != listOnlyOption.DESTINATION.value:
+        dstObjList  = [t_obj for t_obj in dstObjList if t_obj[CMAttributeType.NAME.value] in shardObjNameSet]
+        tmpstr = " Dst Objects of Shard %s: %s" %(shard, len(dstObjList))
+        print(colored(tmpstr, "light_yellow", attrs=["bold"]))
+
+    if verifyObjects:
+        dstObjData  = dstObjList
+
+    # Otherwise, now that name information has been collected, export the data for each key
     # THIS INCLUDES the META Data and the Key Material
-    dstObjData      = exportDstObjData(dstHost, dstPort, dstObjList, dstUser, dstPass)
-    dstAuthStr, dstAuthBornOn = createDstAuthStr(dstHost, dstPort, dstUser, dstPass) # refresh authStr
+    elif asyncEngine is not None:
+        dstObjData  = asyncEngine.run(asyncEngine.exportDstObjData(dstHost, dstPort, dstObjList, dstUser, dstPass))
+    else:
+        dstObjData  = exportDstObjData(dstHost, dstPort, dstObjList, dstUser, dstPass, dstWorkers)
 
     # Filter and show NetApp specific information.
     if len(srcNetAppFilterDict) > 0:
@@ -622,12 +1049,39 @@ if listOnly != listOnlyOption.SOURCE.value:
     tmpstr = " Dst Exportable Data Object Count: %s" %(dstExpObjCnt)
     print(colored(tmpstr, "light_yellow", attrs=["bold"]))
 
+    for t_obj in dstObjList:
+        reportObj(reportStage.DESTINATION.value, t_obj.get(CMAttributeType.UUID.value, ""), t_obj.get(CMAttributeType.NAME.value, ""),
+                  t_obj.get(CMAttributeType.OBJECT_TYPE.value, ""), REPORT_STATUS_LISTED)
+
     # printDstObjDataAndOwner(dstObjData, dstUsrsAllDict)
-    printDstObjDataAndOwner(dstObjList, dstUsrsAllDict)
+    if not quietConsole:
+        printDstObjDataAndOwner(dstObjList, dstUsrsAllDict)
     
     tmpstr = "\n --- DST OBJECT RETRIEVAL COMPLETE --- \n"
     print(colored(tmpstr, "light_green", attrs=["bold"]))
 
+if listingCache is not None:
+    tmpstr = " Source listings: %s from cache, %s revalidated, %s downloaded" %(listingCache.cntDict["hits"], listingCache.cntDict["revalidated"], listingCache.cntDict["downloaded"])
+    print(colored(tmpstr, "light_yellow", attrs=["bold"]))
+
+tmpstr = " Retries: %s" %(getRetryPolicy().getSummaryStr())
+print(colored(tmpstr, "light_yellow", attrs=["bold"]))
+
+for limiter in getLimiterList():
+    tmpstr = " Adaptive Concurrency %s: %s\n   Limit over time: %s" %(limiter.label, limiter.getSummaryStr(), limiter.getTimelineStr())
+    print(colored(tmpstr, "light_yellow", attrs=["bold"]))
+
+if getReport() is not None:
+    getReport().close()
+    tmpstr = " Report: %s (%s)" %(reportFile, getReport().getCountStr())
+    print(colored(tmpstr, "light_yellow", attrs=["bold"]))
+
+if listOnly != listOnlyOption.SOURCE.value:
+    dstAuth.close()
+
+if asyncEngine is not None:
+    asyncEngine.close()
+
 
 
 #####################################################################################
@@ -0,0 +1,422 @@
+# key-rest-async
+#
+# definition file of the asyncio-based transport engine.  It provides
+# coroutine versions of the REST Commands used to read objects from
+# the source server and to write them to the destination server.
+#
+# The engine requires the optional aiohttp package:  pip install aiohttp
+#
+######################################################################
+import  asyncio
+import  json
+import  time
+from    kerrors import *
+from    krestauth import *
+from    krestenums import *
+from    krestcmds import *
+from    krestmetrics import *
+from    krestreport import *
+from    krestretry import *
+from    termcolor import colored
+
+try:
+    import  aiohttp
+except ImportError:
+    aiohttp = None
+
+# ---------------- CONSTANTS -----------------------------------------------------
+DEFAULT_IN_FLIGHT   = 100   # maximum number of outstanding requests
+
+class KRestAsyncResponse:
+# -------------------------------------------------------------------------------
+# The parts of an aiohttp response that are needed once the response has been
+# read.  The attribute names match those of a requests response so that
+# kPrintError can report errors from either engine.
+# -------------------------------------------------------------------------------
+    def __init__(self, t_status, t_reason, t_data):
+        self.status_code    = t_status
+        self.reason         = t_reason
+        self.data           = t_data
+
+    def json(self):
+        return self.data
+
+    def __str__(self):
+        return "<Response [%s]>" %(self.status_code)
+
+class KRestAsyncEngine:
+# -------------------------------------------------------------------------------
+# All coroutines of an engine run over a SINGLE event loop and share a single
+# aiohttp session.  No more than t_inFlight requests are outstanding at any time.
+#
+# Since k-rest.py is not itself a coroutine, the run() method is used to
+# execute a coroutine of the engine on the engine's event loop.
+# -------------------------------------------------------------------------------
+    def __init__(self, t_inFlight=DEFAULT_IN_FLIGHT, t_timeout=60):
+        if aiohttp is None:
+            print("  --> The ASYNCIO engine requires the aiohttp package (pip install aiohttp)")
+            exit()
+
+        self.inFlight       = t_inFlight
+        self.timeout        = t_timeout
+        self.loop           = asyncio.new_event_loop()
+        self.session        = None
+        self.semaphore      = None
+
+    def run(self, t_coroutine):
+        return self.loop.run_until_complete(t_coroutine)
+
+    def close(self):
+        if self.session is not None:
+            self.run(self.session.close())
+        self.loop.close()
+
+    async def send(self, t_method, t_url, t_headers, t_data, t_limiter=None):
+    # ---------------------------------------------------------------------------
+    # Send one request (once t_limiter, if any, allows it), add its status and
+    # duration to the request metrics and return the response and its text
+    # ---------------------------------------------------------------------------
+        if t_limiter is not None:
+            await t_limiter.acquireAsync()
+
+        t_start     = time.perf_counter()
+        t_status    = METRICS_STATUS_EXCEPTION
+        try:
+            async with self.session.request(t_method, t_url, headers=t_headers, data=t_data) as r:
+                t_text = await r.text()
+            t_status = r.status
+        finally:
+            t_secs = time.perf_counter() - t_start
+            recordRequest(t_method, t_url, t_status, t_secs)
+            if t_limiter is not None:
+                t_limiter.release(t_secs, t_status)
+
+        return r, t_text
+
+    async def mapBounded(self, t_fn, t_itemList, t_limit=None):
+    # ---------------------------------------------------------------------------
+    # Return the result of the coroutine function t_fn for each item of
+    # t_itemList, in list order.  No more than t_limit (by default inFlight)
+    # coroutines exist at once (each one processes items until none are left),
+    # so that the memory used does not depend on the number of items.
+    # ---------------------------------------------------------------------------
+        if t_limit is None:
+            t_limit = self.inFlight
+
+        t_resultList    = [None] * len(t_itemList)
+        t_itemIter      = iter(enumerate(t_itemList))
+
+        async def worker():
+            for t_idx, t_item in t_itemIter:
+                t_resultList[t_idx] = await t_fn(t_item)
+
+        await asyncio.gather(*[worker() for t_workerIdx in range(min(t_limit, len(t_itemList)))])
+
+        return t_resultList
+
+    async def request(self, t_host, t_port, t_method, t_url, t_authStr=None, t_body=None, t_idempotent=None):
+    # ---------------------------------------------------------------------------
+    # Send a single REST request to the server t_host:t_port and return a
+    # KRestAsyncResponse.  The session is created on first use so that it is
+    # bound to the engine's event loop.
+    #
+    # Transient failures are retried as the retry policy allows (see
+    # KRestRetryPolicy).  t_idempotent marks POST requests that are safe to
+    # repeat, such as CM exports.  The backoff does not hold an in-flight slot.
+    # ---------------------------------------------------------------------------
+        if self.session is None:
+            t_connector     = aiohttp.TCPConnector(limit=self.inFlight, limit_per_host=0, ssl=False)
+            self.session    = aiohttp.ClientSession(connector=t_connector,
+                                                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                                    headers={"Content-Type":APP_JSON, "Accept":APP_JSON})
+            self.semaphore  = asyncio.Semaphore(self.inFlight)
+
+        # The token managers (see krestauth) and limiter of the server's session
+        # (see configureSession) are shared with the requests engine
+        t_kSession  = getSession(t_host, t_port)
+
+        t_headers = {}
+        t_data = None if t_body is None else json.dumps(t_body)
+
+        t_policy    = getRetryPolicy()
+        t_attempt   = 0
+        while True:
+            try:
+                async with self.semaphore:
+                    # Use the current authorization string when the request is actually sent
+                    if t_authStr is not None:
+                        t_headers["Authorization"] = t_kSession.getCurrentAuthStr(t_authStr)
+
+                    r, t_text = await self.send(t_method, t_url, t_headers, t_data, t_kSession.limiter)
+
+                    # If the authorization string has expired (or was revoked), renew it
+                    # (without blocking the event loop) and retry the request ONCE.
+                    if r.status == STATUS_CODE_UNAUTHORIZED and t_authStr is not None:
+                        t_newAuthStr = await self.loop.run_in_executor(None, t_kSession.renewAuthStr, t_headers["Authorization"])
+                        if t_newAuthStr is not None:
+                            t_headers["Authorization"] = t_newAuthStr
+                            r, t_text = await self.send(t_method, t_url, t_headers, t_data, t_kSession.limiter)
+
+                t_delay = t_policy.getRetryDelay(t_method, r.status, t_attempt, t_idempotent, t_retryAfter=r.headers.get("Retry-After"))
+                if t_delay is None:
+                    break
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                t_delay = t_policy.getRetryDelay(t_method, METRICS_STATUS_EXCEPTION, t_attempt, t_idempotent,
+                                                 isinstance(e, aiohttp.ClientConnectorError))
+                if t_delay is None:
+                    raise
+
+            await asyncio.sleep(t_delay)
+            t_attempt = t_attempt + 1
+
+        try:
+            t_json = json.loads(t_text) if len(t_text) > 0 else {}
+        except ValueError:
+            t_json = {}
+
+        return KRestAsyncResponse(r.status, r.reason, t_json)
+
+    async def getListing(self, t_host, t_port, t_url, t_authStr):
+    # ---------------------------------------------------------------------------
+    # GET a source listing.  If the listing cache is configured, the (blocking)
+    # cache lookup is run outside of the event loop.
+    # ---------------------------------------------------------------------------
+        if getListingCache() is None:
+            return await self.request(t_host, t_port, "GET", t_url, t_authStr)
+
+        return await self.loop.run_in_executor(None, getListing, t_host, t_port, t_url, {"Authorization":t_authStr})
+
+    # ---------------------------------------------------------------------------
+    # SOURCE
+    # ---------------------------------------------------------------------------
+
+    async def getSrcClients(self, t_srcHost, t_srcPort, t_srcAuthStr):
+    # ---------------------------------------------------------------------------
+    # Coroutine version of getSrcClients
+    # ---------------------------------------------------------------------------
+        t_srcHostRESTCmd    = "https://%s:%s%s" %(t_srcHost, t_srcPort, SRC_REST_PREAMBLE + "clients")
+
+        r = await self.getListing(t_srcHost, t_srcPort, t_srcHostRESTCmd, t_srcAuthStr)
+        if(r.status_code != STATUS_CODE_OK):
+            kPrintError("getSrcClients", r)
+            exit()
+
+        return r.json()[GKLMAttributeType.CLIENT.value]
+
+    async def setSrcClientUsers(self, t_srcHost, t_srcPort, t_srcAuthStr, t_client, t_userList, t_action):
+    # ---------------------------------------------------------------------------
+    # Coroutine version of assignSrcClientUsers (t_action = "assignUsers") and
+    # removeSrcClientUsers (t_action = "removeUsers")
+    # ---------------------------------------------------------------------------
+        t_srcHostRESTCmd    = "https://%s:%s%sclients/%s/%s" %(t_srcHost, t_srcPort, SRC_REST_PREAMBLE, t_client, t_action)
+
+        r = await self.request(t_srcHost, t_srcPort, "PUT", t_srcHostRESTCmd, t_srcAuthStr, {"users":t_userList})
+        if(r.status_code != STATUS_CODE_OK):
+            kPrintError(t_action, r)
+            exit()
+
+        return True
+
+    async def getSrcObjDataListByClient(self, t_srcHost, t_srcPort, t_srcAuthStr, t_suuid, t_objectType, t_client, t_listingFilter=None):
+    # ---------------------------------------------------------------------------
+    # Coroutine version of getSrcObjDataListByClient.  The key block of every
+    # (filtered) object in the client's listing is requested concurrently (see
+    # mapBounded).
+    # ---------------------------------------------------------------------------
+        t_srcRESTObjects    = SRC_REST_PREAMBLE + "objects?objectType=" + t_objectType
+        if len(t_client) > 0:
+            t_srcRESTObjects = t_srcRESTObjects + "&clientName=" + t_client
+
+        t_srcHostRESTCmd    = "https://%s:%s%s" %(t_srcHost, t_srcPort, t_srcRESTObjects)
+
+        r = await self.getListing(t_srcHost, t_srcPort, t_srcHostRESTCmd, t_srcAuthStr)
+        if(r.status_code != STATUS_CODE_OK):
+            kPrintError("getSrcObjDataListByClient", r)
+            return []
+
+        t_srcObj            = r.json()[MANAGED_OBJECT]
+        t_uuidObjList       = filterSrcObjListForRetrieval(t_srcObj, t_suuid, t_listingFilter, t_client)
+
+        # As with the requests engine, an object that cannot be read (once its request
+        # has been retried) is reported and skipped.
+        async def getDetail(t_obj):
+            t_srcObjID = t_obj[GKLMAttributeType.UUID.value]
+            try:
+                r = await self.request(t_srcHost, t_srcPort, "GET", "https://%s:%s%sobjects/%s" %(t_srcHost, t_srcPort, SRC_REST_PREAMBLE, t_srcObjID), t_srcAuthStr)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print("  --> getSrcObjDetail UUID %s: %s" %(t_srcObjID, repr(e)))
+                return None
+
+            if(r.status_code != STATUS_CODE_OK):
+                kPrintError("getSrcObjDetail", r)
+                return None
+
+            return r.json()[MANAGED_OBJECT]
+
+        t_srcObjDetailList  = []
+        t_skipCnt           = 0
+        for t_obj, t_data in zip(t_uuidObjList, await self.mapBounded(getDetail, t_uuidObjList)):
+            if t_data is None:
+                t_skipCnt = t_skipCnt + 1
+                reportObj(reportStage.SOURCE.value, t_obj[GKLMAttributeType.UUID.value], t_obj.get(GKLMAttributeType.ALIAS.value, ""),
+                          t_objectType, REPORT_STATUS_FAILED, t_client)
+                continue    # skip the object
+
+            t_data[GKLMAttributeType.CLIENT_NAME.value] = t_client # save associated client name
+            t_srcObjDetailList.append(t_data)
+
+        if t_skipCnt > 0:
+            tmpStr = "\n    WARNING: %s of %s objects of %s could not be retrieved and were skipped." %(t_skipCnt, len(t_uuidObjList), t_client)
+            print(colored(tmpStr, "light_red", attrs=["bold"]))
+
+        return t_srcObjDetailList
+
+    async def getSrcClientObjDataLists(self, t_srcHost, t_srcPort, t_srcAuthStr, t_srcUser, t_clientDict, t_suuid,
+                                       t_symKeyCount, t_secretCount, t_includeSecrets, t_addClientUser, t_listingFilter=None):
+    # ---------------------------------------------------------------------------
+    # Coroutine version of getSrcClientObjDataLists
+    # ---------------------------------------------------------------------------
+        t_clientName            = t_clientDict[GKLMAttributeType.CLIENT_NAME.value]
+        t_srcKeyObjDataList     = []
+        t_srcSecretObjDataList  = []
+        t_clientUserAdded       = False
+
+        if t_addClientUser and (t_srcUser not in t_clientDict[GKLMAttributeType.CLIENT_USERS.value]):
+            await self.setSrcClientUsers(t_srcHost, t_srcPort, t_srcAuthStr, t_clientName, [t_srcUser], "assignUsers")
+            t_clientUserAdded = True
+
+        try:
+            if int(t_symKeyCount) > 0:
+                print("       ...retrieving symmetric key information for %s... " %(t_clientName))
+                t_srcKeyObjDataList = await self.getSrcObjDataListByClient(t_srcHost, t_srcPort, t_srcAuthStr, t_suuid,
+                                                                           GKLMAttributeType.SYMMETRIC_KEY.value, t_clientName, t_listingFilter)
+
+            if t_includeSecrets and int(t_secretCount) > 0:
+                print("       ...retrieving secret data information for %s... " %(t_clientName))
+                t_srcSecretObjDataList = await self.getSrcObjDataListByClient(t_srcHost, t_srcPort, t_srcAuthStr, t_suuid,
+                                                                              GKLMAttributeType.SECRET_DATA.value, t_clientName, t_listingFilter)
+        finally:
+            if t_clientUserAdded:
+                await self.setSrcClientUsers(t_srcHost, t_srcPort, t_srcAuthStr, t_clientName, [t_srcUser], "removeUsers")
+                await self.setSrcClientUsers(t_srcHost, t_srcPort, t_srcAuthStr, t_clientName,
+                                             t_clientDict[GKLMAttributeType.CLIENT_USERS.value], "assignUsers")
+
+        return t_srcKeyObjDataList, t_srcSecretObjDataList
+
+    async def getSrcClientWorkList(self, t_srcHost, t_srcPort, t_srcAuthStr, t_srcUser, t_srcClientWorkList, t_suuid,
+                                   t_includeSecrets, t_addClientUser, t_listingFilter=None, t_clientWorkers=1):
+    # ---------------------------------------------------------------------------
+    # Retrieve the objects of the clients in t_srcClientWorkList ([client, key count,
+    # secret count]), t_clientWorkers clients at a time (see mapBounded), so that
+    # no more than t_clientWorkers clients have their ownership changed at once.
+    # Returns one entry per client, in order.  The entry is None if the client's
+    # objects could not be retrieved.
+    # ---------------------------------------------------------------------------
+        async def retrieveSrcClient(t_work):
+            t_clientDict, t_symKeyCount, t_secretCount = t_work
+            try:
+                return await self.getSrcClientObjDataLists(t_srcHost, t_srcPort, t_srcAuthStr, t_srcUser, t_clientDict, t_suuid,
+                                                           t_symKeyCount, t_secretCount, t_includeSecrets, t_addClientUser, t_listingFilter)
+            except (Exception, SystemExit) as e:
+                tmpStr = "\n    ERROR: Retrieval of objects for client %s failed and was skipped (%s)." %(t_clientDict[GKLMAttributeType.CLIENT_NAME.value], repr(e))
+                print(colored(tmpStr, "light_red", attrs=["bold"]))
+                return None
+
+        return await self.mapBounded(retrieveSrcClient, t_srcClientWorkList, t_clientWorkers)
+
+    # ---------------------------------------------------------------------------
+    # DESTINATION
+    # ---------------------------------------------------------------------------
+
+    async def exportDstObjData(self, t_dstHost, t_dstPort, t_dstObjList, t_dstUser, t_dstPass):
+    # ---------------------------------------------------------------------------
+    # Coroutine version of exportDstObjData
+    # ---------------------------------------------------------------------------
+        t_dstRESTAPI    = DST_REST_PREAMBLE + "vault/keys2"
+        t_dstAuth       = getDstAuth(t_dstHost, t_dstPort, t_dstUser, t_dstPass)
+
+        t_exportList        = [t_obj for t_obj in t_dstObjList if t_obj[CMAttributeType.UNEXPORTABLE.value] != True]
+        t_unexportableCnt   = len(t_dstObjList) - len(t_exportList)
+        if t_unexportableCnt > 0:
+            print("  Dst Objects *UNEXPORTABLE*: %s (not exported)" %(t_unexportableCnt))
+
+        async def exportObj(t_obj):
+            dstObjID            = t_obj[CMAttributeType.ID.value]
+            t_dstHostRESTCmd    = "https://%s:%s%s/%s/export" %(t_dstHost, t_dstPort, t_dstRESTAPI, dstObjID)
+
+            try:
+                r = await self.request(t_dstHost, t_dstPort, "POST", t_dstHostRESTCmd, t_dstAuth.getCurrentAuthStr(), t_idempotent=True)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print("  Obj ID:", dstObjID, repr(e))
+                return None
+
+            if(r.status_code != STATUS_CODE_OK):
+                print("  Obj ID:", dstObjID)
+                kPrintError("exportDstObjData", r)
+                return None
+
+            return r.json()
+
+        t_dstObjData = await self.mapBounded(exportObj, t_exportList)
+
+        return [t_data for t_data in t_dstObjData if t_data is not None]
+
+    async def importDstDataObject(self, t_dstHost, t_dstPort, t_dstAuthStr, t_xObj, t_dstRESTCmd, t_callerName):
+    # ---------------------------------------------------------------------------
+    # Coroutine version of importDstDataKeyObject (t_dstRESTCmd = "vault/keys2") and
+    # importDstDataSecretObject (t_dstRESTCmd = "vault/secrets")
+    # ---------------------------------------------------------------------------
+        t_dstHostRESTCmd    = "https://%s:%s%s%s" %(t_dstHost, t_dstPort, DST_REST_PREAMBLE, t_dstRESTCmd)
+
+        try:
+            r = await self.request(t_dstHost, t_dstPort, "POST", t_dstHostRESTCmd, t_dstAuthStr, t_xObj)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            tmpStr = "\n    ERROR: Import of %s failed (%s)." %(t_xObj[CMAttributeType.NAME.value], repr(e))
+            print(colored(tmpStr, "light_red", attrs=["bold"]))
+            return False
+
+        if(r.status_code != STATUS_CODE_CREATED):
+            kPrintError(t_callerName, r)
+            return False
+
+        return True
+
+    async def importDstObjList(self, t_dstHost, t_dstPort, t_dstUser, t_dstPass, t_xObjList, t_isSecret,
+                               t_srcUUIDList=None, t_resultFn=None):
+    # ---------------------------------------------------------------------------
+    # Import every object in t_xObjList concurrently (see mapBounded).  Group permissions (if any)
+    # are part of the mapped objects and are applied by the import itself.
+    #
+    # If t_resultFn is provided, it is called as t_resultFn(source UUID, object,
+    # success) as soon as each object has been processed.  t_srcUUIDList holds the
+    # source UUID of each object in t_xObjList.
+    #
+    # The destination bearer token is kept current by the shared token manager of
+    # the destination (see KRestDstAuth), which the coroutines never wait for.
+    # Returns the success of each object, in list order.
+    # ---------------------------------------------------------------------------
+        if t_isSecret:
+            t_dstRESTCmd, t_callerName, t_label = "vault/secrets", "importDstDataSecretObject", "Secret"
+        else:
+            t_dstRESTCmd, t_callerName, t_label = "vault/keys2", "importDstDataKeyObject", "Key"
+
+        t_dstAuth = getDstAuth(t_dstHost, t_dstPort, t_dstUser, t_dstPass)
+
+        async def importObj(t_idx):
+            t_xObj      = t_xObjList[t_idx]
+            t_success = await self.importDstDataObject(t_dstHost, t_dstPort, t_dstAuth.getCurrentAuthStr(), t_xObj, t_dstRESTCmd, t_callerName)
+
+            if t_resultFn is not None:
+                t_resultFn(t_srcUUIDList[t_idx], t_xObj, t_success)
+
+            return t_success
+
+        t_successList = await self.mapBounded(importObj, range(len(t_xObjList)))
+
+        if not isQuiet():
+            for t_xObj, t_success in zip(t_xObjList, t_successList):
+                print("\n x%sObjName: " %(t_label), t_xObj[CMAttributeType.NAME.value])
+                print(" --> importDstData%sOjbect Success:" %(t_label), t_success)
+
+        return t_successList
@@ -0,0 +1,225 @@
+# key-rest-auth
+#
+# definition file of the token managers of the source and destination
+# servers.  One token manager exists per server login and is shared by
+# all threads (and the asyncio engine) sending REST Commands to it.
+#
+######################################################################
+import  json
+import  threading
+from    datetime import datetime, timedelta
+from    kerrors import *
+from    krestsession import *
+from    termcolor import colored
+
+# ---------------- CONSTANTS -----------------------------------------------------
+STATUS_CODE_OK          = 200
+
+SRC_LOGIN_CMD           = "/SKLM/rest/v1/ckms/login"
+DST_TOKENS_CMD          = "/api/v1/auth/tokens/"
+
+DEFAULT_TOKEN_DURATION  = 300   # seconds (CM default) if the destination does not report it
+TOKEN_REFRESH_FRACTION  = 0.75  # refresh once this fraction of the token lifetime has passed
+TOKEN_MIN_REFRESH_WAIT  = 5     # seconds
+
+class KRestAuth:
+# -------------------------------------------------------------------------------
+# Base class of the token managers.  A token manager logs in to a server, holds
+# the current authorization string and renews it:
+#
+#   - when a request is rejected as UNAUTHORIZED (see KRestSession.sendAuthorized), and
+#   - (destination only) in the background, before the token expires.
+#
+# The renewal is performed by one thread only.  Other threads that need the
+# token at the same time wait for it and then use the new token.  Coroutines of
+# the asyncio engine never wait (see getCurrentAuthStr).
+# -------------------------------------------------------------------------------
+    def __init__(self, t_host, t_port, t_user, t_pass):
+        self.host           = t_host
+        self.port           = t_port
+        self.user           = t_user
+        self.password       = t_pass
+        self.lock           = threading.RLock()
+        self.authStr        = ""
+        self.issuedSet      = set()     # all authorization strings issued by this manager
+
+        with self.lock:
+            self.login()
+
+        # Route UNAUTHORIZED responses of the server's session to this manager
+        getSession(t_host, t_port).addAuth(self)
+
+    def setAuthStr(self, t_authStr):
+        self.authStr = t_authStr
+        self.issuedSet.add(t_authStr)
+
+    def getAuthStr(self):
+        with self.lock:
+            return self.authStr
+
+    def getCurrentAuthStr(self):
+        # Return the current authorization string without waiting for a renewal in
+        # progress (or starting one), for callers that must not block, such as the
+        # event loop of the asyncio engine.
+        return self.authStr
+
+    def renewAfterUnauthorized(self, t_oldAuthStr):
+        # Returns the authorization string to use instead of t_oldAuthStr or None
+        # if t_oldAuthStr was not issued by this manager.
+        with self.lock:
+            if t_oldAuthStr not in self.issuedSet:
+                return None
+
+            # Renew only if no other thread has already done so
+            if t_oldAuthStr == self.authStr:
+                self.renew()
+                print(colored("  --> %s Authorization String Renewed (unauthorized)" %(self.label), "light_yellow", attrs=["bold"]))
+
+            return self.authStr
+
+class KRestSrcAuth(KRestAuth):
+# -------------------------------------------------------------------------------
+# Token manager of the source (GKLM) server.  GKLM does not report the lifetime
+# of its tokens, so the token is renewed (by logging in again) when a request is
+# rejected as UNAUTHORIZED.
+# -------------------------------------------------------------------------------
+    label = "Source"
+
+    def login(self):
+        t_srcHostRESTCmd    = "https://%s:%s%s" %(self.host, self.port, SRC_LOGIN_CMD)
+        t_srcBody           = {"userid":self.user, "password":self.password}
+
+        r = getSession(self.host, self.port).post(t_srcHostRESTCmd, t_idempotent=True, data=json.dumps(t_srcBody))
+        if(r.status_code != STATUS_CODE_OK):
+            kPrintError("KRestSrcAuth.login", r)
+            exit()
+
+        self.setAuthStr("SKLMAuth UserAuthId=" + r.json()['UserAuthId'])
+
+    def renew(self):
+        self.login()
+
+class KRestDstAuth(KRestAuth):
+# -------------------------------------------------------------------------------
+# Token manager of the destination (CM) server.  The bearer token is renewed in
+# the background once TOKEN_REFRESH_FRACTION of its lifetime has passed.  The
+# renewal uses the refresh token returned by the login rather than the password.
+# The password is only used again if the refresh token is rejected.
+#
+# A token that is due for renewal is still valid for the rest of its lifetime, so
+# callers that must not block use it and wake the background renewal instead.
+# -------------------------------------------------------------------------------
+    label = "Destination"
+
+    def __init__(self, t_host, t_port, t_user, t_pass):
+        self.refreshToken   = None
+        self.duration       = DEFAULT_TOKEN_DURATION
+        self.bornOn         = datetime.now()
+        self.stopEvent      = threading.Event()
+        self.wakeEvent      = threading.Event()     # renew now (see getCurrentAuthStr)
+
+        KRestAuth.__init__(self, t_host, t_port, t_user, t_pass)
+
+        self.refresher      = threading.Thread(target=self.refreshLoop, name="dstTokenRefresh", daemon=True)
+        self.refresher.start()
+
+    def requestToken(self, t_dstBody):
+        t_dstHostRESTCmd    = "https://%s:%s%s" %(self.host, self.port, DST_TOKENS_CMD)
+        return getSession(self.host, self.port).post(t_dstHostRESTCmd, t_idempotent=True, data=json.dumps(t_dstBody))
+
+    def setToken(self, t_response):
+        t_tokenDict         = t_response.json()
+        self.refreshToken   = t_tokenDict.get("refresh_token", self.refreshToken)
+        self.duration       = t_tokenDict.get("duration", DEFAULT_TOKEN_DURATION)
+        self.bornOn         = datetime.now()
+        self.setAuthStr("Bearer " + t_tokenDict['jwt'])
+
+    def login(self):
+        r = self.requestToken({"name":self.user, "password":self.password})
+        if(r.status_code != STATUS_CODE_OK):
+            kPrintError("KRestDstAuth.login", r)
+            exit()
+
+        self.setToken(r)
+
+    def renew(self):
+        if self.refreshToken is not None:
+            r = self.requestToken({"grant_type":"refresh_token", "refresh_token":self.refreshToken})
+            if(r.status_code == STATUS_CODE_OK):
+                self.setToken(r)
+                return
+
+        self.login()    # refresh token rejected (or not provided)
+
+    def getRefreshTime(self):
+        return self.bornOn + timedelta(seconds=self.duration * TOKEN_REFRESH_FRACTION)
+
+    def getAuthStr(self):
+        with self.lock:
+            # In case the background renewal has been delayed
+            if datetime.now() > self.getRefreshTime():
+                self.renew()
+                print(colored("  --> Destination Authorization String Refreshed", "light_yellow", attrs=["bold"]))
+
+            return self.authStr
+
+    def getCurrentAuthStr(self):
+        # In case the background renewal has been delayed, wake it rather than renew here
+        if datetime.now() > self.getRefreshTime():
+            self.wakeEvent.set()
+
+        return self.authStr
+
+    def refreshLoop(self):
+        while True:
+            with self.lock:
+                t_waitSecs = (self.getRefreshTime() - datetime.now()).total_seconds()
+
+            # woken early if a token due for renewal is used (see getCurrentAuthStr)
+            self.wakeEvent.wait(max(t_waitSecs, TOKEN_MIN_REFRESH_WAIT))
+            self.wakeEvent.clear()
+            if self.stopEvent.is_set():
+                return  # stopped
+
+            with self.lock:
+                if datetime.now() > self.getRefreshTime():
+                    try:
+                        self.renew()
+                        print(colored("  --> Destination Authorization String Refreshed", "light_yellow", attrs=["bold"]))
+                    except (Exception, SystemExit) as e:
+                        # leave it to the next request (or the next attempt) to renew the token
+                        print(colored("  --> Destination Authorization String Refresh Failed (%s)" %(repr(e)), "light_red", attrs=["bold"]))
+
+    def close(self):
+        self.stopEvent.set()
+        self.wakeEvent.set()
+
+# Token managers are shared and are indexed by (host, port, user)
+_authDict   = {}
+_authLock   = threading.Lock()
+
+def getAuth(t_class, t_host, t_port, t_user, t_pass):
+# -------------------------------------------------------------------------------
+# Return the shared token manager (of class t_class) of a server login, creating
+# it (and logging in) if it does not exist yet.
+# -------------------------------------------------------------------------------
+    t_key = (t_class.__name__, str(t_host), str(t_port), t_user)
+
+    with _authLock:
+        if t_key not in _authDict:
+            _authDict[t_key] = t_class(t_host, t_port, t_user, t_pass)
+
+        return _authDict[t_key]
+
+def getSrcAuth(t_srcHost, t_srcPort, t_srcUser, t_srcPass):
+# -------------------------------------------------------------------------------
+# Return the shared token manager of a source server login, logging in if needed
+# -------------------------------------------------------------------------------
+    return getAuth(KRestSrcAuth, t_srcHost, t_srcPort, t_srcUser, t_srcPass)
+
+def getDstAuth(t_dstHost, t_dstPort, t_dstUser, t_dstPass):
+# -------------------------------------------------------------------------------
+# Return the shared token manager of a destination server login, logging in if
+# needed
+# -------------------------------------------------------------------------------
+    return getAuth(KRestDstAuth, t_dstHost, t_dstPort, t_dstUser, t_dstPass)
@@ -0,0 +1,140 @@
+# key-rest-cache
+#
+# definition file of the on-disk cache of source listings.  Only the
+# listings of clients and of objects (which never include key blocks)
+# are cached, so that repeated listing runs and filter experiments do
+# not download them again.
+#
+######################################################################
+import  hashlib
+import  json
+import  os
+import  threading
+import  time
+from    krestsession import *
+
+# ---------------- CONSTANTS -----------------------------------------------------
+DEFAULT_CACHE_TTL       = 3600  # seconds a cached listing is used without revalidation
+
+STATUS_CODE_OK          = 200
+STATUS_CODE_NOT_MODIFIED = 304
+
+CACHE_TIME              = "time"
+CACHE_URL               = "url"
+CACHE_ETAG              = "etag"
+CACHE_LAST_MODIFIED     = "lastModified"
+CACHE_DATA              = "data"
+
+class KRestCachedResponse:
+# -------------------------------------------------------------------------------
+# A listing served from the cache.  The attribute names match those of a
+# requests response so that callers can handle either.
+# -------------------------------------------------------------------------------
+    def __init__(self, t_data):
+        self.status_code    = STATUS_CODE_OK
+        self.reason         = "OK (cached)"
+        self.data           = t_data
+
+    def json(self):
+        return self.data
+
+class KRestListingCache:
+# -------------------------------------------------------------------------------
+# Cache of listing responses, one file per listing in t_cacheDir.  A listing is
+# identified by its host, port and URL (which includes the client name and the
+# object type) and never by the authorization string.
+#
+# A listing younger than t_ttl seconds is used as is.  An older listing is
+# revalidated with a conditional request if the server provided an ETag or a
+# Last-Modified header, and is otherwise downloaded again.  If t_refresh is set,
+# every listing is downloaded again (and the cache updated).
+# -------------------------------------------------------------------------------
+    def __init__(self, t_cacheDir, t_ttl=DEFAULT_CACHE_TTL, t_refresh=False):
+        self.cacheDir       = t_cacheDir
+        self.ttl            = t_ttl
+        self.refresh        = t_refresh
+        self.lock           = threading.Lock()
+        self.cntDict        = {"hits":0, "revalidated":0, "downloaded":0}
+
+        os.makedirs(t_cacheDir, mode=0o700, exist_ok=True)
+
+    def getFileName(self, t_host, t_port, t_url):
+        t_key = hashlib.sha256(("%s:%s %s" %(t_host, t_port, t_url)).encode()).hexdigest()
+        return os.path.join(self.cacheDir, t_key + ".json")
+
+    def load(self, t_fileName):
+        try:
+            with open(t_fileName, "r", encoding="utf-8") as t_file:
+                return json.load(t_file)
+        except (OSError, ValueError):
+            return None     # missing or incomplete entry
+
+    def store(self, t_fileName, t_entry):
+        # write to a temporary file first so that a reader never sees a partial entry
+        t_tmpFileName = "%s.%s.tmp" %(t_fileName, threading.get_ident())
+        with open(t_tmpFileName, "w", encoding="utf-8") as t_file:
+            json.dump(t_entry, t_file)
+        os.replace(t_tmpFileName, t_fileName)
+
+    def count(self, t_key):
+        with self.lock:
+            self.cntDict[t_key] = self.cntDict[t_key] + 1
+
+    def get(self, t_host, t_port, t_url, t_headers):
+        # Returns the response (from the cache or the server) to a GET of t_url
+        t_fileName  = self.getFileName(t_host, t_port, t_url)
+        t_entry     = None if self.refresh else self.load(t_fileName)
+
+        if t_entry is not None and time.time() - t_entry[CACHE_TIME] < self.ttl:
+            self.count("hits")
+            return KRestCachedResponse(t_entry[CACHE_DATA])
+
+        t_headers = dict(t_headers)
+        if t_entry is not None:
+            if t_entry.get(CACHE_ETAG) is not None:
+                t_headers["If-None-Match"] = t_entry[CACHE_ETAG]
+            if t_entry.get(CACHE_LAST_MODIFIED) is not None:
+                t_headers["If-Modified-Since"] = t_entry[CACHE_LAST_MODIFIED]
+
+        r = getSession(t_host, t_port).get(t_url, headers=t_headers)
+
+        if r.status_code == STATUS_CODE_NOT_MODIFIED and t_entry is not None:
+            t_entry[CACHE_TIME] = time.time()
+            self.store(t_fileName, t_entry)
+            self.count("revalidated")
+            return KRestCachedResponse(t_entry[CACHE_DATA])
+
+        if r.status_code == STATUS_CODE_OK:
+            self.store(t_fileName, {CACHE_TIME:time.time(), CACHE_URL:t_url,
+                                    CACHE_ETAG:r.headers.get("ETag"), CACHE_LAST_MODIFIED:r.headers.get("Last-Modified"),
+                                    CACHE_DATA:r.json()})
+            self.count("downloaded")
+
+        return r
+
+# The listing cache is optional and is configured once per run
+_listingCache = None
+
+def configureListingCache(t_cacheDir, t_ttl=DEFAULT_CACHE_TTL, t_refresh=False):
+# -------------------------------------------------------------------------------
+# Enable the cache of source listings in t_cacheDir
+# -------------------------------------------------------------------------------
+    global _listingCache
+    _listingCache = KRestListingCache(t_cacheDir, t_ttl, t_refresh)
+
+    return _listingCache
+
+def getListingCache():
+# -------------------------------------------------------------------------------
+# Return the cache of source listings, or None if it has not been configured
+# -------------------------------------------------------------------------------
+    return _listingCache
+
+def getListing(t_host, t_port, t_url, t_headers):
+# -------------------------------------------------------------------------------
+# GET a listing through the cache of source listings (if configured)
+# -------------------------------------------------------------------------------
+    if _listingCache is None:
+        return getSession(t_host, t_port).get(t_url, headers=t_headers)
+
+    return _listingCache.get(t_host, t_port, t_url, t_headers)
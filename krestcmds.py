@@ -5,14 +5,20 @@
 #
 ######################################################################
 from    secrets import token_bytes
-import  requests
-from    urllib3.exceptions import InsecureRequestWarning
+import  hashlib
 import  json
 from    kerrors import *
+from    krestauth import *
+from    krestcache import *
 from    krestenums import *
+from    krestreport import *
+from    krestsession import *
+from    krestworkers import *
+from    termcolor import colored
 
 import  re
 from datetime import datetime
+from    functools import lru_cache
 
 # ---------------- CONSTANTS -----------------------------------------------------
 STATUS_CODE_OK      = 200
@@ -27,6 +33,13 @@ APP_JSON            = "application/json"
 
 MANAGED_OBJECT      = "managedObject"
 
+DEFAULT_DST_PAGE_SIZE       = 500   # destination objects per listing page
+DEFAULT_DST_LIST_WORKERS    = 8     # listing pages retrieved at the same time
+
+# A NAME of a GKLM Custom Attributes string and the VALUE that follows it, e.g.
+# "[[NAME x-NETAPP-NodeId] [[INDEX 0] [TYPE JAVA_STRING] [VALUE 8d901e7e]]]"
+CUSTOM_ATTRIBUTE_PAIR_RE    = re.compile(r"\[NAME ([^\]]*)\].*?\[VALUE ([^\]]*)\]", re.DOTALL)
+
 
 def makeHexStr(t_val):
 # -------------------------------------------------------------------------------
@@ -78,39 +91,22 @@ def returnBracketValue(t_stringWithBrackets):
 
     return t_subStrValue
 
+def parseCustomAttributes(t_attribStr):
+# -------------------------------------------------------------------------------
+# Single pass parser of a GKLM Custom Attributes string such as
+# "[[NAME key] [[INDEX 0] [TYPE Text] [VALUE 12345]]] [[NAME key2] ...]" to a 
+# dictionary of {"key": "12345", ...}.  Each NAME is paired with the VALUE that
+# follows it.  Names and values have leading and trailing spaces removed.
+# -------------------------------------------------------------------------------
+    return {t_name.strip():t_value.strip() for t_name, t_value in CUSTOM_ATTRIBUTE_PAIR_RE.findall(t_attribStr)}
+
 def bracketsToDict(t_stringWithBrackets):
 # -------------------------------------------------------------------------------
 # Simple routine extracts name and value information from a string of 
 # "[[NAME key] [INDEX 0] [TYPE Text] [VALUE 12345] ...]" to a dictionary 
-# of {"key": "12345", ...} 
+# of {"key": "12345", ...}  (see parseCustomAttributes)
 # -------------------------------------------------------------------------------
-    t_dict      = {}     # create now to return later
-    t_NAME      = "NAME "
-    t_nameLen   = len(t_NAME)
-    t_VALUE     = "VALUE "
-    t_valueLen  = len(t_NAME)
-
-    t_nameStr = t_stringWithBrackets.strip()    # cleanup - remove leading and trailing spaces
-
-    # Create a substring and eat through it, separating the bracketed data (e.g. [KEY1 VALUE1] [KEY2 VALUE2] ...)
-    # Start loop and continue until NAME keyword is no longer present in the string.
-
-    while t_NAME in t_nameStr: 
-        # Find the string that follows the NAME delimitor
-        t_begin             = t_nameStr.find(t_NAME) + t_nameLen                # find string that comes after 'NAME'
-        t_end               = t_nameStr.find("]", t_begin)                      # end of NAME string
-        t_subStrName        = t_nameStr[t_begin:t_end].strip()
-        t_nameStr           = t_nameStr[t_end:]                                 # move beginning of string
-
-        # Find the string that follows the VALUE delimitor
-        t_begin             = t_nameStr.find(t_VALUE) + t_valueLen              # find string that comes after 'VALUE'
-        t_end               = t_nameStr.find("]", t_begin)                      # end of VALUE string
-        t_subStrValue       = t_nameStr[t_begin:t_end].strip()
-        t_nameStr           = t_nameStr[t_end:]                                 # move beginning of string
-
-        t_dict[t_subStrName]       = t_subStrValue
-
-    return t_dict
+    return parseCustomAttributes(t_stringWithBrackets)
 
 def objStrToList(t_objStr):
 # -------------------------------------------------------------------------------
@@ -132,37 +128,6 @@ def objStrToList(t_objStr):
 
     return(t_objList)
 
-def createSrcAuthStr(t_srcHost, t_srcPort, t_srcUser, t_srcPass):
-# -----------------------------------------------------------------------------
-# REST Assembly for Src LOGIN 
-# 
-# The objective of this section is to provide the username and password parameters
-# to the REST interface of the src host in return for a AUTHORIZATION STRING (token)
-# that is used for authentication of other commands
-# -----------------------------------------------------------------------------
-    t_srcRESTLogin          = SRC_REST_PREAMBLE + "ckms/login"
-    t_srcHostRESTCmd        = "https://%s:%s%s" %(t_srcHost, t_srcPort, t_srcRESTLogin)
-
-    t_srcHeaders            = {"Content-Type":APP_JSON, "Accept":APP_JSON}
-    t_srcBody               = {"userid":t_srcUser, "password":t_srcPass}
-
-    # Suppress SSL Verification Warnings
-    requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
-
-    # Note that GKLM does not required Basic Auth to retrieve information.  
-    # Instead, the body of the call contains the userID and password.
-    r = requests.post(t_srcHostRESTCmd, data=json.dumps(t_srcBody), headers=t_srcHeaders, verify=False)
-
-    if(r.status_code != STATUS_CODE_OK):
-        kPrintError("createSrcAuthStr", r)
-        exit()
-
-    # Extract the UserAuthId from the value of the key-value pair of the JSON reponse.
-    t_srcUserAuthID         = r.json()['UserAuthId']
-    t_srcAuthStr            = "SKLMAuth UserAuthId="+t_srcUserAuthID 
-
-    return t_srcAuthStr
-
 def getSrcObjList(t_srcHost, t_srcPort, t_srcAuthStr):
 # -----------------------------------------------------------------------------
 # REST Assembly for reading List of Src Cryptographic Objects 
@@ -170,18 +135,25 @@ def getSrcObjList(t_srcHost, t_srcPort, t_srcAuthStr):
 # The objective of this section is to querry a list of cryptographic
 # objects current stored or managed by the src host.
 
-# Returns a list of cryptographic objects
+# Returns a list of cryptographic objects, or None if the source server rejected
+# the request or could not be reached (see KRestRetryPolicy for the failures
+# that are retried)
 # -----------------------------------------------------------------------------
     t_srcRESTListObjects    = SRC_REST_PREAMBLE + "objects"
     t_srcHostRESTCmd        = "https://%s:%s%s" %(t_srcHost, t_srcPort, t_srcRESTListObjects)
 
-    t_srcHeaders            = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_srcAuthStr}
+    t_srcHeaders            = {"Authorization":t_srcAuthStr}
 
     # Note that this REST Command does not require a body object in this GET REST Command
-    r = requests.get(t_srcHostRESTCmd, headers=t_srcHeaders, verify=False)
+    try:
+        r = getSession(t_srcHost, t_srcPort).get(t_srcHostRESTCmd, headers=t_srcHeaders)
+    except requests.exceptions.RequestException as e:
+        print("  --> getSrcObjList: %s" %(repr(e)))
+        return None
+
     if(r.status_code != STATUS_CODE_OK):
         kPrintError("getSrcObjList", r)
-        exit()
+        return None
 
     t_srcObjList           = r.json()[MANAGED_OBJECT]
 
@@ -194,26 +166,24 @@ def getSrcObjData(t_srcHost, t_srcPort, t_srcObjList, t_srcAuthStr):
 # Using the getSrcObjList API above, the src host delivers all BUT the actual
 # key block of object.  This section returns and collects the key block for 
 # each object.
+#
+# An object that cannot be read (see getSrcObjDetail) is reported and skipped.
 # -----------------------------------------------------------------------------
-    t_srcRESTListObjects        = SRC_REST_PREAMBLE + "objects"
-    t_ListLen = len(t_srcObjList)
-
     t_srcObjData    = [] # created list to be returned later
 
-    for obj in range(t_ListLen):
-        t_srcObjID          = t_srcObjList[obj][GKLMAttributeType.UUID.value]
-        t_srcHostRESTCmd    = "https://%s:%s%s/%s" %(t_srcHost, t_srcPort, t_srcRESTListObjects, t_srcObjID)
-        t_srcHeaders        = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_srcAuthStr}
-
-        # Note that REST Command does not require a body object in this GET REST Command
-        r = requests.get(t_srcHostRESTCmd, headers=t_srcHeaders, verify=False)
-        if(r.status_code != STATUS_CODE_OK):
-            kPrintError("getSrcObj", r)
-            exit()
+    for t_obj in t_srcObjList:
+        t_srcObjID  = t_obj[GKLMAttributeType.UUID.value]
+        t_data      = getSrcObjDetail(t_srcHost, t_srcPort, t_srcAuthStr, t_srcObjID, "getSrcObj")
+        if t_data is None:
+            reportObj(reportStage.SOURCE.value, t_srcObjID, t_obj.get(GKLMAttributeType.ALIAS.value, ""), "", REPORT_STATUS_FAILED)
+            continue    # skip the object
 
-        t_data   = r.json()[MANAGED_OBJECT]
         t_srcObjData.append(t_data)     # Add data to list
-        
+
+    if len(t_srcObjData) < len(t_srcObjList):
+        tmpStr = "\n    WARNING: %s of %s objects could not be retrieved and were skipped." %(len(t_srcObjList) - len(t_srcObjData), len(t_srcObjList))
+        print(colored(tmpStr, "light_red", attrs=["bold"]))
+
     return t_srcObjData
 
 def getSrcKeyList(t_srcHost, t_srcPort, t_srcAuthStr):
@@ -224,18 +194,19 @@ def getSrcKeyList(t_srcHost, t_srcPort, t_srcAuthStr):
 # key block of keys.  Once we have this information (especially the UUID), we can
 # retrieve the key block material
 #
-# Returns a list of keys, but no key material
+# Returns a list of keys, but no key material, or None if the source server
+# rejected the request (see KRestRetryPolicy for the failures that are retried)
 # -----------------------------------------------------------------------------
     t_srcRESTListKeys       = SRC_REST_PREAMBLE + "keys"
     t_srcHostRESTCmd        = "https://%s:%s%s" %(t_srcHost, t_srcPort, t_srcRESTListKeys)
 
-    t_srcHeaders            = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_srcAuthStr}
+    t_srcHeaders            = {"Authorization":t_srcAuthStr}
 
     # Note that this REST Command does not require a body object in this GET REST Command
-    r = requests.get(t_srcHostRESTCmd, headers=t_srcHeaders, verify=False)
+    r = getSession(t_srcHost, t_srcPort).get(t_srcHostRESTCmd, headers=t_srcHeaders)
     if(r.status_code != STATUS_CODE_OK):
         kPrintError("getSrcKeyList", r)
-        exit()
+        return None
 
     t_srcKeyList           = r.json()
 
@@ -249,40 +220,58 @@ def getSrcKeyDataList(t_srcHost, t_srcPort, t_srcKeyList, t_srcAuthStr):
 # the KEYBLOCK for each key.
 #
 # NOTE that this call exports the key into an encrypted file on GKLM....
+#
+# Since each export writes a file on GKLM, the request is NOT idempotent:  it is
+# only retried if GKLM did not process it (see KRestRetryPolicy).  A key that
+# cannot be exported is reported and skipped.
 # -----------------------------------------------------------------------------
     t_srcRESTGetKeys        = SRC_REST_PREAMBLE + "keys/export"
-    t_ListLen               = len(t_srcKeyList)
 
     t_srcKeyDataList        = [] # created list to be returned later
 
-    for obj in range(t_ListLen):
-        t_srcKeyAlias       = t_srcKeyList[obj][GKLMAttributeType.ALIAS.value]
+    for t_srcKey in t_srcKeyList:
+        t_srcKeyAlias       = t_srcKey[GKLMAttributeType.ALIAS.value]
         t_srcHostRESTCmd    = "https://%s:%s%s/%s" %(t_srcHost, t_srcPort, t_srcRESTGetKeys, t_srcKeyAlias)
         
-        t_srcHeaders        = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_srcAuthStr}
+        t_srcHeaders        = {"Authorization":t_srcAuthStr}
 
         # Note that REST Command does not require a body object in this GET REST Command
-        r = requests.post(t_srcHostRESTCmd, headers=t_srcHeaders, verify=False)
-        if(r.status_code != STATUS_CODE_OK):
-            kPrintError("getSrcKeyDataList", r)
-            exit()
+        try:
+            r = getSession(t_srcHost, t_srcPort).post(t_srcHostRESTCmd, t_idempotent=False, headers=t_srcHeaders)
+        except requests.exceptions.RequestException as e:
+            print("  --> getSrcKeyDataList Alias %s: %s" %(t_srcKeyAlias, repr(e)))
+            r = None
+
+        if r is None or r.status_code != STATUS_CODE_OK:
+            if r is not None:
+                kPrintError("getSrcKeyDataList", r)
+            reportObj(reportStage.SOURCE.value, t_srcKey.get(GKLMAttributeType.UUID.value, ""), t_srcKeyAlias,
+                      GKLMAttributeType.SYMMETRIC_KEY.value, REPORT_STATUS_FAILED)
+            continue    # skip the key
 
         t_data          = r.json()
         t_srcKeyDataList.append(t_data)     # Add data to list
 
-        print("Src Key ", obj, " Alias:", t_srcKeyDataList[obj][GKLMAttributeType.ALIAS.value])
-        
+        print("Src Key ", len(t_srcKeyDataList) - 1, " Alias:", t_data[GKLMAttributeType.ALIAS.value])
+
+    if len(t_srcKeyDataList) < len(t_srcKeyList):
+        tmpStr = "\n    WARNING: %s of %s keys could not be exported and were skipped." %(len(t_srcKeyList) - len(t_srcKeyDataList), len(t_srcKeyList))
+        print(colored(tmpStr, "light_red", attrs=["bold"]))
+
     return t_srcKeyDataList
 
 
-def getSrcObjDataListByClient(t_srcHost, t_srcPort, t_srcAuthStr, t_suuid, t_objectType, t_client):
+def getSrcObjListByClient(t_srcHost, t_srcPort, t_srcAuthStr, t_objectType, t_client):
 # -----------------------------------------------------------------------------
-# REST Assembly for reading specific Data via OBJECT
+# REST Assembly for reading the LIST of objects of a given type via OBJECT
 #
 # SKLM will allow KMIP clients to create keys without associating them to an SKLM User.
 # When we attempt to retrieve any key that is not associated with a user, we get
 # error message.  HOWEVER, if we specify the client name in the request, the 
 # error is avoided.
+#
+# Note that the listed objects do NOT include key blocks.  Returns None if the
+# source server rejected the request.
 # -----------------------------------------------------------------------------
     
     if len(t_client) > 0:
@@ -290,97 +279,242 @@ def getSrcObjDataListByClient(t_srcHost, t_srcPort, t_srcAuthStr, t_suuid, t_obj
     else:
         t_srcRESTObjects = SRC_REST_PREAMBLE + "objects?objectType=" + t_objectType
 
-    t_srcObjDataList = [] # created list to be returned later
-
     t_srcHostRESTCmd = "https://%s:%s%s" %(t_srcHost, t_srcPort, t_srcRESTObjects)
-    t_srcHeaders    = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_srcAuthStr}
+    t_srcHeaders    = {"Authorization":t_srcAuthStr}
 
-    # now that everything is organized, go get the list of key objects from SKLM
-    r = requests.get(t_srcHostRESTCmd, headers=t_srcHeaders, verify=False)
+    # now that everything is organized, go get the list of key objects from SKLM (or the listing cache)
+    r = getListing(t_srcHost, t_srcPort, t_srcHostRESTCmd, t_srcHeaders)
     if(r.status_code != STATUS_CODE_OK):
         kPrintError("getSrcObjDataListByClient", r)
-    else:
-        # Note that the keyObjects do NOT include key blocks.  We will get that later.
-        t_Objects   = r.json()[MANAGED_OBJECT]  
+        return None
 
-        # For SYMMETRIC KEYS, go through the list of objects and retrieve the key material AND key block.
-        # The key block can ONLY be obtained by explicity specifing the UUID of the key from the REST
-        # endpoint.  Therefore, you need to retreive EACH key by its UUID.
-        if t_objectType == GKLMAttributeType.SYMMETRIC_KEY.value:
-            t_srcObjDataList = getSrcKeyObjDetailList(t_srcHost, t_srcPort, t_srcAuthStr, t_Objects, t_suuid, t_client)
+    t_Objects   = r.json()[MANAGED_OBJECT]  
+
+    return t_Objects
 
-        elif t_objectType == GKLMAttributeType.SECRET_DATA.value:
-            t_srcObjDataList = getSrcSecretObjDetailList(t_srcHost, t_srcPort, t_srcAuthStr, t_Objects, t_suuid, t_client)
+def iterSrcObjDataListByClient(t_srcHost, t_srcPort, t_srcAuthStr, t_suuid, t_objectType, t_client, t_workers=1, t_listingFilter=None):
+# -----------------------------------------------------------------------------
+# Generator version of getSrcObjDataListByClient.  Each object is yielded as soon
+# as its key block has been retrieved.
+# -----------------------------------------------------------------------------
+    t_Objects = getSrcObjListByClient(t_srcHost, t_srcPort, t_srcAuthStr, t_objectType, t_client)
+    if t_Objects is None:
+        return
+
+    # For SYMMETRIC KEYS, go through the list of objects and retrieve the key material AND key block.
+    # The key block can ONLY be obtained by explicity specifing the UUID of the key from the REST
+    # endpoint.  Therefore, you need to retreive EACH key by its UUID.
+    if t_objectType == GKLMAttributeType.SYMMETRIC_KEY.value:
+        yield from iterSrcObjDetailList(t_srcHost, t_srcPort, t_srcAuthStr, t_Objects, t_suuid, t_client, 
+                                        "getSrcKeyObjDetailList", t_workers, t_listingFilter, t_objectType)
+
+    elif t_objectType == GKLMAttributeType.SECRET_DATA.value:
+        yield from iterSrcObjDetailList(t_srcHost, t_srcPort, t_srcAuthStr, t_Objects, t_suuid, t_client, 
+                                        "getSrcSecretObjDetailList", t_workers, t_listingFilter, t_objectType)
+
+def getSrcObjDataListByClient(t_srcHost, t_srcPort, t_srcAuthStr, t_suuid, t_objectType, t_client, t_workers=1, t_listingFilter=None):
+# -----------------------------------------------------------------------------
+# REST Assembly for reading specific Data via OBJECT
+#
+# The list of objects is read first (see getSrcObjListByClient) and then the key
+# block of each object is retrieved with up to t_workers concurrent requests
+# (see getSrcObjDetailList).
+# -----------------------------------------------------------------------------
+    t_srcObjDataList = list(iterSrcObjDataListByClient(t_srcHost, t_srcPort, t_srcAuthStr, t_suuid, t_objectType, t_client, t_workers, t_listingFilter))
 
     # printJList("srcKeyObjDataList:", t_srcObjDataList)
     return t_srcObjDataList
 
-def getSrcKeyObjDetailList(t_srcHost, t_srcPort, t_srcAuthStr, t_srcObj, t_suuid, t_client):
+def iterSrcClientObjData(t_srcHost, t_srcPort, t_srcAuthStr, t_srcUser, t_clientDict, t_suuid, 
+                         t_symKeyCount, t_secretCount, t_includeSecrets, t_addClientUser, t_workers=1, t_listingFilter=None):
 # -----------------------------------------------------------------------------
-# REST Assembly for reading specific SYMMETRIC KEY Data via OBJECT
+# Retrieve the symmetric keys and (if requested) the secrets of ONE source client,
+# including their key blocks.
+#
+# If t_addClientUser is set and the t_srcUser is not one of the client's users,
+# the t_srcUser is temporarily assigned to the client so that the objects can be 
+# retrieved.  The original client ownership is restored afterwards.
+#
+# Yields (object type, object) for each object as soon as it has been retrieved.
+# -----------------------------------------------------------------------------
+    t_clientName            = t_clientDict[GKLMAttributeType.CLIENT_NAME.value]
+    t_srcUserList           = []
+    t_clientUserAdded       = False
+
+    # Before attempting to get the key material, ensure that the srcUser has the permissions to obtain objects
+    if t_addClientUser and (t_srcUser not in t_clientDict[GKLMAttributeType.CLIENT_USERS.value]):
+        t_srcUserList.append(t_srcUser) # create list of user with the user associated with login
+        t_success = assignSrcClientUsers(t_srcHost, t_srcPort, t_srcAuthStr, t_clientName, t_srcUserList)
+        t_clientUserAdded = True
+
+    try:
+        # RETRIEVE KEYS
+        if int(t_symKeyCount) > 0:
+            tmpStr = "       ...retrieving symmetric key information for %s... " %(t_clientName)
+            print(tmpStr)
+            for t_data in iterSrcObjDataListByClient(t_srcHost, t_srcPort, t_srcAuthStr, t_suuid, GKLMAttributeType.SYMMETRIC_KEY.value, t_clientName, t_workers, t_listingFilter):
+                yield GKLMAttributeType.SYMMETRIC_KEY.value, t_data
+
+        # RETRIEVE SECRETS (if requested)
+        if t_includeSecrets and int(t_secretCount) > 0:
+            tmpStr = "       ...retrieving secret data information for %s... " %(t_clientName)
+            print(tmpStr)
+            for t_data in iterSrcObjDataListByClient(t_srcHost, t_srcPort, t_srcAuthStr, t_suuid, GKLMAttributeType.SECRET_DATA.value, t_clientName, t_workers, t_listingFilter):
+                yield GKLMAttributeType.SECRET_DATA.value, t_data
+
+    finally:
+        # If a client user was added, remove it and restore the original ownership.
+        if t_clientUserAdded:
+            t_success = removeSrcClientUsers(t_srcHost, t_srcPort, t_srcAuthStr, t_clientName, t_srcUserList)
+            t_originalClientUserList = t_clientDict[GKLMAttributeType.CLIENT_USERS.value] # retrieve original list of users
+            t_success = assignSrcClientUsers(t_srcHost, t_srcPort, t_srcAuthStr, t_clientName, t_originalClientUserList)
+
+def getSrcClientObjDataLists(t_srcHost, t_srcPort, t_srcAuthStr, t_srcUser, t_clientDict, t_suuid, 
+                             t_symKeyCount, t_secretCount, t_includeSecrets, t_addClientUser, t_workers=1, t_listingFilter=None):
+# -----------------------------------------------------------------------------
+# List version of iterSrcClientObjData.
+#
+# Returns the list of key objects and the list of secret objects of the client.
+# -----------------------------------------------------------------------------
+    t_srcKeyObjDataList     = []
+    t_srcSecretObjDataList  = []
+
+    for t_objectType, t_data in iterSrcClientObjData(t_srcHost, t_srcPort, t_srcAuthStr, t_srcUser, t_clientDict, t_suuid, 
+                                                     t_symKeyCount, t_secretCount, t_includeSecrets, t_addClientUser, t_workers, t_listingFilter):
+        if t_objectType == GKLMAttributeType.SYMMETRIC_KEY.value:
+            t_srcKeyObjDataList.append(t_data)
+        else:
+            t_srcSecretObjDataList.append(t_data)
+
+    return t_srcKeyObjDataList, t_srcSecretObjDataList
+
+def getSrcObjDetail(t_srcHost, t_srcPort, t_srcAuthStr, t_srcObjID, t_callerName):
+# -----------------------------------------------------------------------------
+# REST Assembly for reading the full managed object (including the key block)
+# of a single source object via its UUID.
+#
+# Returns the managed object or None if the source server rejected the request
+# or could not be reached (once the retries of KRestRetryPolicy are exhausted).
 # -----------------------------------------------------------------------------
-    
-    t_srcKeyObjDetailList   = []
-    t_ListLen               = len(t_srcObj)
     t_srcRESTObjectDetail = SRC_REST_PREAMBLE + "objects"
 
-    for obj in range(t_ListLen):
+    t_srcHostRESTCmd = "https://%s:%s%s/%s" %(t_srcHost, t_srcPort, t_srcRESTObjectDetail, t_srcObjID)
+    t_srcHeaders    = {"Authorization":t_srcAuthStr}
 
-        t_srcObjID      = t_srcObj[obj][GKLMAttributeType.UUID.value]
-        t_kt            = str(t_srcObj[obj][GKLMAttributeType.KEY_TYPE.value])
-        t_srcObjAlias   = t_srcObj[obj][GKLMAttributeType.ALIAS.value]
+    try:
+        r = getSession(t_srcHost, t_srcPort).get(t_srcHostRESTCmd, headers=t_srcHeaders)
+    except requests.exceptions.RequestException as e:
+        print("  --> %s UUID %s: %s" %(t_callerName, t_srcObjID, repr(e)))
+        return None
 
-        t_srcHostRESTCmd = "https://%s:%s%s/%s" %(t_srcHost, t_srcPort, t_srcRESTObjectDetail, t_srcObjID)
-        t_srcHeaders    = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_srcAuthStr}
+    if(r.status_code != STATUS_CODE_OK):
+        kPrintError(t_callerName, r)
+        return None
 
-        r = requests.get(t_srcHostRESTCmd, headers=t_srcHeaders, verify=False)
-        if(r.status_code != STATUS_CODE_OK):
-            kPrintError("getSrcKeyObjDetailList", r)
-            break   # stop processing the objects.
-
-        elif len(t_suuid) == 0: # add data unless a specific UUID is specified
-            t_data   = r.json()[MANAGED_OBJECT]
-            t_data[GKLMAttributeType.CLIENT_NAME.value] = t_client # save associated client name
-            t_srcKeyObjDetailList.append(t_data)     # Add data to list
-                
-        elif t_suuid in t_srcObjID: # only append data if the specified UUID is a match (or submatch) of the t_srcObjID
-            t_data   = r.json()[MANAGED_OBJECT]
-            t_data[GKLMAttributeType.CLIENT_NAME.value] = t_client # save associated client name
-            t_srcKeyObjDetailList.append(t_data)     # Add data to list
+    t_data   = r.json()[MANAGED_OBJECT]
 
-    # printJList("t_srcKeyObjDetailList:", t_srcKeyObjDetailList)
-    return t_srcKeyObjDetailList
+    return t_data
 
-def getSrcSecretObjDetailList(t_srcHost, t_srcPort, t_srcAuthStr, t_srcObj, t_suuid, t_client):
+def filterSrcObjListByUUID(t_srcObj, t_suuid):
 # -----------------------------------------------------------------------------
-# REST Assembly for reading specific SECRET Data via OBJECT
+# Filter a source object listing by UUID.
+#
+# Only those objects whose UUID contains all or part of the t_suuid string are 
+# returned.  If t_suuid is empty, the listing is returned unchanged.  Since the
+# listing does not include key blocks, this filter is applied BEFORE the key
+# block of each object is retrieved.
 # -----------------------------------------------------------------------------
-    
-    t_srcSecretObjDetailList   = []
-    t_ListLen               = len(t_srcObj)
-    t_srcRESTObjectDetail = SRC_REST_PREAMBLE + "objects"
+    if len(t_suuid) == 0:
+        return t_srcObj
 
-    for obj in range(t_ListLen):
+    t_filteredList = [t_obj for t_obj in t_srcObj if t_suuid in t_obj[GKLMAttributeType.UUID.value]]
+
+    return t_filteredList
+
+def filterSrcObjListForRetrieval(t_srcObj, t_suuid, t_listingFilter, t_client):
+# -----------------------------------------------------------------------------
+# Apply the UUID filter (see filterSrcObjListByUUID) and, if provided, the 
+# t_listingFilter to a source object listing.  t_listingFilter is called with
+# each listed object and returns True if the object should be retrieved.
+#
+# The number of key block retrievals skipped by each filter is reported.
+# -----------------------------------------------------------------------------
+    t_uuidObjList       = filterSrcObjListByUUID(t_srcObj, t_suuid)
+    if len(t_suuid) > 0:
+        tmpStr = "       ...%s of %s key block retrievals skipped by UUID filter for %s... " %(len(t_srcObj) - len(t_uuidObjList), len(t_srcObj), t_client)
+        print(tmpStr)
 
-        t_srcObjID      = t_srcObj[obj][GKLMAttributeType.UUID.value]
+    if t_listingFilter is None:
+        return t_uuidObjList
 
-        t_srcHostRESTCmd = "https://%s:%s%s/%s" %(t_srcHost, t_srcPort, t_srcRESTObjectDetail, t_srcObjID)
-        t_srcHeaders    = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_srcAuthStr}
+    t_filteredList      = [t_obj for t_obj in t_uuidObjList if t_listingFilter(t_obj)]
+    if len(t_filteredList) < len(t_uuidObjList):
+        tmpStr = "       ...%s of %s key block retrievals skipped by listing filter for %s... " %(len(t_uuidObjList) - len(t_filteredList), len(t_uuidObjList), t_client)
+        print(tmpStr)
 
-        r = requests.get(t_srcHostRESTCmd, headers=t_srcHeaders, verify=False)
-        if(r.status_code != STATUS_CODE_OK):
-            kPrintError("getSrcSecretObjDetailList", r)
-            break   # stop processing the objects.
-
-        elif len(t_suuid) == 0: # add data unless a specific UUID is specified
-            t_data   = r.json()[MANAGED_OBJECT]
-            t_data[GKLMAttributeType.CLIENT_NAME.value] = t_client # save associated client name
-            t_srcSecretObjDetailList.append(t_data)     # Add data to list
-                
-        elif t_suuid in t_srcObjID: # only append data if the specified UUID is a match (or submatch) of the t_srcObjID
-            t_data   = r.json()[MANAGED_OBJECT]
-            t_data[GKLMAttributeType.CLIENT_NAME.value] = t_client # save associated client name
-            t_srcSecretObjDetailList.append(t_data)     # Add data to list
+    return t_filteredList
+
+def iterSrcObjDetailList(t_srcHost, t_srcPort, t_srcAuthStr, t_srcObj, t_suuid, t_client, t_callerName, t_workers=1, t_listingFilter=None,
+                         t_objectType=""):
+# -----------------------------------------------------------------------------
+# Retrieve the full managed object of EACH source object in t_srcObj.
+#
+# If a specific UUID is specified, only objects whose UUID is a match (or submatch)
+# are retrieved.  Objects rejected by t_listingFilter (if any) are not retrieved
+# either.  See filterSrcObjListForRetrieval.
+#
+# Up to t_workers requests are issued to the source server at a time.  Objects
+# are yielded in the order of t_srcObj.  An object that cannot be read, even 
+# after its request has been retried, is reported (as t_objectType) and skipped
+# without affecting the remaining objects.  It is read again by a later run 
+# (e.g. with -resume).
+# -----------------------------------------------------------------------------
+    t_uuidObjList       = filterSrcObjListForRetrieval(t_srcObj, t_suuid, t_listingFilter, t_client)
+
+    def getDetail(t_obj):
+        return getSrcObjDetail(t_srcHost, t_srcPort, t_srcAuthStr, t_obj[GKLMAttributeType.UUID.value], t_callerName)
+
+    t_skipCnt = 0
+    for t_obj, t_data in zip(t_uuidObjList, iterConcurrently(getDetail, t_uuidObjList, t_workers)):
+        if t_data is None:
+            t_skipCnt = t_skipCnt + 1
+            reportObj(reportStage.SOURCE.value, t_obj[GKLMAttributeType.UUID.value], t_obj.get(GKLMAttributeType.ALIAS.value, ""),
+                      t_objectType, REPORT_STATUS_FAILED, t_client)
+            continue    # skip the object
+
+        t_data[GKLMAttributeType.CLIENT_NAME.value] = t_client # save associated client name
+        yield t_data
+
+    if t_skipCnt > 0:
+        tmpStr = "\n    WARNING: %s of %s objects of %s could not be retrieved and were skipped." %(t_skipCnt, len(t_uuidObjList), t_client)
+        print(colored(tmpStr, "light_red", attrs=["bold"]))
+
+def getSrcObjDetailList(t_srcHost, t_srcPort, t_srcAuthStr, t_srcObj, t_suuid, t_client, t_callerName, t_workers=1, t_listingFilter=None):
+# -----------------------------------------------------------------------------
+# List version of iterSrcObjDetailList
+# -----------------------------------------------------------------------------
+    t_srcObjDetailList = list(iterSrcObjDetailList(t_srcHost, t_srcPort, t_srcAuthStr, t_srcObj, t_suuid, t_client, t_callerName, t_workers, t_listingFilter))
+
+    return t_srcObjDetailList
+
+def getSrcKeyObjDetailList(t_srcHost, t_srcPort, t_srcAuthStr, t_srcObj, t_suuid, t_client, t_workers=1, t_listingFilter=None):
+# -----------------------------------------------------------------------------
+# REST Assembly for reading specific SYMMETRIC KEY Data via OBJECT
+# -----------------------------------------------------------------------------
+    
+    t_srcKeyObjDetailList = getSrcObjDetailList(t_srcHost, t_srcPort, t_srcAuthStr, t_srcObj, t_suuid, t_client, 
+                                                "getSrcKeyObjDetailList", t_workers, t_listingFilter)
+
+    # printJList("t_srcKeyObjDetailList:", t_srcKeyObjDetailList)
+    return t_srcKeyObjDetailList
+
+def getSrcSecretObjDetailList(t_srcHost, t_srcPort, t_srcAuthStr, t_srcObj, t_suuid, t_client, t_workers=1, t_listingFilter=None):
+# -----------------------------------------------------------------------------
+# REST Assembly for reading specific SECRET Data via OBJECT
+# -----------------------------------------------------------------------------
+    
+    t_srcSecretObjDetailList = getSrcObjDetailList(t_srcHost, t_srcPort, t_srcAuthStr, t_srcObj, t_suuid, t_client, 
+                                                   "getSrcSecretObjDetailList", t_workers, t_listingFilter)
 
     # printJList("t_srcSecretObjDetailList:", t_srcSecretObjDetailList)
     return t_srcSecretObjDetailList
@@ -507,153 +641,185 @@ def printSrcSecretObjDataList(t_srcSecretObjDataList):
         
     return t_success
 
-def createDstAuthStr(t_dstHost, t_dstPort, t_dstUser, t_dstPass):
+def getDstObjList(t_dstHost, t_dstPort, t_dstAuthStr, t_pageSize=DEFAULT_DST_PAGE_SIZE, t_workers=DEFAULT_DST_LIST_WORKERS):
 # -----------------------------------------------------------------------------
-# REST Assembly for DESTINATION HOST LOGIN 
+# REST Assembly for DESTINATION OBJECT READING KEYS
 # 
-# The objective of this section is to provide the username and password parameters
-# to the REST interface of the dst host in return for a BEARER TOKEN that is 
-# used for authentication of other commands.
+# The objective of this section is to use the Dst Authorization / Bearer Token
+# to query the dst hosts REST interface about keys.
+#
+# Note that the list returns only t_pageSize keys per query.  As such, the first
+# page is read to learn the total number of objects and the remaining pages
+# (whose offsets are then known) are read with up to t_workers queries at the
+# same time.  The pages are assembled in order.
+#
+# A page that cannot be read, even after its query has been retried, is reported
+# and skipped, so the list is then incomplete.  Only the first page is required.
 # -----------------------------------------------------------------------------
 
-    t_dstRESTTokens         = DST_REST_PREAMBLE + "auth/tokens/"
-    t_dstHostRESTCmd        = "https://%s:%s%s" %(t_dstHost, t_dstPort, t_dstRESTTokens)    
+    # Define a common header for all REST API Requests
+    t_dstHeaders            = {"Authorization":t_dstAuthStr}
 
-    t_dstHeaders            = {"Content-Type":APP_JSON}
-    t_dstBody               = {"name":t_dstUser, "password":t_dstPass}
+    def getDstObjPage(t_batchObjSkip):
+        t_dstRESTKeyList        = "%svault/keys2/?skip=%s&limit=%s" %(DST_REST_PREAMBLE, t_batchObjSkip, t_pageSize)
+        t_dstHostRESTCmd        = "https://%s:%s%s" %(t_dstHost, t_dstPort, t_dstRESTKeyList)   
 
-    # Suppress SSL Verification Warnings
-    requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+        # Note that this REST Command does not require a body object in this GET REST Command
+        try:
+            r = getSession(t_dstHost, t_dstPort).get(t_dstHostRESTCmd, headers=t_dstHeaders)
+        except requests.exceptions.RequestException as e:
+            print("  --> getDstObjList: t_pageSize:%s t_batchObjSkip:%s %s" %(t_pageSize, t_batchObjSkip, repr(e)))
+            return None
+
+        if(r.status_code != STATUS_CODE_OK):
+            tmpStr = "getDstObjList: t_pageSize:%s t_batchObjSkip:%s" %(t_pageSize, t_batchObjSkip)
+            kPrintError(tmpStr, r)
+            return None
 
-    # Note that CM does not required Basic Auth to retrieve information.  
-    # Instead, the body of the call contains the username and password.
-    r = requests.post(t_dstHostRESTCmd, data=json.dumps(t_dstBody), headers=t_dstHeaders, verify=False)
+        return r.json()
 
-    if(r.status_code != STATUS_CODE_OK):
-        kPrintError("createDstAuthStr", r)
+    # The initial retrieval provides the total number of objects
+    t_dstPage               = getDstObjPage(0)
+    if t_dstPage is None:
         exit()
 
-    # Extract the Bearer Token from the value of the key-value pair of the JSON reponse which is identified by the 'jwt' key.
-    t_dstUserBearerToken            = r.json()['jwt']
-    t_dstAuthStr                    = "Bearer " + t_dstUserBearerToken
-    t_dstAuthStrBornOn              = datetime.now() # add bearer birthday to be able to track when it will expire (300 seconds later)
+    t_dstFinalObjList       = t_dstPage[CMAttributeType.RESOURCES.value]
+    t_dstObjTotalCnt        = t_dstPage[CMAttributeType.TOTAL.value]
 
-    return t_dstAuthStr, t_dstAuthStrBornOn
-
-def getDstObjList(t_dstHost, t_dstPort, t_dstAuthStr):
-# -----------------------------------------------------------------------------
-# REST Assembly for DESTINATION OBJECT READING KEYS
-# 
-# The objective of this section is to use the Dst Authorization / Bearer Token
-# to query the dst hosts REST interface about keys.
-#
-# Note that the list returns only 500 keys per query.  As such, we are going to
-# define a batch limit and make multiple queries to the CipherTrust Server
-# -----------------------------------------------------------------------------
+    # The server may return fewer objects per page than requested.  If so, use
+    # its page size to calculate the offsets of the remaining pages.
+    t_batchLimit            = min(t_pageSize, len(t_dstFinalObjList))
+    if t_batchLimit == 0:
+        return t_dstFinalObjList
 
-    t_batchLimit            = 500   # 500 keys per retreival
-    t_batchSkip             = 0     # skip or offset into object count
-    t_batchObjSkip          = t_batchLimit * t_batchSkip
-    t_dstObjCnt             = 0
+    t_batchObjSkipList      = list(range(t_batchLimit, t_dstObjTotalCnt, t_batchLimit))
+    t_skipPageCnt           = 0
+    for t_dstPage in runConcurrently(getDstObjPage, t_batchObjSkipList, t_workers):
+        if t_dstPage is None:
+            t_skipPageCnt = t_skipPageCnt + 1
+            continue    # skip the page
 
-    # Define a common header for all REST API Requests
-    t_dstHeaders            = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization": t_dstAuthStr}
+        # Add/extend the current batch to the total list (Final Obj List)
+        t_dstFinalObjList.extend(t_dstPage[CMAttributeType.RESOURCES.value])
 
-    # Process all keys per the size of the t_batchLimit until you have retrieved all of them.
-    # Although this is the initial batch, use the same command structure as if multiple batch calls
-    # may be required - for consistency.
-    t_dstRESTKeyList        = "%svault/keys2/?skip=%s&limit=%s" %(DST_REST_PREAMBLE, t_batchObjSkip, t_batchLimit)
-    t_dstHostRESTCmd        = "https://%s:%s%s" %(t_dstHost, t_dstPort, t_dstRESTKeyList)   
+    if t_skipPageCnt > 0:
+        tmpStr = "\n    WARNING: %s destination listing page(s) could not be read.  %s of %s destination objects are listed." %(t_skipPageCnt, len(t_dstFinalObjList), t_dstObjTotalCnt)
+        print(colored(tmpStr, "light_red", attrs=["bold"]))
 
-    # Note that this REST Command does not require a body object in this GET REST Command
-    r = requests.get(t_dstHostRESTCmd, headers=t_dstHeaders, verify=False)
+    # print("\n         Dst Objects: ",  t_dstFinalObjList[0].keys())
+    return t_dstFinalObjList
+    
+def createDstObjIndex(t_dstObjList):
+# -----------------------------------------------------------------------------
+# Create a dictionary of the destination objects (from getDstObjList) indexed by
+# name.  The value is the SHA-256 fingerprint of the object (in lower case) or an
+# empty string if the destination did not provide one.
+# -----------------------------------------------------------------------------
+    t_dstObjIndex = {}
+    for t_dstObj in t_dstObjList:
+        t_fingerprint = t_dstObj.get(CMAttributeType.SHA256_FINGERPRINT.value) or ""
+        t_dstObjIndex[t_dstObj[CMAttributeType.NAME.value]] = t_fingerprint.lower()
 
-    if(r.status_code != STATUS_CODE_OK):
-        tmpStr = "getDstObjList: t_batchLimit:%s t_batchSkip:%s t_batchObSkip:%s" %(t_batchLimit, t_batchSkip, t_batchObjSkip)
-        kPrintError(tmpStr, r)
-        exit()
+    return t_dstObjIndex
 
-    t_dstFinalObjList       = r.json()[CMAttributeType.RESOURCES.value]
-    t_dstObjCnt             = len(t_dstFinalObjList)
-    t_dstObjTotalCnt        = r.json()[CMAttributeType.TOTAL.value]
+def getDataObjFingerprint(t_xObj):
+# -----------------------------------------------------------------------------
+# Return the SHA-256 fingerprint (in lower case hex) of the material of a mapped
+# (x-formed) key or secret object.  Material is hex encoded, unless it cannot be
+# decoded as hex - in which case the material string itself is hashed.
+# -----------------------------------------------------------------------------
+    t_material = t_xObj[CMAttributeType.MATERIAL.value]
+    try:
+        t_materialBytes = bytes.fromhex(t_material)
+    except ValueError:
+        t_materialBytes = t_material.encode()
 
-    # After the initial retreival, we have access to the total number of objects.
-    # From there, determine, now many more iterations are requied.
-    while t_dstObjTotalCnt > t_dstObjCnt:
-        t_batchSkip             = t_batchSkip + 1               # iterate to next batch
-        t_batchObjSkip          = t_batchLimit * t_batchSkip    # calculate number of objects to skip
+    return hashlib.sha256(t_materialBytes).hexdigest()
 
-        t_dstRESTKeyList        = "%svault/keys2/?skip=%s&limit=%s" %(DST_REST_PREAMBLE, t_batchObjSkip, t_batchLimit)
-        t_dstHostRESTCmd        = "https://%s:%s%s" %(t_dstHost, t_dstPort, t_dstRESTKeyList)   
+def checkDstObjIndex(t_xObj, t_dstObjIndex):
+# -----------------------------------------------------------------------------
+# Check if a mapped (x-formed) object is already present in the destination 
+# object index (see createDstObjIndex).  Returns a dstIndexStatus value.
+# -----------------------------------------------------------------------------
+    t_xObjName = t_xObj[CMAttributeType.NAME.value]
+    if t_xObjName not in t_dstObjIndex:
+        return dstIndexStatus.ABSENT.value
 
-        # Note that this REST Command does not require a body object in this GET REST Command
-        r = requests.get(t_dstHostRESTCmd, headers=t_dstHeaders, verify=False)
+    t_dstFingerprint = t_dstObjIndex[t_xObjName]
+    if len(t_dstFingerprint) == 0:
+        return dstIndexStatus.PRESENT.value
 
-        if(r.status_code != STATUS_CODE_OK):
-            tmpStr = "getDstObjList: t_dstObjTotalCnt:%s t_batchLimit:%s t_batchSkip:%s t_batchObjSkip:%s t_dstObjCnt:%s" %(t_dstObjTotalCnt, t_batchLimit, t_batchSkip, t_batchObjSkip, t_dstObjCnt)
-            kPrintError(tmpStr, r)
-            exit()
+    if t_dstFingerprint == getDataObjFingerprint(t_xObj):
+        return dstIndexStatus.IDENTICAL.value
 
-        # Retreive the batch of objects
-        t_dstObjList       = r.json()[CMAttributeType.RESOURCES.value]
+    return dstIndexStatus.CONFLICT.value
+    
+def verifyDstObjList(t_xObjList, t_dstObjIndex, t_workers=1):
+# -----------------------------------------------------------------------------
+# Verify that each mapped (x-formed) object in t_xObjList is present in the 
+# destination object index (see createDstObjIndex) with the same material.
+# The SHA-256 fingerprint of each object is calculated locally (with up to 
+# t_workers threads) and compared with the fingerprint in the destination
+# listing, so no material is exported from the destination.
+#
+# Returns a dstIndexStatus value for each object, in list order.
+# -----------------------------------------------------------------------------
+    def verifyObj(t_xObj):
+        return checkDstObjIndex(t_xObj, t_dstObjIndex)
 
-        # Add/extend the current batch to the total list (Final Obj List)
-        t_dstFinalObjList.extend(t_dstObjList)
-        t_dstObjCnt = len(t_dstFinalObjList)
+    return runConcurrently(verifyObj, t_xObjList, t_workers)
 
-    # print("\n         Dst Objects: ",  t_dstFinalObjList[0].keys())
-    return t_dstFinalObjList
-    
-def exportDstObjData(t_dstHost, t_dstPort, t_dstObjList, t_dstUser, t_dstPass):
+def exportDstObjData(t_dstHost, t_dstPort, t_dstObjList, t_dstUser, t_dstPass, t_workers=1):
 # -----------------------------------------------------------------------------
 # REST Assembly for EXPORTING specific Object Data from DESTINATION HOST
 #
 # Using the VAULT/KEYS2 API above, the dst host delivers all but the actual
 # key block of object.  This section returns and collects the key block for 
 # each object.
+#
+# Up to t_workers objects are exported at the same time.  All exports share
+# the token manager of the destination.  The returned list is in the same
+# order as t_dstObjList.  Unexportable objects and objects that could not be
+# exported are not included.
 # -----------------------------------------------------------------------------
 
     t_dstRESTAPI            = DST_REST_PREAMBLE + "vault/keys2"
     t_dstRESTKeyExportFlag  = "export"
     
-    t_dstObjData            = [] # created list to be returned later
-    t_ListLen               = len(t_dstObjList)
+    t_dstAuth               = getDstAuth(t_dstHost, t_dstPort, t_dstUser, t_dstPass)
 
-    t_dstAuthStr, t_dstAuthBornOn = createDstAuthStr(t_dstHost, t_dstPort, t_dstUser, t_dstPass)
-    
-    for obj in range(t_ListLen):
-        dstObjID    = t_dstObjList[obj][CMAttributeType.ID.value]
-        dstObjName  = t_dstObjList[obj][CMAttributeType.NAME.value]
+    # If the object is not exportable, then an error code will be returned.  So, check for exportability prior to
+    # attempting to export the key material from the DESTINATION.
+    t_exportList            = [t_obj for t_obj in t_dstObjList if t_obj[CMAttributeType.UNEXPORTABLE.value] != True]
+    t_unexportableCnt       = len(t_dstObjList) - len(t_exportList)
+    if t_unexportableCnt > 0:
+        print("  Dst Objects *UNEXPORTABLE*: %s (not exported)" %(t_unexportableCnt))
 
-        # If the object is not exportable, then an error code will be returned.  So, check for exportability prior to
-        # attempting to export the key material from the DESTINATION.
-        if t_dstObjList[obj][CMAttributeType.UNEXPORTABLE.value]==True:
-            tmpStr ="Dst Obj: %s Name: %s *UNEXPORTABLE*" %(obj, dstObjName)
-            # print(tmpStr)
-            continue
+    def exportObj(t_obj):
+        dstObjID    = t_obj[CMAttributeType.ID.value]
 
         t_dstHostRESTCmd = "https://%s:%s%s/%s/%s" %(t_dstHost, t_dstPort, t_dstRESTAPI, dstObjID, t_dstRESTKeyExportFlag)
-        t_dstHeaders = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_dstAuthStr}
+        t_dstHeaders = {"Authorization":t_dstAuth.getAuthStr()}
+
+        # Note that REST Command does not require a body object in this GET REST Command.  An export
+        # does not change the object, so it is retried as any read (see KRestRetryPolicy).
+        try:
+            r = getSession(t_dstHost, t_dstPort).post(t_dstHostRESTCmd, t_idempotent=True, headers=t_dstHeaders)
+        except requests.exceptions.RequestException as e:
+            print("  Obj ID:", dstObjID, repr(e))
+            return None
 
-        # Note that REST Command does not require a body object in this GET REST Command
-        r = requests.post(t_dstHostRESTCmd, headers=t_dstHeaders, verify=False)
         if(r.status_code != STATUS_CODE_OK):
             print("  Obj ID:", dstObjID)
             kPrintError("exportDstObjData", r)
-            continue
+            return None
 
-        t_data      = r.json()        
-        t_dstObjData.append(t_data)  #Add data to te list
-        
-        # tmpStr ="Dst Obj: %s Name: %s " %(obj, dstObjName)
-        tmpStr ="Dst Obj: %s Name: %s data: %s" %(obj, dstObjName, t_data)
-        # print(tmpStr)
-        
-        if isAuthStrRefreshNeeded(t_dstAuthBornOn):
-            t_dstAuthStr, t_dstAuthBornOn = createDstAuthStr(t_dstHost, t_dstPort, t_dstUser, t_dstPass) # refresh
-            print("  --> Destination Authorization Key Refreshed in exportDstObjData")
+        return r.json()
 
-    return t_dstObjData
+    # One result (or None) per exportable object, in list order
+    t_dstObjData            = runConcurrently(exportObj, t_exportList, t_workers)
+
+    return [t_data for t_data in t_dstObjData if t_data is not None]
 
 def importDstDataKeyObject(t_dstHost, t_dstPort, t_dstUser, t_dstAuthStr, t_xKeyObj):
 # -----------------------------------------------------------------------------
@@ -669,9 +835,9 @@ def importDstDataKeyObject(t_dstHost, t_dstPort, t_dstUser, t_dstAuthStr, t_xKey
     t_dstRESTKeyCreate        = DST_REST_PREAMBLE + "vault/keys2"
 
     t_dstHostRESTCmd = "https://%s:%s%s" %(t_dstHost, t_dstPort, t_dstRESTKeyCreate)
-    t_dstHeaders = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_dstAuthStr}
+    t_dstHeaders = {"Authorization":t_dstAuthStr}
 
-    r = requests.post(t_dstHostRESTCmd, data=json.dumps(t_xKeyObj), headers=t_dstHeaders, verify=False)
+    r = getSession(t_dstHost, t_dstPort).post(t_dstHostRESTCmd, data=json.dumps(t_xKeyObj), headers=t_dstHeaders)
 
     t_success = True
     if(r.status_code == STATUS_CODE_CREATED):
@@ -697,9 +863,9 @@ def importDstDataSecretObject(t_dstHost, t_dstPort, t_dstUser, t_dstAuthStr, t_x
     t_dstRESTCmd        = DST_REST_PREAMBLE + "vault/secrets"
 
     t_dstHostRESTCmd = "https://%s:%s%s" %(t_dstHost, t_dstPort, t_dstRESTCmd)
-    t_dstHeaders = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_dstAuthStr}
+    t_dstHeaders = {"Authorization":t_dstAuthStr}
 
-    r = requests.post(t_dstHostRESTCmd, data=json.dumps(t_xSecretObj), headers=t_dstHeaders, verify=False)
+    r = getSession(t_dstHost, t_dstPort).post(t_dstHostRESTCmd, data=json.dumps(t_xSecretObj), headers=t_dstHeaders)
 
     t_success = True
     if(r.status_code == STATUS_CODE_CREATED):
@@ -806,10 +972,10 @@ def getDstUserSelf(t_dstHost, t_dstPort, t_dstAuthStr):
     t_dstRESTUserMgmtSelf   = DST_REST_PREAMBLE + "usermgmt/users/self" #Note that the user 'self'
         
     t_dstHostRESTCmd    = "https://%s:%s%s" %(t_dstHost, t_dstPort, t_dstRESTUserMgmtSelf)
-    t_dstHeaders        = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_dstAuthStr}
+    t_dstHeaders        = {"Authorization":t_dstAuthStr}
 
     # Note that REST Command does not require a body object in this GET REST Command
-    r = requests.get(t_dstHostRESTCmd, headers=t_dstHeaders, verify=False)
+    r = getSession(t_dstHost, t_dstPort).get(t_dstHostRESTCmd, headers=t_dstHeaders)
     if(r.status_code != STATUS_CODE_OK):
         print("getDstUserSelf:", r)
         kPrintError("getDstUserSelf", r)
@@ -828,10 +994,10 @@ def getDstUsersAll(t_dstHost, t_dstPort, t_dstAuthStr):
     t_dstRESTUserMgmtSelf   = DST_REST_PREAMBLE + "usermgmt/users" 
         
     t_dstHostRESTCmd    = "https://%s:%s%s" %(t_dstHost, t_dstPort, t_dstRESTUserMgmtSelf)
-    t_dstHeaders        = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_dstAuthStr}
+    t_dstHeaders        = {"Authorization":t_dstAuthStr}
 
     # Note that REST Command does not require a body object in this GET REST Command
-    r = requests.get(t_dstHostRESTCmd, headers=t_dstHeaders, verify=False)
+    r = getSession(t_dstHost, t_dstPort).get(t_dstHostRESTCmd, headers=t_dstHeaders)
     if(r.status_code != STATUS_CODE_OK):
         print("getDstUsersAll:", r)
         kPrintError("getDstUsersAll", r)
@@ -849,10 +1015,10 @@ def getDstGroupsAll(t_dstHost, t_dstPort, t_dstAuthStr):
     t_dstRESTURI   = DST_REST_PREAMBLE + "usermgmt/groups/?limit=1000" 
         
     t_dstHostRESTCmd    = "https://%s:%s%s" %(t_dstHost, t_dstPort, t_dstRESTURI)
-    t_dstHeaders        = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_dstAuthStr}
+    t_dstHeaders        = {"Authorization":t_dstAuthStr}
 
     # Note that REST Command does not require a body object in this GET REST Command
-    r = requests.get(t_dstHostRESTCmd, headers=t_dstHeaders, verify=False)
+    r = getSession(t_dstHost, t_dstPort).get(t_dstHostRESTCmd, headers=t_dstHeaders)
     if(r.status_code != STATUS_CODE_OK):
         print("getDstGroupAll:", r)
         kPrintError("getDstGroupAll", r)
@@ -870,10 +1036,10 @@ def createDstUsrGroup(t_dstHost, t_dstPort, t_dstAuthStr, t_usrGroup):
     t_dstRESTURI   = DST_REST_PREAMBLE + "usermgmt/groups" 
         
     t_dstHostRESTCmd    = "https://%s:%s%s" %(t_dstHost, t_dstPort, t_dstRESTURI)
-    t_dstHeaders        = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_dstAuthStr}
+    t_dstHeaders        = {"Authorization":t_dstAuthStr}
 
     t_dstBody               = {"name":t_usrGroup}
-    r = requests.post(t_dstHostRESTCmd, data=json.dumps(t_dstBody), headers=t_dstHeaders, verify=False)
+    r = getSession(t_dstHost, t_dstPort).post(t_dstHostRESTCmd, data=json.dumps(t_dstBody), headers=t_dstHeaders)
     
     if(r.status_code != STATUS_CODE_CREATED):
         print("createDstUsrGroup:", r)
@@ -897,9 +1063,9 @@ def addDstUsrToGroup(t_dstHost, t_dstPort, t_dstAuthStr, t_userName, t_userID, t
     t_dstHostRESTCmd    = "https://%s:%s%s%s" \
                         %(t_dstHost, t_dstPort, t_dstRESTURI, t_grpAndUsrURIExt)
         
-    t_dstHeaders        = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_dstAuthStr}
+    t_dstHeaders        = {"Authorization":t_dstAuthStr}
 
-    r = requests.post(t_dstHostRESTCmd, headers=t_dstHeaders, verify=False)
+    r = getSession(t_dstHost, t_dstPort).post(t_dstHostRESTCmd, headers=t_dstHeaders)
     
     if(r.status_code != STATUS_CODE_OK):
         print("addDstUsrToGroup:", r)
@@ -912,86 +1078,6 @@ def addDstUsrToGroup(t_dstHost, t_dstPort, t_dstAuthStr, t_userName, t_userID, t
     
     return t_Info
 
-def getDstKeyByName(t_dstHost, t_dstPort, t_dstAuthStr, t_dstKeyName):
-# -----------------------------------------------------------------------------
-# REST Assembly for READING specific Object Data from DESTINATION HOST
-#
-# Using the VAULT/KEYS2 API above, the dst host delivers all but the actual
-# key block of object.  This section returns and collects the key block for 
-# each object.
-# -----------------------------------------------------------------------------
-
-    t_dstRESTAPI               = DST_REST_PREAMBLE + "vault/keys2/?name="
-    
-    t_dstHostRESTCmd = "https://%s:%s%s%s" %(t_dstHost, t_dstPort, t_dstRESTAPI, t_dstKeyName)
-    t_dstHeaders = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_dstAuthStr}
-
-    # Note that REST Command does not require a body object in this GET REST Command
-    r = requests.get(t_dstHostRESTCmd, headers=t_dstHeaders, verify=False)
-    if(r.status_code != STATUS_CODE_OK):
-        print("  dstKeyNme:", t_dstKeyName)
-        kPrintError("getDstKeyByName", r)
-
-    t_data      = r.json()[CMAttributeType.RESOURCES.value][0]
-    
-    return t_data
-
-def addDataObjectToGroup(t_dstHost, t_dstPort, t_dstGrp, t_dstAuthStr, t_xKeyObj):
-# -----------------------------------------------------------------------------
-# REST Assembly for Updating (Patch) a Data Object with group assignement
-#
-# This routine needs to be called for EACH key that needs to be added
-# to the group.
-# -----------------------------------------------------------------------------
-
-    t_dstRESTAPI         = DST_REST_PREAMBLE + "vault/keys2"
-
-    t_alias = str(t_xKeyObj[CMAttributeType.ALIASES.value][0][CMAliasesAttribute.ALIAS.value])
-    t_keyID = str(t_xKeyObj[CMAttributeType.ID.value])
-    
-    t_dstHostRESTCmd = "https://%s:%s%s/%s?type=id" %(t_dstHost, t_dstPort, t_dstRESTAPI, t_keyID)
-    t_dstHeaders = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_dstAuthStr}
-    
-    # In order to assign a key to a Group, you need to provide the key 
-    # alias (which is the same thing as the name) and the Group name.
-    
-
-    # You need to update (patch) the object twice:  once to clear the 
-    # alias (index 0) and a second time to re-add the alias along 
-    # with the permissions (no index specified).
-    
-    t_keyEmptyAliasData = CMKeyEmptyAliasData()
-    t_body              = t_keyEmptyAliasData.payload
-    
-    r = requests.patch(t_dstHostRESTCmd, data=json.dumps(t_body), headers=t_dstHeaders, verify=False)
-
-    # If clearomg of the alias information is successful, then proceed
-    # with redefining it along with the other meta data (which includes
-    # group assignment)
-    t_success = True
-    if(r.status_code == STATUS_CODE_OK):
-        # t_Response      = r.json()        
-        print("  ->Object Alias Data Cleared: ", t_alias)
-        
-        t_keyMetaData   = CMKeyNewMetaData(t_alias, t_dstGrp)
-        t_body          = t_keyMetaData.payload
-
-        r = requests.patch(t_dstHostRESTCmd, data=json.dumps(t_body), headers=t_dstHeaders, verify=False)
-
-        t_success = True
-        if(r.status_code == STATUS_CODE_OK):
-            # t_Response      = r.json()        
-            print("  ->Object Added to Group: ", t_alias)
-        else:
-            kPrintError("addDataObjectToGroup-full", r)        
-            t_success = False         
-        
-    else:
-        kPrintError("addDataObjectToGroup-clear", r)        
-        t_success = False
-    
-    return t_success
-
 def getSrcClients(t_srcHost, t_srcPort, t_srcAuthStr):
 # -----------------------------------------------------------------------------
 # REST Assembly for obtaining a list of availabvle clients on the Source Server
@@ -1002,10 +1088,10 @@ def getSrcClients(t_srcHost, t_srcPort, t_srcAuthStr):
     t_srcRESTCmd            = SRC_REST_PREAMBLE + "clients"
     t_srcHostRESTCmd        = "https://%s:%s%s" %(t_srcHost, t_srcPort, t_srcRESTCmd)   
 
-    t_srcHeaders            = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization": t_srcAuthStr}
+    t_srcHeaders            = {"Authorization":t_srcAuthStr}
 
     # Note that this REST Command does not require a body object in this GET REST Command
-    r = requests.get(t_srcHostRESTCmd, headers=t_srcHeaders, verify=False)
+    r = getListing(t_srcHost, t_srcPort, t_srcHostRESTCmd, t_srcHeaders)
 
     if(r.status_code != STATUS_CODE_OK):
         kPrintError("getSrcClients", r)
@@ -1021,14 +1107,14 @@ def assignSrcClientUsers(t_srcHost, t_srcPort, t_srcAuthStr, t_client, t_userLis
 # -----------------------------------------------------------------------------
     t_srcRESTListObjects    = SRC_REST_PREAMBLE + "clients/" + t_client + "/assignUsers"
     t_srcHostRESTCmd        = "https://%s:%s%s" %(t_srcHost, t_srcPort, t_srcRESTListObjects)
-    t_srcHeaders            = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_srcAuthStr}
+    t_srcHeaders            = {"Authorization":t_srcAuthStr}
 
     t_srcBody               = {"users":t_userList}
 
     t_success = True
 
     # Note that this REST Command is a PUT command
-    r = requests.put(t_srcHostRESTCmd, data=json.dumps(t_srcBody), headers=t_srcHeaders, verify=False)
+    r = getSession(t_srcHost, t_srcPort).put(t_srcHostRESTCmd, data=json.dumps(t_srcBody), headers=t_srcHeaders)
     if(r.status_code != STATUS_CODE_OK):
         kPrintError("assignSrcClientUsers", r)
         exit()
@@ -1041,57 +1127,27 @@ def removeSrcClientUsers(t_srcHost, t_srcPort, t_srcAuthStr, t_client, t_userLis
 # -----------------------------------------------------------------------------
     t_srcRESTListObjects    = SRC_REST_PREAMBLE + "clients/" + t_client + "/removeUsers"
     t_srcHostRESTCmd        = "https://%s:%s%s" %(t_srcHost, t_srcPort, t_srcRESTListObjects)
-    t_srcHeaders            = {"Content-Type":APP_JSON, "Accept":APP_JSON, "Authorization":t_srcAuthStr}
+    t_srcHeaders            = {"Authorization":t_srcAuthStr}
 
     t_srcBody               = {"users":t_userList}
 
     t_success = True
 
     # Note that this REST Command is a PUT command
-    r = requests.put(t_srcHostRESTCmd, data=json.dumps(t_srcBody), headers=t_srcHeaders, verify=False)
+    r = getSession(t_srcHost, t_srcPort).put(t_srcHostRESTCmd, data=json.dumps(t_srcBody), headers=t_srcHeaders)
     if(r.status_code != STATUS_CODE_OK):
         kPrintError("assignSrcClientUsers", r)
         exit()
 
     return t_success
 
-def checkForSrcCustomAttributes(t_srcKeyObjDataList):
-# -----------------------------------------------------------------------------
-# Some KMIP clients (i.e. NetApp) will store custom attributes in the KMIP
-# server.  However, each KMIP server stores that information differently.
-# This code checks for the existance of custom attributes in SKLM by looking
-# to see if "Custom Attributes" key is present, and if it contains NetApp-
-# specific elements.
-# -----------------------------------------------------------------------------
-
-    t_srcCustomAttributesIsPresent      = False
-    t_srcNetAppAttributesArePresent     = False
-
-    if GKLMAttributeType.CUSTOM_ATTRIBUTES.value in t_srcKeyObjDataList:
-        if len(t_srcKeyObjDataList[GKLMAttributeType.CUSTOM_ATTRIBUTES.value]) > 0:
-            t_srcCustomAttributesIsPresent    = True
-            if NetAppCustomAttribute.NETAPPHEADER.value in t_srcKeyObjDataList[GKLMAttributeType.CUSTOM_ATTRIBUTES.value]:
-                t_srcNetAppAttributesArePresent = True
-
-    return t_srcCustomAttributesIsPresent, t_srcNetAppAttributesArePresent
-
-def mapKeyUsage(t_srcKeyObjDataListUMStr, t_keyUsageDict):
+@lru_cache(maxsize=None)
+def getGroupPermissions(t_dstGrp):
 # ---------------------------------------------------------------------------------
-# GKLM stores the Key Usage Mask as a string.  CM stores it a the associated KMIP 
-# value.  As such, the GKLM Key Usage Mask string must be replaced with the 
-# appropriate value before storing it in CM.
+# Return the destination meta data permissions that grant t_dstGrp access to an
+# object.  The permissions are created once per group and shared by all objects.
 # ---------------------------------------------------------------------------------
-
-    t_xKeyObjUMask    = CryptographicUsageMask.NULL.value  # Initialize
-    t_srcUMask        = t_srcKeyObjDataListUMStr
-    t_srcUMask        = t_srcUMask.strip()      # trim leading and trailing spaces from srcUM strin
-    t_srcUMList       = t_srcUMask.split(' ')   # break string into list
-
-    for t_srcUM in t_srcUMList:
-        if t_srcUM in t_keyUsageDict.keys():
-            t_xKeyObjUMask    = t_xKeyObjUMask  | t_keyUsageDict[t_srcUM]
-
-    return t_xKeyObjUMask 
+    return CMGroupPermissions(t_dstGrp).permissions
 
 def createDictFromEnum(t_enum):
 # ----------------------------------------------------------------------------------
@@ -1103,21 +1159,3 @@ def createDictFromEnum(t_enum):
         returnDict[tmpEnum.name] = tmpEnum.value
 
     return returnDict
-
-def isAuthStrRefreshNeeded(t_bornOn):
-# ----------------------------------------------------------------------------------
-# The DST Bearer token / Auth token will expire after 300 seconds on CM.  
-# Include this check before you use the Auth token check its age.
-# ----------------------------------------------------------------------------------
-    result = False # default
-    t_currentTime = datetime.now()
-    t_timeDiff = t_currentTime - t_bornOn
-    time_diff_secs = t_timeDiff.total_seconds()
-
-    # print("Time Diff:", time_diff_secs)
-
-    if time_diff_secs > 275: # something lower than 300
-        # print("Auth String Refresh Needed")
-        result = True
-
-    return result
\ No newline at end of file
@@ -193,6 +193,43 @@ class listOnlyOption(enum.Enum):
     DESTINATION                 = 'DESTINATION'
     BOTH                        = 'BOTH'
     
+class engineOption(enum.Enum):
+    REQUESTS                    = 'REQUESTS'
+    ASYNCIO                     = 'ASYNCIO'
+
+class journalStatus(enum.Enum):
+    IMPORTED                    = 'imported'
+    FAILED                      = 'failed'
+    EXISTS                      = 'exists'
+    CONFLICT                    = 'conflict'
+
+class reportFormatOption(enum.Enum):
+    JSONL                       = 'JSONL'
+    CSV                         = 'CSV'
+
+class reportStage(enum.Enum):
+    SOURCE                      = 'source'      # object retrieved from the source
+    IMPORT                      = 'import'      # outcome of the import (see journalStatus)
+    VERIFY                      = 'verify'      # outcome of the verification (see dstIndexStatus)
+    DESTINATION                 = 'destination' # object listed in the destination
+
+class metricsPhase(enum.Enum):
+    SETUP                       = 'setup'       # logins, users and groups
+    SOURCE                      = 'source'      # source listings and key block retrievals
+    IMPORT                      = 'import'      # group configuration, destination index and imports
+    STREAM                      = 'stream'      # source retrievals and imports when streaming
+    DESTINATION                 = 'destination' # destination listing, export or verification
+
+class shardKeyOption(enum.Enum):
+    UUID                        = 'UUID'        # objects are divided among the shards by UUID
+    CLIENT                      = 'CLIENT'      # clients (and all of their objects) are divided among the shards
+
+class dstIndexStatus(enum.Enum):
+    ABSENT                      = 'absent'      # name is not in the destination
+    IDENTICAL                   = 'identical'   # name and fingerprint match
+    PRESENT                     = 'present'     # name matches, fingerprint not available
+    CONFLICT                    = 'conflict'    # name matches, fingerprint differs
+
 class NetAppCustomAttribute(enum.Enum):
     NETAPPHEADER                = 'x-NETAPP'
     NODEID                      = 'x-NETAPP-NodeId'
@@ -246,6 +283,15 @@ class CMUserGroup:
         self.member             = member
         self.desc               = description
 
+class CMGroupPermissions:
+    def __init__(self, t_group):
+        self.group              = t_group
+
+        # every permission (UseKey, ReadKey, ... SignVerifyWithKey) is granted to the group
+        self.permissions        = {}
+        for t_permission in CMMetaGroupPermissions:
+            self.permissions.update({t_permission.value: [t_group]})
+
 class CMKeyNewMetaData:
     def __init__(self, t_alias, t_group):
         self.alias              = t_alias
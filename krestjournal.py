@@ -0,0 +1,94 @@
+# key-rest-journal
+#
+# definition file of the checkpoint journal.  The outcome of every object
+# imported into the destination is appended to a local file so that an
+# interrupted migration can be resumed without repeating the objects that
+# were already imported.
+#
+######################################################################
+import  atexit
+import  json
+import  os
+import  threading
+from    datetime import datetime
+from    krestenums import *
+
+# ---------------- CONSTANTS -----------------------------------------------------
+DEFAULT_SYNC_BATCH  = 100   # records written between each flush to disk
+
+JOURNAL_UUID        = "uuid"
+JOURNAL_NAME        = "name"
+JOURNAL_STATUS      = "status"
+JOURNAL_TIME        = "time"
+
+class KRestJournal:
+# -------------------------------------------------------------------------------
+# Append-only journal of per-object outcomes.  Each record is one line of JSON:
+#
+#   {"uuid": <source UUID>, "name": <destination name>, "status": <journalStatus>, "time": ...}
+#
+# Records are written to the file immediately but are only forced to disk (fsync)
+# once every t_syncBatch records and when the journal is closed.  A system crash 
+# may therefore lose the last (up to t_syncBatch) records, in which case those 
+# objects are simply processed again.
+# -------------------------------------------------------------------------------
+    def __init__(self, t_fileName, t_syncBatch=DEFAULT_SYNC_BATCH):
+        self.fileName       = t_fileName
+        self.syncBatch      = t_syncBatch
+        self.unsyncedCnt    = 0
+        self.lock           = threading.Lock()
+        self.file           = open(t_fileName, "a", encoding="utf-8")
+
+        atexit.register(self.close)     # also sync the journal if the run exits early
+
+    def record(self, t_srcUUID, t_dstName, t_status):
+        t_line = json.dumps({JOURNAL_UUID:t_srcUUID, JOURNAL_NAME:t_dstName, JOURNAL_STATUS:t_status,
+                             JOURNAL_TIME:datetime.now().isoformat(timespec="seconds")})
+
+        with self.lock:
+            if self.file is None:
+                return
+
+            self.file.write(t_line + "\n")
+            self.file.flush()
+            self.unsyncedCnt = self.unsyncedCnt + 1
+            if self.unsyncedCnt >= self.syncBatch:
+                self.sync()
+
+    def sync(self):
+        # caller holds self.lock
+        os.fsync(self.file.fileno())
+        self.unsyncedCnt = 0
+
+    def close(self):
+        with self.lock:
+            if self.file is None:
+                return
+
+            self.file.flush()
+            self.sync()
+            self.file.close()
+            self.file = None
+
+def readJournalImportedUUIDs(t_fileName):
+# -------------------------------------------------------------------------------
+# Return the set of source UUIDs that the journal shows were imported (or were
+# found to be already present in the destination).  A missing journal is treated as empty and an incomplete final
+# line (from an interrupted write) is ignored.
+# -------------------------------------------------------------------------------
+    t_importedSet = set()
+
+    if not os.path.exists(t_fileName):
+        return t_importedSet
+
+    with open(t_fileName, "r", encoding="utf-8") as t_file:
+        for t_line in t_file:
+            try:
+                t_record = json.loads(t_line)
+            except ValueError:
+                continue    # skip partial record
+
+            if t_record.get(JOURNAL_STATUS) in (journalStatus.IMPORTED.value, journalStatus.EXISTS.value):
+                t_importedSet.add(t_record[JOURNAL_UUID])
+
+    return t_importedSet
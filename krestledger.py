@@ -0,0 +1,162 @@
+# key-rest-ledger
+#
+# definition file of the migration ledger.  A local SQLite database
+# records, for every source object, what each run read from the source
+# and what was imported into the destination.  A later run can then
+# compare the source listing against the ledger and migrate only the
+# objects that are new or have changed (a delta).
+#
+######################################################################
+import  atexit
+import  hashlib
+import  json
+import  sqlite3
+import  threading
+import  time
+from    datetime import datetime
+from    krestenums import *
+
+# ---------------- CONSTANTS -----------------------------------------------------
+DEFAULT_COMMIT_BATCH    = 500   # ledger writes per transaction
+DEFAULT_COMMIT_INTERVAL = 2     # seconds before pending writes are committed anyway
+
+LEDGER_STATUS_READ      = "read"    # listed and retrieved, outcome not yet known
+
+# Statuses of objects that are in the destination
+LEDGER_DONE_STATUS_LIST = [journalStatus.IMPORTED.value, journalStatus.EXISTS.value]
+
+LEDGER_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS runs (
+           run_id       INTEGER PRIMARY KEY AUTOINCREMENT,
+           started      TEXT,
+           finished     TEXT,
+           read_cnt     INTEGER DEFAULT 0,
+           result_cnt   INTEGER DEFAULT 0)""",
+    """CREATE TABLE IF NOT EXISTS objects (
+           src_uuid         TEXT PRIMARY KEY,
+           listing_digest   TEXT,
+           dst_name         TEXT,
+           fingerprint      TEXT,
+           status           TEXT,
+           run_id           INTEGER,
+           time             TEXT)""",
+    "CREATE INDEX IF NOT EXISTS objects_dst_name ON objects (dst_name)",
+    "CREATE INDEX IF NOT EXISTS objects_fingerprint ON objects (fingerprint)",
+]
+
+def getSrcObjListingDigest(t_srcObj):
+# -------------------------------------------------------------------------------
+# Return a SHA-256 digest of the attributes of a source object listing.  If any
+# attribute of the object changes (including the KMIP digest of its material),
+# so does the listing digest.  The key block and the client name (added by
+# k-rest) are not part of the listing and are ignored.
+# -------------------------------------------------------------------------------
+    t_listingDict = {t_key:t_val for t_key, t_val in t_srcObj.items()
+                     if t_key not in (GKLMAttributeType.KEY_BLOCK.value, GKLMAttributeType.CLIENT_NAME.value)}
+
+    return hashlib.sha256(json.dumps(t_listingDict, sort_keys=True).encode()).hexdigest()
+
+class KRestLedger:
+# -------------------------------------------------------------------------------
+# SQLite ledger of per-object state, indexed by source UUID, destination name and
+# material fingerprint.  Each object is recorded when it is read from the source
+# (with the digest of its listing) and again with the outcome of its import.
+#
+# Writes are grouped:  they are committed once every t_commitBatch writes, once
+# t_commitInterval seconds have passed since the last commit, and when the ledger
+# is closed.  A crash may therefore lose the last few writes, in which case those
+# objects are simply migrated again by the next delta.
+# -------------------------------------------------------------------------------
+    def __init__(self, t_fileName, t_commitBatch=DEFAULT_COMMIT_BATCH, t_commitInterval=DEFAULT_COMMIT_INTERVAL):
+        self.fileName       = t_fileName
+        self.commitBatch    = t_commitBatch
+        self.commitInterval = t_commitInterval
+        self.pendingCnt     = 0
+        self.lastCommit     = time.monotonic()
+        self.readCnt        = 0
+        self.resultCnt      = 0
+        self.lock           = threading.Lock()
+
+        self.conn           = sqlite3.connect(t_fileName, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        for t_sql in LEDGER_SCHEMA:
+            self.conn.execute(t_sql)
+
+        t_cursor            = self.conn.execute("INSERT INTO runs (started) VALUES (?)", (self.now(),))
+        self.runID          = t_cursor.lastrowid
+        self.conn.commit()
+
+        atexit.register(self.close)     # also commit the ledger if the run exits early
+
+    def now(self):
+        return datetime.now().isoformat(timespec="seconds")
+
+    def isUnchanged(self, t_srcUUID, t_listingDigest):
+        # True if the object was already migrated and its listing has not changed since
+        with self.lock:
+            if self.conn is None:
+                return False
+
+            t_row = self.conn.execute("SELECT listing_digest, status FROM objects WHERE src_uuid = ?", (t_srcUUID,)).fetchone()
+
+        return t_row is not None and t_row[0] == t_listingDigest and t_row[1] in LEDGER_DONE_STATUS_LIST
+
+    def recordRead(self, t_srcUUID, t_listingDigest):
+        # An object whose listing has not changed keeps its outcome (e.g. imported), so that
+        # a run that does not import it (without -delta, or -listOnly) does not undo it
+        self.write("""INSERT INTO objects (src_uuid, listing_digest, status, run_id, time) VALUES (?, ?, ?, ?, ?)
+                      ON CONFLICT (src_uuid) DO UPDATE SET listing_digest = excluded.listing_digest,
+                                                           status = CASE WHEN objects.listing_digest = excluded.listing_digest
+                                                                         THEN objects.status ELSE excluded.status END,
+                                                           run_id = excluded.run_id, time = excluded.time""",
+                   (t_srcUUID, t_listingDigest, LEDGER_STATUS_READ, self.runID, self.now()))
+        with self.lock:
+            self.readCnt = self.readCnt + 1
+
+    def recordResult(self, t_srcUUID, t_dstName, t_fingerprint, t_status):
+        self.write("""INSERT INTO objects (src_uuid, dst_name, fingerprint, status, run_id, time) VALUES (?, ?, ?, ?, ?, ?)
+                      ON CONFLICT (src_uuid) DO UPDATE SET dst_name = excluded.dst_name, fingerprint = excluded.fingerprint,
+                                                           status = excluded.status, run_id = excluded.run_id, time = excluded.time""",
+                   (t_srcUUID, t_dstName, t_fingerprint, t_status, self.runID, self.now()))
+        with self.lock:
+            self.resultCnt = self.resultCnt + 1
+
+    def filterSrcObj(self, t_srcObj, t_skipUnchanged):
+        # Listing filter (see filterSrcObjListForRetrieval).  Returns False for objects that are
+        # skipped as unchanged.  Every other object is recorded as read.
+        t_srcUUID       = t_srcObj[GKLMAttributeType.UUID.value]
+        t_listingDigest = getSrcObjListingDigest(t_srcObj)
+
+        if t_skipUnchanged and self.isUnchanged(t_srcUUID, t_listingDigest):
+            return False
+
+        self.recordRead(t_srcUUID, t_listingDigest)
+        return True
+
+    def write(self, t_sql, t_params):
+        with self.lock:
+            if self.conn is None:
+                return
+
+            self.conn.execute(t_sql, t_params)
+            self.pendingCnt = self.pendingCnt + 1
+            if self.pendingCnt >= self.commitBatch or time.monotonic() - self.lastCommit >= self.commitInterval:
+                self.commit()
+
+    def commit(self):
+        # caller holds self.lock
+        self.conn.commit()
+        self.pendingCnt = 0
+        self.lastCommit = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            if self.conn is None:
+                return
+
+            self.conn.execute("UPDATE runs SET finished = ?, read_cnt = ?, result_cnt = ? WHERE run_id = ?",
+                              (self.now(), self.readCnt, self.resultCnt, self.runID))
+            self.commit()
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,224 @@
+# key-rest-limiter
+#
+# definition file of the adaptive concurrency limiters.  A limiter caps
+# the number of requests outstanding to one server and adjusts the cap
+# as the run progresses:  it is raised while the latency of the server
+# stays flat and lowered quickly when the server reports that it is
+# overloaded or its latency rises.
+#
+######################################################################
+import  asyncio
+import  collections
+import  threading
+import  time
+from    krestsession import *
+
+# ---------------- CONSTANTS -----------------------------------------------------
+DEFAULT_INITIAL_LIMIT   = 4     # requests outstanding when the run starts
+MIN_LIMIT               = 1
+
+OVERLOAD_DECREASE       = 0.5   # factor applied to the limit when the server is overloaded
+LATENCY_DECREASE        = 0.8   # factor applied to the limit when the latency rises
+LATENCY_TOLERANCE       = 1.5   # the latency is rising if the p95 exceeds the baseline by this factor
+BASELINE_DRIFT          = 1.02  # factor by which the baseline p95 may rise per window
+MIN_WINDOW_SAMPLES      = 10    # responses per window (at least the limit)
+
+# Responses (and failed requests, see METRICS_STATUS_EXCEPTION) that show the server is overloaded
+OVERLOAD_STATUS_LIST    = [METRICS_STATUS_EXCEPTION, 429, 502, 503, 504]
+
+class KRestLimiter:
+# -------------------------------------------------------------------------------
+# AIMD limiter of the requests outstanding to one server.  Every request waits
+# for a free slot (see acquire and acquireAsync) and returns the slot with its
+# latency and status (see release).
+#
+#   - The responses are collected in windows of at least the current limit.  If
+#     the p95 latency of a window stays within LATENCY_TOLERANCE of the baseline
+#     (the lowest p95 seen, drifting up slowly), the limit is raised:  doubled
+#     until the first decrease (slow start) and by one afterwards.
+#   - If the p95 latency rises, the limit is lowered by LATENCY_DECREASE.
+#   - If the server is overloaded (429, 502-504 or no response), the limit is
+#     lowered at once by OVERLOAD_DECREASE.  Responses to requests sent before
+#     the last decrease do not lower it again.
+#
+# The limit never exceeds t_maxLimit (the number of workers or the in-flight
+# limit of the engine).  Each change of the limit is kept so that the limits
+# chosen can be reported (see getSummaryStr and getTimelineStr).
+# -------------------------------------------------------------------------------
+    def __init__(self, t_label, t_maxLimit, t_initialLimit=DEFAULT_INITIAL_LIMIT):
+        self.label          = t_label
+        self.maxLimit       = max(t_maxLimit, MIN_LIMIT)
+        self.limit          = float(min(max(t_initialLimit, MIN_LIMIT), self.maxLimit))
+        self.initialLimit   = int(self.limit)
+        self.inFlight       = 0
+        self.cond           = threading.Condition()
+        self.asyncWaiterList = collections.deque()  # (loop, future) of coroutines waiting for a slot
+
+        self.slowStart      = True
+        self.windowList     = []    # latencies of the current window
+        self.baseP95        = None
+        self.lastDecrease   = 0.0
+        self.latencyDecreaseCnt  = 0
+        self.overloadDecreaseCnt = 0
+
+        self.startTime      = time.monotonic()
+        self.historyList    = [(0.0, self.initialLimit)]    # (seconds since start, limit)
+
+    def getLimit(self):
+        return int(self.limit)
+
+    def acquire(self):
+        with self.cond:
+            while self.inFlight >= int(self.limit):
+                self.cond.wait()
+
+            self.inFlight = self.inFlight + 1
+
+    async def acquireAsync(self):
+        t_loop = asyncio.get_running_loop()
+        with self.cond:
+            if self.inFlight < int(self.limit) and len(self.asyncWaiterList) == 0:
+                self.inFlight = self.inFlight + 1
+                return
+
+            t_future = t_loop.create_future()
+            self.asyncWaiterList.append((t_loop, t_future))
+
+        try:
+            await t_future
+        except asyncio.CancelledError:
+            with self.cond:
+                if (t_loop, t_future) in self.asyncWaiterList:
+                    self.asyncWaiterList.remove((t_loop, t_future))
+                    raise
+
+            if t_future.done() and not t_future.cancelled():
+                self.releaseSlot()      # the slot was granted, but will not be used
+            raise
+
+    def grantAsync(self, t_future):
+        # runs on the loop of the waiting coroutine
+        if t_future.cancelled():
+            self.releaseSlot()
+        else:
+            t_future.set_result(None)
+
+    def dispatch(self):
+        # caller holds self.cond.  Hand the free slots to the waiting coroutines, then the threads.
+        while len(self.asyncWaiterList) > 0 and self.inFlight < int(self.limit):
+            t_loop, t_future = self.asyncWaiterList.popleft()
+            self.inFlight = self.inFlight + 1
+            t_loop.call_soon_threadsafe(self.grantAsync, t_future)
+
+        if self.inFlight < int(self.limit):
+            self.cond.notify_all()
+
+    def releaseSlot(self):
+        with self.cond:
+            self.inFlight = self.inFlight - 1
+            self.dispatch()
+
+    def release(self, t_secs, t_status):
+        t_now = time.monotonic()
+        with self.cond:
+            self.inFlight = self.inFlight - 1
+
+            if t_status in OVERLOAD_STATUS_LIST:
+                # only requests sent since the last decrease reflect the current limit
+                if t_now - t_secs >= self.lastDecrease:
+                    self.overloadDecreaseCnt = self.overloadDecreaseCnt + 1
+                    self.decrease(OVERLOAD_DECREASE, t_now)
+            else:
+                self.windowList.append(t_secs)
+                if len(self.windowList) >= max(MIN_WINDOW_SAMPLES, int(self.limit)):
+                    self.closeWindow(t_now)
+
+            self.dispatch()
+
+    def closeWindow(self, t_now):
+        # caller holds self.cond
+        self.windowList.sort()
+        t_p95 = self.windowList[int(0.95 * (len(self.windowList) - 1))]
+        self.windowList = []
+
+        if self.baseP95 is None:
+            self.baseP95 = t_p95
+
+        if t_p95 > self.baseP95 * LATENCY_TOLERANCE:
+            self.latencyDecreaseCnt = self.latencyDecreaseCnt + 1
+            self.decrease(LATENCY_DECREASE, t_now)
+        elif self.slowStart:
+            self.setLimit(self.limit * 2, t_now)
+        else:
+            self.setLimit(self.limit + 1, t_now)
+
+        self.baseP95 = min(self.baseP95 * BASELINE_DRIFT, t_p95)
+
+    def decrease(self, t_factor, t_now):
+        # caller holds self.cond
+        self.slowStart      = False
+        self.lastDecrease   = t_now
+        self.windowList     = []
+        self.setLimit(self.limit * t_factor, t_now)
+
+    def setLimit(self, t_limit, t_now):
+        # caller holds self.cond
+        t_oldLimit  = int(self.limit)
+        self.limit  = min(max(t_limit, float(MIN_LIMIT)), float(self.maxLimit))
+        if int(self.limit) != t_oldLimit:
+            self.historyList.append((t_now - self.startTime, int(self.limit)))
+
+    def getSummaryStr(self):
+        with self.cond:
+            t_historyList   = list(self.historyList)
+            t_elapsed       = time.monotonic() - self.startTime
+
+        # time-weighted mean of the limit
+        t_weightedSum = 0.0
+        for t_idx, (t_time, t_limit) in enumerate(t_historyList):
+            t_endTime = t_historyList[t_idx + 1][0] if t_idx + 1 < len(t_historyList) else t_elapsed
+            t_weightedSum = t_weightedSum + t_limit * (t_endTime - t_time)
+
+        t_limitList = [t_limit for t_time, t_limit in t_historyList]
+        return "limit %s -> %s (range %s-%s, mean %.1f of max %s), %s overload and %s latency decreases" %(self.initialLimit, int(self.limit),
+                    min(t_limitList), max(t_limitList), t_weightedSum / t_elapsed if t_elapsed > 0 else self.limit, self.maxLimit,
+                    self.overloadDecreaseCnt, self.latencyDecreaseCnt)
+
+    def getTimelineStr(self, t_pointCnt=10):
+        # Returns the limit at t_pointCnt evenly spaced times of the run, e.g. "0s:4 10s:16 20s:12"
+        with self.cond:
+            t_historyList   = list(self.historyList)
+            t_elapsed       = time.monotonic() - self.startTime
+
+        t_pointList = []
+        for t_idx in range(t_pointCnt + 1):
+            t_time  = t_elapsed * t_idx / t_pointCnt
+            t_limit = [t_limit for t_changeTime, t_limit in t_historyList if t_changeTime <= t_time][-1]
+            t_pointList.append("%.0fs:%s" %(t_time, t_limit))
+
+        return " ".join(t_pointList)
+
+# Limiters are optional and exist per server
+_limiterList = []
+
+def configureLimiter(t_host, t_port, t_maxLimit, t_initialLimit=DEFAULT_INITIAL_LIMIT):
+# -------------------------------------------------------------------------------
+# Govern the requests sent to a server with an adaptive limiter of no more than
+# t_maxLimit.  If the source and destination are the same server, they share the
+# limiter (with the larger maximum).
+# -------------------------------------------------------------------------------
+    t_session = getSession(t_host, t_port)
+    if t_session.limiter is not None:
+        t_session.limiter.maxLimit = max(t_session.limiter.maxLimit, t_maxLimit)
+        return t_session.limiter
+
+    t_session.limiter = KRestLimiter("%s:%s" %(t_host, t_port), t_maxLimit, t_initialLimit)
+    _limiterList.append(t_session.limiter)
+
+    return t_session.limiter
+
+def getLimiterList():
+# -------------------------------------------------------------------------------
+# Return the adaptive limiters of the run (if any)
+# -------------------------------------------------------------------------------
+    return list(_limiterList)
@@ -0,0 +1,182 @@
+# key-rest-mapper
+#
+# definition file of the object mapper.  Source (GKLM) key and secret
+# objects are mapped to destination (CM) objects with field names that
+# are resolved once, when the module is loaded, and with the translation
+# of the few distinct usage mask (and type and state) strings memoized,
+# so that the per-object work is limited to building the CM payload.
+#
+# The payloads are identical to those of the per-object functions that it
+# replaced (see bench/bench_mapper.py and tests/test_mapper.py).
+#
+######################################################################
+from    functools import lru_cache
+from    krestcmds import *
+from    krestenums import *
+
+# ---------------- CONSTANTS -----------------------------------------------------
+# Source (GKLM) fields
+SRC_ALIAS               = GKLMAttributeType.ALIAS.value
+SRC_NAME                = GKLMAttributeType.NAME.value
+SRC_TYPE                = GKLMAttributeType.TYPE.value
+SRC_KEY_TYPE            = GKLMAttributeType.KEY_TYPE.value
+SRC_KEY_ALGORITHM       = GKLMAttributeType.KEY_ALGORITHM.value
+SRC_KEY_LENGTH          = GKLMAttributeType.KEY_LENGTH.value
+SRC_SECRET_LENGTH       = GKLMAttributeType.SECRET_CRYPOGRAPHIC_LENGTH.value
+SRC_SECRET_STATE        = GKLMAttributeType.SECRET_STATE.value
+SRC_USAGE_MASK          = GKLMAttributeType.CRYPTOGRAPHIC_USAGE_MASK.value
+SRC_CUSTOM_ATTRIBUTES   = GKLMAttributeType.CUSTOM_ATTRIBUTES.value
+SRC_KEY_BLOCK           = GKLMAttributeType.KEY_BLOCK.value
+SRC_KEY_MATERIAL        = "KEY_MATERIAL"
+SRC_KEY_FORMAT          = "KEY_FORMAT"
+
+# Destination (CM) fields
+DST_NAME                = CMAttributeType.NAME.value
+DST_USAGE_MASK          = CMAttributeType.USAGE_MASK.value
+DST_ALGORITHM           = CMAttributeType.ALGORITHM.value
+DST_SIZE                = CMAttributeType.SIZE.value
+DST_OBJECT_TYPE         = CMAttributeType.OBJECT_TYPE.value
+DST_MATERIAL            = CMAttributeType.MATERIAL.value
+DST_FORMAT              = CMAttributeType.FORMAT.value
+DST_META                = CMAttributeType.META.value
+DST_OWNER_ID            = CMAttributeType.OWNER_ID.value
+DST_STATE               = CMAttributeType.STATE.value
+DST_ALIASES             = CMAttributeType.ALIASES.value
+DST_DATA_TYPE           = CMSecretAttributeType.DATA_TYPE.value
+DST_GROUP_PERMISSIONS   = CMMetaAttribute.GROUP_PERMISSIONS.value
+DST_ALIAS               = CMAliasesAttribute.ALIAS.value
+DST_ALIAS_TYPE          = CMAliasesAttribute.TYPE.value
+DST_ALIAS_INDEX         = CMAliasesAttribute.INDEX.value
+DST_SECRET_ALGORITHM    = CMSecretAlgorithType.SECRET_SEED.value
+DST_SECRET_OBJECT_TYPE  = CMSecretObjectType.SECRET_DATA.value
+
+# NetApp Custom Attributes and their destination (KMIP meta) format
+NETAPP_HEADER           = NetAppCustomAttribute.NETAPPHEADER.value
+NETAPP_KMIP             = NetAppMetaAttribute.KMIP.value
+NETAPP_CUSTOM           = NetAppMetaAttribute.CUSTOM.value
+NETAPP_TYPE             = NetAppMetaAttribute.TYPE.value
+NETAPP_TYPE_VALUE       = NetAppMetaAttribute.TYPE_VALUE.value
+NETAPP_INDEX            = NetAppMetaAttribute.INDEX.value
+
+# KMIP value of each usage name (e.g. "ENCRYPT" -> 0x04)
+USAGE_MASK_DICT         = createDictFromEnum(CryptographicUsageMask)
+
+# Distinct strings that are translated (and remembered) per run.  A run sees a few hundred at most.
+MAPPER_CACHE_SIZE       = 4096
+
+@lru_cache(maxsize=MAPPER_CACHE_SIZE)
+def mapUsageMask(t_usageStr):
+# -------------------------------------------------------------------------------
+# Return the KMIP value of a GKLM usage mask string such as "ENCRYPT DECRYPT"
+# (GKLM lists the usage mask as names).  Unknown names are ignored.
+# -------------------------------------------------------------------------------
+    t_usageMask = CryptographicUsageMask.NULL.value
+    for t_usage in t_usageStr.strip().split(' '):
+        t_usageMask = t_usageMask | USAGE_MASK_DICT.get(t_usage, 0)
+
+    return t_usageMask
+
+@lru_cache(maxsize=MAPPER_CACHE_SIZE)
+def mapKeyType(t_keyType):
+# -------------------------------------------------------------------------------
+# Return the CM object type of a GKLM key type (SYMMETRIC_KEY -> Symmetric Key)
+# -------------------------------------------------------------------------------
+    return t_keyType.replace("_", " ").title()
+
+@lru_cache(maxsize=MAPPER_CACHE_SIZE)
+def mapSecretState(t_state):
+# -------------------------------------------------------------------------------
+# Return the CM state of a GKLM secret state (PRE_ACTIVE -> Pre-Active)
+# -------------------------------------------------------------------------------
+    return t_state.replace("_", "-").title()
+
+def mapNetAppMeta(t_srcObj):
+# -------------------------------------------------------------------------------
+# Return the NetApp Custom Attributes of a source object in the CM (KMIP meta)
+# format, or None if it has none.  The attributes string
+# is only parsed if it names a NetApp attribute.
+# -------------------------------------------------------------------------------
+    t_attribStr = t_srcObj.get(SRC_CUSTOM_ATTRIBUTES)
+    if not t_attribStr or NETAPP_HEADER not in t_attribStr:
+        return None
+
+    return {NETAPP_CUSTOM: [{NETAPP_TYPE:NETAPP_TYPE_VALUE, NETAPP_INDEX:0, t_name:t_value}
+                            for t_name, t_value in parseCustomAttributes(t_attribStr).items() if NETAPP_HEADER in t_name]}
+
+def mapSrcObjName(t_srcObj):
+# -------------------------------------------------------------------------------
+# Return the destination name of a source key (its alias) or secret (its Name).
+# Only the listing attributes are used, so the name is known before the key
+# block is retrieved.  Returns None if the object has neither.
+# -------------------------------------------------------------------------------
+    if SRC_ALIAS in t_srcObj:
+        return str(t_srcObj[SRC_ALIAS]).strip("[]")
+
+    if SRC_NAME in t_srcObj:
+        return returnBracketValue(str(t_srcObj[SRC_NAME]))
+
+    return None
+
+class KRestMapper:
+# -------------------------------------------------------------------------------
+# Mapper of source objects to destination objects that are owned by t_userID
+# and, if t_dstGrp is provided, assigned to the group as they are imported.
+# One mapper is created per run (or per verification) and used for every object.
+# -------------------------------------------------------------------------------
+    def __init__(self, t_userID, t_dstGrp=None):
+        self.userID             = t_userID
+        self.groupPermissions   = getGroupPermissions(t_dstGrp) if t_dstGrp is not None else None
+
+    def mapMeta(self, t_srcObj):
+        # owner, NetApp Custom Attributes (if any) and group permissions (if any)
+        t_meta = {DST_OWNER_ID:self.userID}
+
+        t_kmipMeta = mapNetAppMeta(t_srcObj)
+        if t_kmipMeta is not None:
+            t_meta[NETAPP_KMIP] = t_kmipMeta
+
+        if self.groupPermissions is not None:
+            t_meta[DST_GROUP_PERMISSIONS] = self.groupPermissions
+
+        return t_meta
+
+    def mapKeyObj(self, t_srcObj):
+        # GKLM key -> CM key, owned by the user (see importDstDataKeyObject)
+        t_keyBlock  = t_srcObj[SRC_KEY_BLOCK]
+        t_name      = t_srcObj[SRC_ALIAS].strip("[]")
+        t_xObj      = {DST_NAME:            t_name,
+                       DST_USAGE_MASK:      mapUsageMask(t_srcObj[SRC_USAGE_MASK]),
+                       DST_ALGORITHM:       t_srcObj[SRC_KEY_ALGORITHM],
+                       DST_SIZE:            int(t_srcObj[SRC_KEY_LENGTH]),
+                       DST_OBJECT_TYPE:     mapKeyType(t_srcObj[SRC_KEY_TYPE]),
+                       DST_MATERIAL:        t_keyBlock[SRC_KEY_MATERIAL],
+                       DST_FORMAT:          t_keyBlock[SRC_KEY_FORMAT].lower(),
+                       DST_META:            self.mapMeta(t_srcObj)}
+
+        if self.groupPermissions is not None:
+            t_xObj[DST_ALIASES] = [{DST_ALIAS:t_name, DST_ALIAS_TYPE:"string"}]
+
+        return t_xObj
+
+    def mapSecretObj(self, t_srcObj):
+        # GKLM secret -> CM secret, owned by the user (see importDstDataSecretObject)
+        t_keyBlock  = t_srcObj[SRC_KEY_BLOCK]
+        t_name      = returnBracketValue(t_srcObj[SRC_NAME])
+        return {DST_NAME:               t_name,
+                DST_ALIASES:            [{DST_ALIAS:t_name, DST_ALIAS_TYPE:"string", DST_ALIAS_INDEX:0}],
+                DST_USAGE_MASK:         mapUsageMask(t_srcObj[SRC_USAGE_MASK]),
+                DST_STATE:              mapSecretState(t_srcObj[SRC_SECRET_STATE]),
+                DST_ALGORITHM:          DST_SECRET_ALGORITHM,
+                DST_OBJECT_TYPE:        DST_SECRET_OBJECT_TYPE,
+                DST_SIZE:               int(t_srcObj[SRC_SECRET_LENGTH]),
+                DST_DATA_TYPE:          str(t_srcObj[SRC_TYPE]).lower(),
+                DST_MATERIAL:           t_keyBlock[SRC_KEY_MATERIAL],
+                DST_FORMAT:             t_keyBlock[SRC_KEY_FORMAT].lower(),
+                DST_META:               self.mapMeta(t_srcObj)}
+
+    def mapObj(self, t_objectType, t_srcObj):
+        # map a source object of t_objectType (GKLMAttributeType.SYMMETRIC_KEY or SECRET_DATA)
+        if t_objectType == GKLMAttributeType.SYMMETRIC_KEY.value:
+            return self.mapKeyObj(t_srcObj)
+
+        return self.mapSecretObj(t_srcObj)
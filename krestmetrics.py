@@ -0,0 +1,175 @@
+# key-rest-metrics
+#
+# definition file of the request metrics.  Every REST request sent to
+# the source or destination server is counted and timed per endpoint
+# and per phase of the run, so that the time of a slow run can be
+# attributed (e.g. to key block retrievals, imports or token renewals).
+# The metrics are displayed as a summary table and can be written as a
+# Prometheus textfile.
+#
+######################################################################
+import  bisect
+import  os
+import  re
+import  threading
+from    krestenums import *
+from    urllib.parse import urlsplit
+
+# ---------------- CONSTANTS -----------------------------------------------------
+# Upper bounds (seconds) of the latency buckets:  0.25 ms to ~65 s, four buckets per doubling
+LATENCY_BUCKET_LIST     = [0.00025 * 2 ** (t_idx / 4) for t_idx in range(73)]
+
+METRICS_STATUS_EXCEPTION = 0    # status recorded for requests that raised an exception
+METRICS_ERROR_STATUS    = 400   # responses with this status or higher are counted as errors
+
+PROMETHEUS_PREFIX       = "krest_request"
+
+# Variable parts of the REST paths (object IDs, client, group and user names) and
+# the placeholder that replaces them, so that all requests to an endpoint share metrics
+ENDPOINT_PATTERN_LIST   = [
+    (re.compile(r"^(/SKLM/rest/v1/objects/)[^/]+$"),                    r"\1{uuid}"),
+    (re.compile(r"^(/SKLM/rest/v1/clients/)[^/]+(/\w+)$"),              r"\1{name}\2"),
+    (re.compile(r"^(/api/v1/vault/keys2/)[^/]+(/export)?$"),            r"\1{id}\2"),
+    (re.compile(r"^(/api/v1/usermgmt/groups/)[^/]+/users/[^/]+$"),      r"\1{name}/users/{id}"),
+]
+
+def getEndpoint(t_url):
+# -------------------------------------------------------------------------------
+# Return the endpoint of a REST URL:  its path without the query string and with
+# each variable part replaced by a placeholder (e.g. /SKLM/rest/v1/objects/{uuid})
+# -------------------------------------------------------------------------------
+    t_path = urlsplit(t_url).path.rstrip("/")
+    for t_pattern, t_template in ENDPOINT_PATTERN_LIST:
+        t_endpoint, t_cnt = t_pattern.subn(t_template, t_path)
+        if t_cnt > 0:
+            return t_endpoint
+
+    return t_path
+
+class KRestLatencyHistogram:
+# -------------------------------------------------------------------------------
+# Number of requests, errors and total time of one endpoint and phase, with the
+# latencies counted in LATENCY_BUCKET_LIST buckets.  Percentiles are estimated
+# from the buckets, so the memory used does not depend on the number of requests.
+# -------------------------------------------------------------------------------
+    def __init__(self):
+        self.count          = 0
+        self.errorCnt       = 0
+        self.sum            = 0.0
+        self.max            = 0.0
+        self.bucketList     = [0] * (len(LATENCY_BUCKET_LIST) + 1)  # last bucket: above the largest bound
+
+    def add(self, t_secs, t_isError):
+        self.count          = self.count + 1
+        self.sum            = self.sum + t_secs
+        self.max            = max(self.max, t_secs)
+        self.bucketList[bisect.bisect_left(LATENCY_BUCKET_LIST, t_secs)] += 1
+        if t_isError:
+            self.errorCnt   = self.errorCnt + 1
+
+    def getPercentile(self, t_fraction):
+        # Latency (seconds) below which t_fraction of the requests completed, interpolated
+        # within its bucket
+        if self.count == 0:
+            return 0.0
+
+        t_rank      = t_fraction * self.count
+        t_cumCnt    = 0
+        for t_idx, t_bucketCnt in enumerate(self.bucketList):
+            if t_bucketCnt > 0 and t_cumCnt + t_bucketCnt >= t_rank:
+                t_lower = LATENCY_BUCKET_LIST[t_idx - 1] if t_idx > 0 else 0.0
+                t_upper = LATENCY_BUCKET_LIST[t_idx] if t_idx < len(LATENCY_BUCKET_LIST) else self.max
+                return min(t_lower + (t_upper - t_lower) * (t_rank - t_cumCnt) / t_bucketCnt, self.max)
+
+            t_cumCnt = t_cumCnt + t_bucketCnt
+
+        return self.max
+
+class KRestMetrics:
+# -------------------------------------------------------------------------------
+# Request metrics of a run, indexed by (phase, method, endpoint).  The current
+# phase is set by k-rest.py as the run progresses (see setPhase) and applies to
+# every request sent from then on, by any thread or engine.
+# -------------------------------------------------------------------------------
+    def __init__(self):
+        self.lock           = threading.Lock()
+        self.phase          = metricsPhase.SETUP.value
+        self.histDict       = {}
+
+    def setPhase(self, t_phase):
+        self.phase = t_phase
+
+    def record(self, t_method, t_url, t_status, t_secs):
+        t_key       = (self.phase, t_method, getEndpoint(t_url))
+        t_isError   = t_status == METRICS_STATUS_EXCEPTION or t_status >= METRICS_ERROR_STATUS
+
+        with self.lock:
+            t_hist = self.histDict.get(t_key)
+            if t_hist is None:
+                t_hist = self.histDict[t_key] = KRestLatencyHistogram()
+
+            t_hist.add(t_secs, t_isError)
+
+    def getHistList(self):
+        # Returns [((phase, method, endpoint), histogram)] in the order in which they were first used
+        with self.lock:
+            return list(self.histDict.items())
+
+    def printSummary(self):
+        t_histList = self.getHistList()
+        if len(t_histList) == 0:
+            return
+
+        print("\n %-12s %-6s %-44s %8s %6s %9s %9s %9s %9s" %("Phase", "Method", "Endpoint", "Requests", "Errors", "p50 ms", "p95 ms", "p99 ms", "Total s"))
+        for (t_phase, t_method, t_endpoint), t_hist in t_histList:
+            print(" %-12s %-6s %-44s %8s %6s %9.1f %9.1f %9.1f %9.2f" %(t_phase, t_method, t_endpoint, t_hist.count, t_hist.errorCnt,
+                                                                        t_hist.getPercentile(0.50) * 1000, t_hist.getPercentile(0.95) * 1000,
+                                                                        t_hist.getPercentile(0.99) * 1000, t_hist.sum))
+
+    def writePrometheusFile(self, t_fileName):
+        # Write the metrics in the Prometheus text format.  The file is replaced at once
+        # so that a collector never reads a partial file.
+        t_lineList = ["# HELP %s_duration_seconds Latency of the REST requests sent by k-rest" %(PROMETHEUS_PREFIX),
+                      "# TYPE %s_duration_seconds histogram" %(PROMETHEUS_PREFIX)]
+        t_errorList = ["# HELP %s_errors_total REST requests that failed or returned an error status" %(PROMETHEUS_PREFIX),
+                       "# TYPE %s_errors_total counter" %(PROMETHEUS_PREFIX)]
+
+        for (t_phase, t_method, t_endpoint), t_hist in self.getHistList():
+            t_labels = 'phase="%s",method="%s",endpoint="%s"' %(t_phase, t_method, t_endpoint.replace('"', '\\"'))
+
+            t_cumCnt = 0
+            for t_bound, t_bucketCnt in zip(LATENCY_BUCKET_LIST, t_hist.bucketList):
+                t_cumCnt = t_cumCnt + t_bucketCnt
+                t_lineList.append('%s_duration_seconds_bucket{%s,le="%.6g"} %s' %(PROMETHEUS_PREFIX, t_labels, t_bound, t_cumCnt))
+
+            t_lineList.append('%s_duration_seconds_bucket{%s,le="+Inf"} %s' %(PROMETHEUS_PREFIX, t_labels, t_hist.count))
+            t_lineList.append("%s_duration_seconds_sum{%s} %.6f" %(PROMETHEUS_PREFIX, t_labels, t_hist.sum))
+            t_lineList.append("%s_duration_seconds_count{%s} %s" %(PROMETHEUS_PREFIX, t_labels, t_hist.count))
+            t_errorList.append("%s_errors_total{%s} %s" %(PROMETHEUS_PREFIX, t_labels, t_hist.errorCnt))
+
+        t_tmpFileName = "%s.%s.tmp" %(t_fileName, os.getpid())
+        with open(t_tmpFileName, "w", encoding="utf-8") as t_file:
+            t_file.write("\n".join(t_lineList + t_errorList) + "\n")
+        os.replace(t_tmpFileName, t_fileName)
+
+# The request metrics are collected for every run
+_metrics = KRestMetrics()
+
+def getMetrics():
+# -------------------------------------------------------------------------------
+# Return the request metrics of the run
+# -------------------------------------------------------------------------------
+    return _metrics
+
+def setMetricsPhase(t_phase):
+# -------------------------------------------------------------------------------
+# Attribute the requests sent from now on to t_phase (see metricsPhase)
+# -------------------------------------------------------------------------------
+    _metrics.setPhase(t_phase)
+
+def recordRequest(t_method, t_url, t_status, t_secs):
+# -------------------------------------------------------------------------------
+# Add one REST request (its response status, or METRICS_STATUS_EXCEPTION, and
+# its duration in seconds) to the request metrics
+# -------------------------------------------------------------------------------
+    _metrics.record(t_method, t_url, t_status, t_secs)
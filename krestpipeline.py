@@ -0,0 +1,212 @@
+# key-rest-pipeline
+#
+# definition file of the destination import stage and of the streaming 
+# migration pipeline.  When streaming, source objects are mapped and 
+# imported into the destination as soon as their key blocks have been
+# retrieved, rather than after the whole source has been read.
+#
+######################################################################
+import  queue
+import  threading
+from    krestauth import *
+from    krestcmds import *
+from    krestmapper import *
+from    krestreport import *
+from    netappfilters import *
+from    termcolor import colored
+
+# ---------------- CONSTANTS -----------------------------------------------------
+DEFAULT_STREAM_QUEUE_SIZE   = 100   # mapped objects waiting to be imported
+STREAM_PUT_WAIT             = 1     # seconds between checks for a stopped consumer
+
+def importDstObj(t_dstHost, t_dstPort, t_dstUser, t_dstAuth, t_xObj, t_isSecret):
+# -------------------------------------------------------------------------------
+# Import ONE mapped key (or secret, if t_isSecret) object into the destination.
+# t_dstAuth is the shared KRestDstAuth of the destination.  Group permissions
+# (if any) are part of the mapped object and are applied by the import itself.
+#
+# Returns the success of the import.  Any error is reported and returned as a
+# failure so that the other objects are still processed.
+# -------------------------------------------------------------------------------
+    try:
+        if t_isSecret:
+            t_success = importDstDataSecretObject(t_dstHost, t_dstPort, t_dstUser, t_dstAuth.getAuthStr(), t_xObj)
+        else:
+            t_success = importDstDataKeyObject(t_dstHost, t_dstPort, t_dstUser, t_dstAuth.getAuthStr(), t_xObj)
+
+    except (Exception, SystemExit) as e:
+        tmpStr = "\n    ERROR: Import of %s failed (%s)." %(t_xObj[CMAttributeType.NAME.value], repr(e))
+        print(colored(tmpStr, "light_red", attrs=["bold"]))
+        t_success = False
+
+    return t_success
+
+def printDstImportResult(t_xObj, t_isSecret, t_success):
+# -------------------------------------------------------------------------------
+# Display the outcome of the import of one object (unless the console is quiet)
+# -------------------------------------------------------------------------------
+    if isQuiet():
+        return
+
+    if t_isSecret:
+        print("\n xSecretObjName: ",  t_xObj[CMAttributeType.NAME.value])
+        print(" --> importDstDataSecretOjbect Success:", t_success)
+    else:
+        print("\n xKeyObjName: ",  t_xObj[CMAttributeType.NAME.value])
+        print(" --> importDstDataKeyOjbect Success:", t_success)
+
+def importDstObjList(t_dstHost, t_dstPort, t_dstUser, t_dstAuth, t_xObjList, t_isSecret, t_workers=1,
+                     t_srcUUIDList=None, t_resultFn=None):
+# -------------------------------------------------------------------------------
+# Import every object in t_xObjList (see importDstObj) with up to t_workers
+# concurrent imports.  The outcome of each object is displayed in list order.
+#
+# If t_resultFn is provided, it is called as t_resultFn(source UUID, object,
+# success) for each object.  t_srcUUIDList holds the source UUID of each object
+# in t_xObjList.
+#
+# Returns the success of each object, in list order.
+# -------------------------------------------------------------------------------
+    def importObj(t_xObj):
+        return importDstObj(t_dstHost, t_dstPort, t_dstUser, t_dstAuth, t_xObj, t_isSecret)
+
+    t_successList = []
+    for t_idx, t_success in enumerate(iterConcurrently(importObj, t_xObjList, t_workers)):
+        printDstImportResult(t_xObjList[t_idx], t_isSecret, t_success)
+        if t_resultFn is not None:
+            t_resultFn(t_srcUUIDList[t_idx], t_xObjList[t_idx], t_success)
+
+        t_successList.append(t_success)
+
+    return t_successList
+
+def iterSrcStreamObjData(t_srcHost, t_srcPort, t_srcAuthStr, t_srcUser, t_srcClientWorkList, t_suuid,
+                         t_includeSecrets, t_addClientUser, t_workers, t_netAppFilterDict, t_listingFilter=None):
+# -------------------------------------------------------------------------------
+# Retrieve the objects of each client in t_srcClientWorkList ([client, key count,
+# secret count]) one client at a time and yield (object type, object) for each
+# object that satisfies the NetApp filter (if any).  Objects rejected by 
+# t_listingFilter are not retrieved (see filterSrcObjListForRetrieval).
+#
+# A client that fails is reported and skipped without affecting the other clients.
+# -------------------------------------------------------------------------------
+    for t_clientDict, t_symKeyCount, t_secretCount in t_srcClientWorkList:
+        try:
+            for t_objectType, t_data in iterSrcClientObjData(t_srcHost, t_srcPort, t_srcAuthStr, t_srcUser, t_clientDict, t_suuid,
+                                                             t_symKeyCount, t_secretCount, t_includeSecrets, t_addClientUser, t_workers, t_listingFilter):
+                if len(t_netAppFilterDict) > 0 and not isSrcNetAppObjMatch(t_data, t_netAppFilterDict):
+                    continue
+
+                yield t_objectType, t_data
+
+        except (Exception, SystemExit) as e:
+            tmpStr = "\n    ERROR: Retrieval of objects for client %s failed and was skipped (%s)." %(t_clientDict[GKLMAttributeType.CLIENT_NAME.value], repr(e))
+            print(colored(tmpStr, "light_red", attrs=["bold"]))
+
+def runStreamingMigration(t_srcHost, t_srcPort, t_srcAuthStr, t_srcUser, t_srcClientWorkList, t_suuid,
+                          t_includeSecrets, t_addClientUser, t_srcWorkers, t_netAppFilterDict,
+                          t_dstHost, t_dstPort, t_dstUser, t_dstPass, t_dstUserID, t_dstGrp,
+                          t_queueSize=DEFAULT_STREAM_QUEUE_SIZE, t_listingFilter=None, t_resultFn=None, t_skipFn=None,
+                          t_dstWorkers=1):
+# -------------------------------------------------------------------------------
+# Stream the source objects into the destination.
+#
+# A producer thread retrieves and maps the source objects and places them on a
+# queue of no more than t_queueSize objects.  The calling thread imports the
+# objects from the queue with up to t_dstWorkers concurrent imports (see 
+# importDstObj) while the producer continues to read from the source.  Objects
+# are assigned to the t_dstGrp group (if specified) as they are imported.  Memory use is therefore
+# bounded by the queue size rather than by the number of source objects.
+#
+# If t_resultFn is provided, it is called as t_resultFn(source UUID, object,
+# success) as soon as each object has been processed.  If t_skipFn is provided,
+# objects for which t_skipFn(source UUID, object) is True are not imported.
+#
+# Returns a dictionary of the number of keys and secrets streamed and imported.
+# -------------------------------------------------------------------------------
+    t_mapper        = KRestMapper(t_dstUserID, t_dstGrp)
+    t_objQueue      = queue.Queue(maxsize=t_queueSize)
+    t_stopEvent     = threading.Event()     # set if the consumer stops early
+    t_endOfStream   = None                  # placed on the queue by the producer when it is done
+
+    t_countDict     = {"keys":0, "secrets":0, "keysImported":0, "secretsImported":0}
+
+    def produce():
+        t_srcObjIter = iterSrcStreamObjData(t_srcHost, t_srcPort, t_srcAuthStr, t_srcUser, t_srcClientWorkList, t_suuid,
+                                            t_includeSecrets, t_addClientUser, t_srcWorkers, t_netAppFilterDict, t_listingFilter)
+        try:
+            for t_objectType, t_data in t_srcObjIter:
+                t_srcUUID = t_data[GKLMAttributeType.UUID.value]
+                if t_objectType == GKLMAttributeType.SYMMETRIC_KEY.value:
+                    t_xObj = (False, t_srcUUID, t_mapper.mapKeyObj(t_data))
+                else:
+                    t_xObj = (True, t_srcUUID, t_mapper.mapSecretObj(t_data))
+
+                # wait for room on the queue, unless the consumer has stopped
+                while not t_stopEvent.is_set():
+                    try:
+                        t_objQueue.put(t_xObj, timeout=STREAM_PUT_WAIT)
+                        break
+                    except queue.Full:
+                        pass
+
+                if t_stopEvent.is_set():
+                    break
+
+        except (Exception, SystemExit) as e:
+            tmpStr = "\n    ERROR: Source object stream stopped (%s)." %(repr(e))
+            print(colored(tmpStr, "light_red", attrs=["bold"]))
+
+        finally:
+            t_srcObjIter.close()    # restores client ownership if the stream was stopped early
+            t_objQueue.put(t_endOfStream)
+
+    t_producer = threading.Thread(target=produce, name="srcStream", daemon=True)
+    t_producer.start()
+
+    t_dstAuth = getDstAuth(t_dstHost, t_dstPort, t_dstUser, t_dstPass)
+
+    def iterObjQueue():
+        while True:
+            t_item = t_objQueue.get()
+            if t_item is t_endOfStream:
+                return
+
+            t_isSecret, t_srcUUID, t_xObj = t_item
+            if t_skipFn is not None and t_skipFn(t_srcUUID, t_xObj):
+                continue
+
+            yield t_item
+
+    def importItem(t_item):
+        t_isSecret, t_srcUUID, t_xObj = t_item
+        return t_item, importDstObj(t_dstHost, t_dstPort, t_dstUser, t_dstAuth, t_xObj, t_isSecret)
+
+    try:
+        for t_item, t_success in iterConcurrently(importItem, iterObjQueue(), t_dstWorkers):
+            t_isSecret, t_srcUUID, t_xObj = t_item
+            printDstImportResult(t_xObj, t_isSecret, t_success)
+
+            if t_isSecret:
+                t_countDict["secrets"] = t_countDict["secrets"] + 1
+                if t_success:
+                    t_countDict["secretsImported"] = t_countDict["secretsImported"] + 1
+            else:
+                t_countDict["keys"] = t_countDict["keys"] + 1
+                if t_success:
+                    t_countDict["keysImported"] = t_countDict["keysImported"] + 1
+
+            if t_resultFn is not None:
+                t_resultFn(t_srcUUID, t_xObj, t_success)
+
+    finally:
+        # If the import stopped early, release the producer so it can restore client ownership.
+        t_stopEvent.set()
+        while t_producer.is_alive():
+            try:
+                t_objQueue.get(timeout=STREAM_PUT_WAIT)
+            except queue.Empty:
+                pass
+        t_producer.join()
+
+    return t_countDict
@@ -0,0 +1,131 @@
+# key-rest-report
+#
+# definition file of the run report.  The outcome of every object (read
+# from the source, imported, verified or listed in the destination) is
+# streamed to a machine-readable file as one JSON line or CSV row, and
+# the per-object console output can be replaced by aggregated counts.
+#
+######################################################################
+import  atexit
+import  csv
+import  json
+import  threading
+from    datetime import datetime
+from    krestenums import *
+
+# ---------------- CONSTANTS -----------------------------------------------------
+DEFAULT_REPORT_BUFFER   = 1 << 20   # bytes buffered before the report is written to the file
+
+REPORT_TIME             = "time"
+REPORT_STAGE            = "stage"
+REPORT_UUID             = "uuid"
+REPORT_NAME             = "name"
+REPORT_TYPE             = "type"
+REPORT_STATUS           = "status"
+REPORT_DETAIL           = "detail"
+
+REPORT_STATUS_RETRIEVED = "retrieved"   # status of the objects of the source stage
+REPORT_STATUS_LISTED    = "listed"      # status of the objects of the destination stage
+REPORT_STATUS_FAILED    = "failed"      # status of the source objects that could not be retrieved
+
+REPORT_FIELD_LIST       = [REPORT_TIME, REPORT_STAGE, REPORT_UUID, REPORT_NAME, REPORT_TYPE, REPORT_STATUS, REPORT_DETAIL]
+
+class KRestReport:
+# -------------------------------------------------------------------------------
+# Streamed report of per-object outcomes.  Each record is written as soon as it
+# is reported, either as one line of JSON (JSONL):
+#
+#   {"time": ..., "stage": <reportStage>, "uuid": ..., "name": ..., "type": ..., "status": ..., "detail": ...}
+#
+# or as one CSV row with the same fields (and a header row).  Records go through
+# a buffer of t_bufferSize bytes and are never held in memory otherwise, so the
+# size of the report does not depend on the number of objects.  Only the number
+# of records per stage and status is kept (see cntDict).
+# -------------------------------------------------------------------------------
+    def __init__(self, t_fileName, t_format=reportFormatOption.JSONL.value, t_bufferSize=DEFAULT_REPORT_BUFFER):
+        self.fileName       = t_fileName
+        self.format         = t_format
+        self.lock           = threading.Lock()
+        self.cntDict        = {}    # (stage, status) -> number of records
+        self.file           = open(t_fileName, "w", encoding="utf-8", newline="", buffering=t_bufferSize)
+
+        if t_format == reportFormatOption.CSV.value:
+            self.csvWriter  = csv.writer(self.file)
+            self.csvWriter.writerow(REPORT_FIELD_LIST)
+
+        atexit.register(self.close)     # also write out the buffer if the run exits early
+
+    def record(self, t_stage, t_uuid, t_name, t_type, t_status, t_detail=""):
+        self.write({REPORT_TIME:datetime.now().isoformat(timespec="seconds"), REPORT_STAGE:t_stage, REPORT_UUID:t_uuid,
+                    REPORT_NAME:t_name, REPORT_TYPE:t_type, REPORT_STATUS:t_status, REPORT_DETAIL:t_detail})
+
+    def write(self, t_record):
+        # Write a record (a dictionary of REPORT_FIELD_LIST), e.g. one read from another report
+        with self.lock:
+            if self.file is None:
+                return
+
+            if self.format == reportFormatOption.CSV.value:
+                self.csvWriter.writerow([t_record[t_field] for t_field in REPORT_FIELD_LIST])
+            else:
+                self.file.write(json.dumps({t_field:t_record[t_field] for t_field in REPORT_FIELD_LIST}) + "\n")
+
+            t_key = (t_record[REPORT_STAGE], t_record[REPORT_STATUS])
+            self.cntDict[t_key] = self.cntDict.get(t_key, 0) + 1
+
+    def getCountStr(self):
+        # Returns the number of records per stage and status, e.g. "import: 10 imported, 2 failed"
+        with self.lock:
+            t_stageDict = {}
+            for (t_stage, t_status), t_cnt in self.cntDict.items():
+                t_stageDict.setdefault(t_stage, []).append("%s %s" %(t_cnt, t_status))
+
+        return "; ".join(["%s: %s" %(t_stage, ", ".join(t_cntList)) for t_stage, t_cntList in t_stageDict.items()])
+
+    def close(self):
+        with self.lock:
+            if self.file is None:
+                return
+
+            self.file.close()
+            self.file = None
+
+# The report and the quiet console are optional and are configured once per run
+_report     = None
+_quiet      = False
+
+def configureReport(t_fileName, t_format=reportFormatOption.JSONL.value):
+# -------------------------------------------------------------------------------
+# Stream the outcome of every object to t_fileName in t_format (JSONL or CSV)
+# -------------------------------------------------------------------------------
+    global _report
+    _report = KRestReport(t_fileName, t_format)
+
+    return _report
+
+def getReport():
+# -------------------------------------------------------------------------------
+# Return the run report, or None if it has not been configured
+# -------------------------------------------------------------------------------
+    return _report
+
+def reportObj(t_stage, t_uuid, t_name, t_type, t_status, t_detail=""):
+# -------------------------------------------------------------------------------
+# Add the outcome of one object to the run report (if configured)
+# -------------------------------------------------------------------------------
+    if _report is not None:
+        _report.record(t_stage, t_uuid, t_name, t_type, t_status, t_detail)
+
+def setQuiet(t_quiet):
+# -------------------------------------------------------------------------------
+# If t_quiet is set, the per-object console output is suppressed and only the
+# aggregated counts (and errors) are displayed
+# -------------------------------------------------------------------------------
+    global _quiet
+    _quiet = t_quiet
+
+def isQuiet():
+# -------------------------------------------------------------------------------
+# Return True if the per-object console output is suppressed
+# -------------------------------------------------------------------------------
+    return _quiet
@@ -0,0 +1,125 @@
+# key-rest-retry
+#
+# definition file of the retry policy.  Requests that fail for a reason
+# that may not last (no response, or a 408, 429 or 5xx response from a
+# busy or restarting server) are sent again after an exponential backoff
+# with jitter, rather than stopping a client or the whole run.  The
+# number of retries of a run is limited by a budget, so that a server
+# that is down is not retried indefinitely.
+#
+######################################################################
+import  random
+import  threading
+from    krestmetrics import *
+from    termcolor import colored
+
+# ---------------- CONSTANTS -----------------------------------------------------
+DEFAULT_RETRIES         = 4     # retries of one request
+DEFAULT_RETRY_BUDGET    = 1000  # retries of all requests of a run
+DEFAULT_RETRY_DELAY     = 0.5   # seconds:  upper bound of the first backoff
+MAX_RETRY_DELAY         = 30.0  # seconds:  upper bound of any backoff (and of Retry-After)
+
+# Failed requests (see METRICS_STATUS_EXCEPTION) and responses that a later attempt may not receive
+TRANSIENT_STATUS_LIST   = [METRICS_STATUS_EXCEPTION, 408, 429, 500, 502, 503, 504]
+
+# Responses showing that the server did not process the request.  Only these (and
+# requests that could not be sent) are retried for requests that are not idempotent.
+UNPROCESSED_STATUS_LIST = [429, 503]
+
+IDEMPOTENT_METHOD_LIST  = ["GET", "HEAD", "OPTIONS", "PUT", "DELETE"]
+
+class KRestRetryPolicy:
+# -------------------------------------------------------------------------------
+# Retry policy shared by every request of a run, by either engine.
+#
+#   - An idempotent request (GET or PUT, or any request that the caller marks as
+#     idempotent, such as a CM export) is retried after any TRANSIENT_STATUS_LIST
+#     failure.  Other requests (imports) are only retried if the server did not
+#     process them (UNPROCESSED_STATUS_LIST) or the request was never sent, so
+#     that an object is never created twice.
+#   - Retry n waits a random time of up to t_baseDelay x 2^n seconds (full
+#     jitter, so that concurrent workers do not retry in step), or at least the
+#     Retry-After of the response.  No wait exceeds MAX_RETRY_DELAY.
+#   - A request is retried at most t_retries times and the run at most t_budget
+#     times.  Once the budget is spent, failures are returned at once.
+# -------------------------------------------------------------------------------
+    def __init__(self, t_retries=DEFAULT_RETRIES, t_budget=DEFAULT_RETRY_BUDGET, t_baseDelay=DEFAULT_RETRY_DELAY):
+        self.retries        = t_retries
+        self.budget         = t_budget
+        self.baseDelay      = t_baseDelay
+        self.lock           = threading.Lock()
+        self.random         = random.Random()
+
+        self.retryCnt       = 0
+        self.statusCntDict  = {}    # status -> number of retries
+        self.giveUpCnt      = 0     # requests that still failed after being retried
+        self.budgetSpent    = False
+
+    def isRetryable(self, t_method, t_status, t_idempotent=None, t_unsent=False):
+        if t_idempotent is None:
+            t_idempotent = t_method in IDEMPOTENT_METHOD_LIST
+
+        if t_idempotent:
+            return t_status in TRANSIENT_STATUS_LIST
+
+        return t_status in UNPROCESSED_STATUS_LIST or (t_status == METRICS_STATUS_EXCEPTION and t_unsent)
+
+    def getRetryDelay(self, t_method, t_status, t_attempt, t_idempotent=None, t_unsent=False, t_retryAfter=None):
+        # Returns the seconds to wait before retrying a request whose attempt t_attempt
+        # (0 for the first) ended with t_status, or None if it is not to be retried.
+        if not self.isRetryable(t_method, t_status, t_idempotent, t_unsent):
+            return None
+
+        with self.lock:
+            if t_attempt >= self.retries or self.retryCnt >= self.budget:
+                if t_attempt > 0:
+                    self.giveUpCnt = self.giveUpCnt + 1
+
+                if self.retryCnt >= self.budget and not self.budgetSpent:
+                    self.budgetSpent = True
+                    tmpStr = "\n    WARNING: The retry budget (%s retries) is spent.  Failed requests are no longer retried." %(self.budget)
+                    print(colored(tmpStr, "light_red", attrs=["bold"]))
+
+                return None
+
+            self.retryCnt = self.retryCnt + 1
+            self.statusCntDict[t_status] = self.statusCntDict.get(t_status, 0) + 1
+
+            t_delay = self.random.uniform(0, min(MAX_RETRY_DELAY, self.baseDelay * 2 ** t_attempt))
+
+        # Retry-After may also be an HTTP date, in which case the backoff is used
+        try:
+            t_delay = max(t_delay, min(float(t_retryAfter), MAX_RETRY_DELAY))
+        except (TypeError, ValueError):
+            pass
+
+        return t_delay
+
+    def getSummaryStr(self):
+        # Returns the number of retries by status, e.g. "12 retries (429: 10, no response: 2), ..."
+        with self.lock:
+            t_statusList = ["%s: %s" %("no response" if t_status == METRICS_STATUS_EXCEPTION else t_status, t_cnt)
+                            for t_status, t_cnt in sorted(self.statusCntDict.items())]
+
+            return "%s retries (%s), %s requests failed after retrying, %s of %s retries left in the budget" %(self.retryCnt,
+                        ", ".join(t_statusList) if len(t_statusList) > 0 else "none", self.giveUpCnt,
+                        max(self.budget - self.retryCnt, 0), self.budget)
+
+# Requests are retried (with the default policy) unless the run configures otherwise
+_retryPolicy = KRestRetryPolicy()
+
+def configureRetry(t_retries=DEFAULT_RETRIES, t_budget=DEFAULT_RETRY_BUDGET, t_baseDelay=DEFAULT_RETRY_DELAY):
+# -------------------------------------------------------------------------------
+# Retry each failed request up to t_retries times, and no more than t_budget
+# requests in all, starting with a backoff of up to t_baseDelay seconds
+# -------------------------------------------------------------------------------
+    global _retryPolicy
+    _retryPolicy = KRestRetryPolicy(t_retries, t_budget, t_baseDelay)
+
+    return _retryPolicy
+
+def getRetryPolicy():
+# -------------------------------------------------------------------------------
+# Return the retry policy of the run
+# -------------------------------------------------------------------------------
+    return _retryPolicy
@@ -0,0 +1,204 @@
+# key-rest-session
+#
+# definition file of the pooled HTTPS transport that is shared by all
+# REST Commands sent to the source and destination servers
+#
+######################################################################
+import  requests
+from    requests.adapters import HTTPAdapter
+from    urllib3.exceptions import InsecureRequestWarning, NewConnectionError
+import  threading
+import  time
+from    krestmetrics import *
+from    krestretry import *
+
+# ---------------- CONSTANTS -----------------------------------------------------
+DEFAULT_POOL_SIZE   = 10    # keep-alive connections per server
+DEFAULT_TIMEOUT     = 60    # seconds per request
+
+STATUS_CODE_UNAUTHORIZED = 401
+
+APP_JSON            = "application/json"
+
+# Suppress SSL Verification Warnings (once for all sessions)
+requests.packages.urllib3.disable_warnings(category=InsecureRequestWarning)
+
+class KRestSession:
+# -------------------------------------------------------------------------------
+# One KRestSession exists per server (host and port).  It owns a pool of
+# keep-alive HTTPS connections so that the TCP and TLS handshakes are only
+# paid once per connection rather than once per request.  The pool is sized to
+# the number of concurrent requests that will be sent to the server.
+# -------------------------------------------------------------------------------
+    def __init__(self, t_host, t_port, t_poolSize=DEFAULT_POOL_SIZE, t_timeout=DEFAULT_TIMEOUT):
+        self.host               = t_host
+        self.port               = t_port
+        self.poolSize           = t_poolSize
+        self.timeout            = t_timeout
+
+        self.session            = requests.Session()
+        self.session.headers.update({"Content-Type":APP_JSON, "Accept":APP_JSON})
+        self.setPoolSize(t_poolSize)
+
+        # Token managers (see krestauth) of the logins to this server
+        self.authList           = []
+
+        # Adaptive limiter (see krestlimiter) of the requests outstanding to this server, if any
+        self.limiter            = None
+
+    def setPoolSize(self, t_poolSize):
+        # pool_block ensures that no more than t_poolSize connections are ever opened
+        # to the server.  Additional requests wait for a connection to be returned.
+        t_oldAdapter    = self.session.adapters.get("https://")
+        self.poolSize   = t_poolSize
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=t_poolSize, pool_block=True))
+
+        if t_oldAdapter is not None:
+            t_oldAdapter.close()
+
+    def addAuth(self, t_auth):
+        self.authList.append(t_auth)
+
+    def getCurrentAuthStr(self, t_authStr):
+        # Return the current authorization string of the token manager that issued
+        # t_authStr, so that callers holding an older string use the renewed one.
+        # A renewal in progress is not waited for (see KRestAuth.getCurrentAuthStr).
+        for t_auth in list(self.authList):
+            if t_authStr in t_auth.issuedSet:
+                return t_auth.getCurrentAuthStr()
+
+        return t_authStr
+
+    def renewAuthStr(self, t_oldAuthStr):
+        # Ask the token manager that issued t_oldAuthStr for a renewed authorization
+        # string.  Returns None if t_oldAuthStr was not issued by a token manager.
+        for t_auth in list(self.authList):
+            t_newAuthStr = t_auth.renewAfterUnauthorized(t_oldAuthStr)
+            if t_newAuthStr is not None:
+                return t_newAuthStr
+
+        return None
+
+    def send(self, t_method, t_url, **kwargs):
+        # Send one request (once the limiter, if any, allows it) and add its status and
+        # duration to the request metrics
+        if self.limiter is not None:
+            self.limiter.acquire()
+
+        t_start     = time.perf_counter()
+        t_status    = METRICS_STATUS_EXCEPTION
+        try:
+            r = self.session.request(t_method, t_url, **kwargs)
+            t_status = r.status_code
+        finally:
+            t_secs = time.perf_counter() - t_start
+            recordRequest(t_method, t_url, t_status, t_secs)
+            if self.limiter is not None:
+                self.limiter.release(t_secs, t_status)
+
+        return r
+
+    def sendAuthorized(self, t_method, t_url, **kwargs):
+        # Send one request with the current authorization string.  If the authorization
+        # string has expired (or was revoked), renew it and send the request ONCE more.
+        t_headers = kwargs.get("headers") or {}
+        if "Authorization" in t_headers and len(self.authList) > 0:
+            kwargs["headers"] = dict(t_headers, Authorization=self.getCurrentAuthStr(t_headers["Authorization"]))
+
+        r = self.send(t_method, t_url, **kwargs)
+
+        if r.status_code == STATUS_CODE_UNAUTHORIZED:
+            t_headers       = kwargs.get("headers") or {}
+            t_oldAuthStr    = t_headers.get("Authorization")
+            if t_oldAuthStr is not None:
+                t_newAuthStr = self.renewAuthStr(t_oldAuthStr)
+                if t_newAuthStr is not None:
+                    kwargs["headers"] = dict(t_headers, Authorization=t_newAuthStr)
+                    r = self.send(t_method, t_url, **kwargs)
+
+        return r
+
+    def request(self, t_method, t_url, t_idempotent=None, **kwargs):
+        # verify is passed on every request since requests otherwise prefers a CA
+        # bundle from the environment (REQUESTS_CA_BUNDLE) over the session setting.
+        kwargs.setdefault("verify", False)
+        kwargs.setdefault("timeout", self.timeout)
+
+        # Transient failures are retried as the retry policy allows (see KRestRetryPolicy).
+        # t_idempotent marks POST requests that are safe to repeat, such as CM exports.
+        t_policy    = getRetryPolicy()
+        t_attempt   = 0
+        while True:
+            try:
+                r = self.sendAuthorized(t_method, t_url, **kwargs)
+                t_delay = t_policy.getRetryDelay(t_method, r.status_code, t_attempt, t_idempotent,
+                                                 t_retryAfter=r.headers.get("Retry-After"))
+                if t_delay is None:
+                    return r
+
+            except requests.exceptions.RequestException as e:
+                t_delay = t_policy.getRetryDelay(t_method, METRICS_STATUS_EXCEPTION, t_attempt, t_idempotent, isUnsentError(e))
+                if t_delay is None:
+                    raise
+
+            time.sleep(t_delay)
+            t_attempt = t_attempt + 1
+
+    def get(self, t_url, **kwargs):
+        return self.request("GET", t_url, **kwargs)
+
+    def post(self, t_url, t_idempotent=None, **kwargs):
+        return self.request("POST", t_url, t_idempotent, **kwargs)
+
+    def put(self, t_url, **kwargs):
+        return self.request("PUT", t_url, **kwargs)
+
+    def patch(self, t_url, **kwargs):
+        return self.request("PATCH", t_url, **kwargs)
+
+def isUnsentError(t_error):
+# -------------------------------------------------------------------------------
+# Return True if a requests exception shows that the request never reached the
+# server (no connection could be made), so that any request may be sent again
+# -------------------------------------------------------------------------------
+    if isinstance(t_error, requests.exceptions.ConnectTimeout):
+        return True
+
+    t_reason = getattr(t_error.args[0], "reason", None) if len(t_error.args) > 0 else None
+    return isinstance(t_error, requests.exceptions.ConnectionError) and isinstance(t_reason, NewConnectionError)
+
+# Sessions are shared by all REST Commands and are indexed by (host, port)
+_sessionDict    = {}
+_sessionLock    = threading.Lock()
+
+def configureSession(t_host, t_port, t_poolSize=DEFAULT_POOL_SIZE, t_timeout=DEFAULT_TIMEOUT):
+# -------------------------------------------------------------------------------
+# Create the session for a server with a connection pool of t_poolSize and a
+# per-request timeout of t_timeout seconds.  If the session already exists (e.g.
+# the source and destination are the same server), it is kept, with its token
+# managers and limiter, and its pool is enlarged to t_poolSize if needed.
+# -------------------------------------------------------------------------------
+    t_key = (str(t_host), str(t_port))
+
+    with _sessionLock:
+        if t_key not in _sessionDict:
+            _sessionDict[t_key] = KRestSession(t_host, t_port, t_poolSize, t_timeout)
+        else:
+            _sessionDict[t_key].timeout = t_timeout
+            if t_poolSize > _sessionDict[t_key].poolSize:
+                _sessionDict[t_key].setPoolSize(t_poolSize)
+
+        return _sessionDict[t_key]
+
+def getSession(t_host, t_port):
+# -------------------------------------------------------------------------------
+# Return the shared session for a server, creating one with default settings
+# if the server has not been configured.
+# -------------------------------------------------------------------------------
+    t_key = (str(t_host), str(t_port))
+
+    with _sessionLock:
+        if t_key not in _sessionDict:
+            _sessionDict[t_key] = KRestSession(t_host, t_port)
+
+        return _sessionDict[t_key]
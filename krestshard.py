@@ -0,0 +1,132 @@
+# key-rest-shard
+#
+# definition file of the shards of a migration.  Several k-rest.py
+# processes (on one host or several) can each migrate a disjoint slice
+# of the source with -shard i/N.  Every object (or client) belongs to
+# exactly one shard, decided by a stable hash of its UUID (or client
+# name), so the shards need no coordinator and a shard that is run
+# again always owns the same objects.
+#
+# The reports of the shards (see krestreport) are combined with:
+#
+#   Usage: python krestshard.py -out FILE [-reportFormat {JSONL,CSV}] REPORT [REPORT ...]
+#
+######################################################################
+import  argparse
+import  csv
+import  hashlib
+import  json
+from    krestenums import *
+from    krestreport import *
+
+# ---------------- CONSTANTS -----------------------------------------------------
+SHARD_SEPARATOR         = "/"
+
+class KRestShard:
+# -------------------------------------------------------------------------------
+# Shard t_index (1 to t_count) of a migration divided into t_count shards by
+# t_key (see shardKeyOption).  With CLIENT, the shard only lists and retrieves
+# the clients it owns.  With UUID, it lists every client and only retrieves
+# (and imports) the objects it owns.
+# -------------------------------------------------------------------------------
+    def __init__(self, t_index, t_count, t_key=shardKeyOption.UUID.value):
+        self.index          = t_index
+        self.count          = t_count
+        self.key            = t_key
+
+    def isOwned(self, t_keyStr):
+        # The shard of a UUID or client name is the same in every process and Python version
+        # (unlike hash(), which is randomized per process)
+        t_digest = hashlib.sha256(t_keyStr.encode("utf-8")).digest()
+        return int.from_bytes(t_digest[:8], "big") % self.count == self.index - 1
+
+    def isClientOwned(self, t_clientName):
+        if self.key != shardKeyOption.CLIENT.value:
+            return True
+
+        return self.isOwned(t_clientName)
+
+    def isObjOwned(self, t_srcObj):
+        if self.key != shardKeyOption.UUID.value:
+            return True
+
+        return self.isOwned(t_srcObj[GKLMAttributeType.UUID.value])
+
+    def __str__(self):
+        return "%s%s%s (by %s)" %(self.index, SHARD_SEPARATOR, self.count, self.key)
+
+def parseShard(t_shardStr, t_key=shardKeyOption.UUID.value):
+# -------------------------------------------------------------------------------
+# Return the KRestShard of a "i/N" string (e.g. "2/4" is the second of four
+# shards).  Raises ValueError if the string is not a valid shard.
+# -------------------------------------------------------------------------------
+    t_partList = t_shardStr.split(SHARD_SEPARATOR)
+    if len(t_partList) != 2 or not t_partList[0].strip().isdigit() or not t_partList[1].strip().isdigit():
+        raise ValueError("must be i/N, e.g. 1/4")
+
+    t_index, t_count = int(t_partList[0]), int(t_partList[1])
+    if t_count < 1 or t_index < 1 or t_index > t_count:
+        raise ValueError("i/N requires 1 <= i <= N")
+
+    return KRestShard(t_index, t_count, t_key)
+
+def iterReportRecords(t_fileName, t_format=reportFormatOption.JSONL.value):
+# -------------------------------------------------------------------------------
+# Yield each record of a report (see KRestReport) as a dictionary of REPORT_FIELD_LIST
+# -------------------------------------------------------------------------------
+    with open(t_fileName, "r", encoding="utf-8", newline="") as t_file:
+        if t_format == reportFormatOption.CSV.value:
+            yield from csv.DictReader(t_file)
+            return
+
+        for t_line in t_file:
+            if len(t_line.strip()) > 0:
+                yield json.loads(t_line)
+
+def mergeReports(t_fileNameList, t_outFileName, t_format=reportFormatOption.JSONL.value):
+# -------------------------------------------------------------------------------
+# Combine the reports of the shards of a migration into t_outFileName (in the
+# same t_format).  The records are copied in file order and never held in memory.
+#
+# Returns the merged KRestReport (for its counts per stage and status) and the
+# number of objects imported by more than one shard, which is 0 unless the
+# shards were run with different -shard N or -shardKey values.
+# -------------------------------------------------------------------------------
+    t_report        = KRestReport(t_outFileName, t_format)
+    t_importSet     = set()
+    t_overlapCnt    = 0
+
+    for t_fileName in t_fileNameList:
+        for t_record in iterReportRecords(t_fileName, t_format):
+            t_report.write(t_record)
+
+            if t_record[REPORT_STAGE] == reportStage.IMPORT.value:
+                if t_record[REPORT_UUID] in t_importSet:
+                    t_overlapCnt = t_overlapCnt + 1
+                t_importSet.add(t_record[REPORT_UUID])
+
+    t_report.close()
+
+    return t_report, t_overlapCnt
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="krestshard.py", description="Combine the reports of the shards of a migration")
+    parser.add_argument("-out", nargs=1, action="store", dest="out", required=True)
+    parser.add_argument("-reportFormat", nargs=1, action="store", dest="reportFormat", required=False,
+                        choices=[reportFormatOption.JSONL.value,
+                                 reportFormatOption.CSV.value
+                                ],
+                        default=[reportFormatOption.JSONL.value] )
+    parser.add_argument("reportList", nargs="+", metavar="REPORT")
+    args = parser.parse_args()
+
+    outFile         = str(" ".join(args.out))
+    reportFormat    = str(" ".join(args.reportFormat))
+    if outFile in args.reportList:
+        parser.error("-out must not be one of the reports")
+
+    report, overlapCnt = mergeReports(args.reportList, outFile, reportFormat)
+    print(" Merged %s reports into %s (%s)" %(len(args.reportList), outFile, report.getCountStr()))
+
+    if overlapCnt > 0:
+        print(" WARNING: %s objects were imported by more than one shard.  Were all shards run with the same -shard N and -shardKey?" %(overlapCnt))
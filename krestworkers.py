@@ -0,0 +1,55 @@
+# key-rest-workers
+#
+# definition file of helpers for issuing REST Commands to the source
+# and destination servers concurrently
+#
+######################################################################
+from    concurrent.futures import ThreadPoolExecutor
+from    collections import deque
+
+def runConcurrently(t_fn, t_itemList, t_workers):
+# -------------------------------------------------------------------------------
+# Apply t_fn to each item in t_itemList using a bounded pool of t_workers
+# threads and return the results as a list.
+#
+# The results are returned in the SAME order as t_itemList, regardless of the
+# order in which the individual calls complete.  If t_workers is 1 (or less),
+# the items are simply processed serially in the calling thread.
+# -------------------------------------------------------------------------------
+    t_ListLen = len(t_itemList)
+
+    if t_workers <= 1 or t_ListLen <= 1:
+        return [t_fn(t_item) for t_item in t_itemList]
+
+    with ThreadPoolExecutor(max_workers=min(t_workers, t_ListLen)) as t_pool:
+        t_resultList = list(t_pool.map(t_fn, t_itemList))
+
+    return t_resultList
+
+def iterConcurrently(t_fn, t_itemIter, t_workers):
+# -------------------------------------------------------------------------------
+# Generator version of runConcurrently.  Results are yielded in the SAME order
+# as t_itemIter as soon as they are available.
+#
+# No more than 2 x t_workers calls are outstanding at any time, so memory use
+# does not grow with the number of items.  If the caller stops consuming the
+# results, calls that have not started are cancelled.
+# -------------------------------------------------------------------------------
+    if t_workers <= 1:
+        for t_item in t_itemIter:
+            yield t_fn(t_item)
+        return
+
+    t_pending = deque()
+    with ThreadPoolExecutor(max_workers=t_workers) as t_pool:
+        try:
+            for t_item in t_itemIter:
+                t_pending.append(t_pool.submit(t_fn, t_item))
+                if len(t_pending) >= 2 * t_workers:
+                    yield t_pending.popleft().result()
+
+            while t_pending:
+                yield t_pending.popleft().result()
+        finally:
+            for t_future in t_pending:
+                t_future.cancel()
@@ -0,0 +1,78 @@
+# conftest
+#
+# shared fixtures of the k-rest tests.  The modules of k-rest are in the
+# root of the repository, which is added to the import path.  The
+# mockServers fixture starts the local GKLM and CM stand-ins of
+# bench/mock_servers.py (on a free port) for end-to-end tests, and
+# runKRest runs k-rest.py against them.
+#
+######################################################################
+import  os
+import  shutil
+import  socket
+import  subprocess
+import  sys
+import  time
+import  pytest
+
+TESTS_DIR   = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR    = os.path.dirname(TESTS_DIR)
+
+sys.path.insert(0, REPO_DIR)
+
+MOCK_READY_MSG      = "MOCK SERVERS READY"
+MOCK_START_TIMEOUT  = 30    # seconds
+KREST_RUN_TIMEOUT   = 300   # seconds
+
+def getFreePort():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as t_sock:
+        t_sock.bind(("127.0.0.1", 0))
+        return t_sock.getsockname()[1]
+
+@pytest.fixture
+def mockServers(tmp_path):
+    # Returns a function that starts the mock servers (with the mock_servers.py arguments
+    # given) and returns their port.  The servers are stopped when the test ends.
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is required to create the certificate of the mock servers")
+
+    t_procList = []
+
+    def startMockServers(*t_argList):
+        t_port      = getFreePort()
+        t_logFile   = open(tmp_path / ("mock%s.log" %(len(t_procList))), "w+")
+        t_proc      = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "bench", "mock_servers.py"), "-srcPort", str(t_port),
+                                        "-dstPort", str(t_port), "-certDir", str(tmp_path)] + [str(t_arg) for t_arg in t_argList],
+                                       stdout=t_logFile, stderr=subprocess.STDOUT)
+        t_procList.append(t_proc)
+
+        t_deadline = time.monotonic() + MOCK_START_TIMEOUT
+        while time.monotonic() < t_deadline:
+            t_logFile.seek(0)
+            if MOCK_READY_MSG in t_logFile.read():
+                return t_port
+
+            if t_proc.poll() is not None:
+                break
+            time.sleep(0.1)
+
+        t_logFile.seek(0)
+        pytest.fail("mock servers did not start:\n%s" %(t_logFile.read()))
+
+    yield startMockServers
+
+    for t_proc in t_procList:
+        t_proc.terminate()
+        t_proc.wait(timeout=10)
+
+def runKRest(t_port, *t_argList, t_quiet=True):
+    # Run k-rest.py against the mock servers on t_port (with -quiet, unless t_quiet is False) and return its output
+    t_cmd = [sys.executable, os.path.join(REPO_DIR, "k-rest.py"), "-srcHost", "127.0.0.1", "-srcPort", str(t_port), "-srcUser", "user",
+             "-srcPass", "pass", "-dstHost", "127.0.0.1", "-dstPort", str(t_port), "-dstUser", "user", "-dstPass", "pass"]
+    if t_quiet:
+        t_cmd.append("-quiet")
+
+    t_result = subprocess.run(t_cmd + [str(t_arg) for t_arg in t_argList], cwd=REPO_DIR, capture_output=True, text=True, timeout=KREST_RUN_TIMEOUT)
+    assert t_result.returncode == 0, t_result.stdout + t_result.stderr
+
+    return t_result.stdout
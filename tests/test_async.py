@@ -0,0 +1,88 @@
+# test_async
+#
+# tests of the asyncio engine (krestasync):  the bounded processing of
+# long lists and of the source clients, and the use of the session
+# configured for each server.
+#
+######################################################################
+import  asyncio
+import  pytest
+from    krestsession import *
+from    krestlimiter import *
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from    krestasync import *
+
+@pytest.fixture
+def engine():
+    t_engine = KRestAsyncEngine(t_inFlight=4)
+    yield t_engine
+    t_engine.close()
+
+def test_mapBounded(engine):
+    t_runningList = [0, 0]  # running, most running at once
+
+    async def double(t_item):
+        t_runningList[0] = t_runningList[0] + 1
+        t_runningList[1] = max(t_runningList[1], t_runningList[0])
+        await asyncio.sleep(0.001 * (t_item % 3))
+        t_runningList[0] = t_runningList[0] - 1
+        return t_item * 2
+
+    assert engine.run(engine.mapBounded(double, range(100))) == [t_item * 2 for t_item in range(100)]
+    assert t_runningList[1] == engine.inFlight
+
+def test_mapBoundedCoroutines(engine):
+    # no more than inFlight coroutines are created, whatever the number of items
+    t_createdList = []
+
+    async def check(t_item):
+        t_createdList.append(t_item)
+        return len(asyncio.all_tasks())
+
+    t_taskCntList = engine.run(engine.mapBounded(check, range(1000)))
+    assert len(t_createdList) == 1000
+    assert max(t_taskCntList) <= engine.inFlight + 1
+
+def test_mapBoundedEmpty(engine):
+    async def fail(t_item):
+        raise AssertionError("no items")
+
+    assert engine.run(engine.mapBounded(fail, [])) == []
+
+def test_getSrcClientWorkList(engine, monkeypatch, capsys):
+    # no more than t_clientWorkers clients are processed at once, and a client
+    # that fails is skipped without affecting the others
+    t_runningList = [0, 0]  # running, most running at once
+
+    async def getSrcClientObjDataLists(t_srcHost, t_srcPort, t_srcAuthStr, t_srcUser, t_clientDict, *t_argList):
+        t_runningList[0] = t_runningList[0] + 1
+        t_runningList[1] = max(t_runningList[1], t_runningList[0])
+        await asyncio.sleep(0.001 * (int(t_clientDict["clientName"][6:]) % 3))
+        t_runningList[0] = t_runningList[0] - 1
+        if t_clientDict["clientName"] == "CLIENT3":
+            raise ValueError("client failed")
+        return [t_clientDict["clientName"]], []
+
+    monkeypatch.setattr(engine, "getSrcClientObjDataLists", getSrcClientObjDataLists)
+
+    t_workList      = [[{"clientName":"CLIENT%s" %(t_idx)}, 1, 0] for t_idx in range(10)]
+    t_resultList    = engine.run(engine.getSrcClientWorkList("gklm", "443", "Bearer token", "user", t_workList, "", False, True,
+                                                             t_clientWorkers=2))
+    assert t_resultList == [None if t_idx == 3 else (["CLIENT%s" %(t_idx)], []) for t_idx in range(10)]
+    assert t_runningList[1] == 2
+    assert "Retrieval of objects for client CLIENT3 failed and was skipped" in capsys.readouterr().out
+
+def test_requestUsesConfiguredSession(engine, mockServers):
+    # The host is used as configured (upper case), not as parsed from the URL (lower case)
+    t_port      = str(mockServers("-clients", 1, "-keys", 1, "-secrets", 0))
+    configureSession("LOCALHOST", t_port)
+    t_limiter   = configureLimiter("LOCALHOST", t_port, 4)
+    t_releaseList = []
+    t_release   = t_limiter.release
+    t_limiter.release = lambda t_secs, t_status: (t_releaseList.append(t_status), t_release(t_secs, t_status))
+
+    r = engine.run(engine.request("LOCALHOST", t_port, "GET", "https://LOCALHOST:%s/SKLM/rest/v1/clients" %(t_port)))
+    # the limiter of the configured session saw the (unauthorized) request
+    assert t_releaseList == [r.status_code]
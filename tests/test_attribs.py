@@ -0,0 +1,36 @@
+# test_attribs
+#
+# tests of the parser of GKLM Custom Attributes strings (parseCustomAttributes)
+#
+######################################################################
+import  pytest
+from    krestcmds import *
+from    netappfilters import createNameValueDict
+
+NETAPP_ATTRIB_STR = "[[NAME x-NETAPP-KeyId] [[INDEX 0] [TYPE JAVA_STRING] [VALUE 0000000200000000000500b6b927c7]]] " \
+                    "[[NAME x-NETAPP-NodeId] [[INDEX 0] [TYPE JAVA_STRING] [VALUE 8d901e7e-741f-11eb-9863-00a098e0f13b]]]"
+
+def test_parseCustomAttributes():
+    assert parseCustomAttributes(NETAPP_ATTRIB_STR) == {"x-NETAPP-KeyId":"0000000200000000000500b6b927c7",
+                                                        "x-NETAPP-NodeId":"8d901e7e-741f-11eb-9863-00a098e0f13b"}
+
+@pytest.mark.parametrize("t_attribStr, t_attribDict", [
+    ("",                                                        {}),
+    ("[]",                                                      {}),
+    ("no attributes",                                           {}),
+    # names and values are stripped
+    ("[[NAME  key ] [[INDEX 0] [TYPE Text] [VALUE  12345 ]]]",  {"key":"12345"}),
+    # values that span lines
+    ("[[NAME key]\n [[INDEX 0]\n [TYPE Text]\n [VALUE 12345]]]", {"key":"12345"}),
+    ("[[NAME key] [[INDEX 0] [TYPE Text] [VALUE line1\nline2]]]", {"key":"line1\nline2"}),
+    # each NAME is paired with the VALUE that follows it
+    ("[[NAME k1] [[VALUE v1]]] [[NAME k2] [[INDEX 0] [VALUE v2]]]", {"k1":"v1", "k2":"v2"}),
+    # an empty value
+    ("[[NAME key] [[INDEX 0] [VALUE ]]]",                       {"key":""}),
+])
+def test_parseCustomAttributesCases(t_attribStr, t_attribDict):
+    assert parseCustomAttributes(t_attribStr) == t_attribDict
+
+def test_bracketsToDict():
+    assert bracketsToDict("  " + NETAPP_ATTRIB_STR + "  ") == parseCustomAttributes(NETAPP_ATTRIB_STR)
+    assert createNameValueDict(NETAPP_ATTRIB_STR) == parseCustomAttributes(NETAPP_ATTRIB_STR)
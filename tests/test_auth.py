@@ -0,0 +1,102 @@
+# test_auth
+#
+# tests of the destination token manager (krestauth):  the background
+# renewal of the bearer token and the callers that must not wait for it
+# (the coroutines of the asyncio engine).
+#
+######################################################################
+import  threading
+import  time
+from    datetime import datetime, timedelta
+import  pytest
+import  krestauth
+from    krestauth import *
+
+class FakeTokenResponse:
+    def __init__(self, t_tokenDict):
+        self.status_code    = STATUS_CODE_OK
+        self.tokenDict      = t_tokenDict
+
+    def json(self):
+        return self.tokenDict
+
+class FakeDstAuth(KRestDstAuth):
+    # Token manager whose token requests are answered locally.  A request waits for
+    # gateEvent, so that a renewal can be held in progress.
+    def __init__(self, t_duration):
+        self.tokenDuration  = t_duration
+        self.tokenCnt       = 0
+        self.gateEvent      = threading.Event()
+        self.gateEvent.set()
+        self.waitingEvent   = threading.Event()     # a token request is waiting for gateEvent
+        KRestDstAuth.__init__(self, "fake-cm", "443", "user", "pass")
+
+    def requestToken(self, t_dstBody):
+        if not self.gateEvent.is_set():
+            self.waitingEvent.set()
+        self.gateEvent.wait()
+        self.tokenCnt = self.tokenCnt + 1
+        return FakeTokenResponse({"jwt":"token%s" %(self.tokenCnt), "duration":self.tokenDuration, "refresh_token":"refresh"})
+
+@pytest.fixture
+def fastRefresh(monkeypatch):
+    monkeypatch.setattr(krestauth, "TOKEN_MIN_REFRESH_WAIT", 0.01)
+
+def waitFor(t_conditionFn, t_timeout=5):
+    t_deadline = time.monotonic() + t_timeout
+    while not t_conditionFn():
+        assert time.monotonic() < t_deadline
+        time.sleep(0.01)
+
+def test_backgroundRefresh(fastRefresh):
+    t_auth = FakeDstAuth(0.2)
+    try:
+        assert t_auth.getCurrentAuthStr() == "Bearer token1"
+        waitFor(lambda: t_auth.tokenCnt >= 3)
+        assert t_auth.getCurrentAuthStr().startswith("Bearer token")
+        assert t_auth.getCurrentAuthStr() in t_auth.issuedSet
+    finally:
+        t_auth.close()
+
+def test_currentAuthStrDoesNotWait(fastRefresh):
+    # A token due for renewal is returned at once while the renewal is in progress,
+    # and the renewal is done by the background thread
+    t_auth = FakeDstAuth(3600)
+    try:
+        t_auth.gateEvent.clear()
+        t_auth.bornOn = datetime.now() - timedelta(hours=1)
+
+        t_start     = time.monotonic()
+        t_authStr   = t_auth.getCurrentAuthStr()
+        assert t_authStr == "Bearer token1"
+
+        # the background renewal holds the lock (and waits for the token request)
+        assert t_auth.waitingEvent.wait(5)
+        assert t_auth.getCurrentAuthStr() == "Bearer token1"
+        assert time.monotonic() - t_start < 1
+
+        t_auth.gateEvent.set()
+        waitFor(lambda: t_auth.getCurrentAuthStr() == "Bearer token2")
+    finally:
+        t_auth.gateEvent.set()
+        t_auth.close()
+
+def test_getAuthStrRenewsStaleToken():
+    # Callers that may block renew a token whose background renewal is late
+    t_auth = FakeDstAuth(3600)
+    try:
+        t_auth.bornOn = datetime.now() - timedelta(hours=1)
+        assert t_auth.getAuthStr() == "Bearer token2"
+    finally:
+        t_auth.close()
+
+def test_renewAfterUnauthorized():
+    t_auth = FakeDstAuth(3600)
+    try:
+        assert t_auth.renewAfterUnauthorized("Bearer other") is None
+        assert t_auth.renewAfterUnauthorized("Bearer token1") == "Bearer token2"
+        # already renewed by another thread:  the current token is used
+        assert t_auth.renewAfterUnauthorized("Bearer token1") == "Bearer token2"
+        assert t_auth.tokenCnt == 2
+    finally:
+        t_auth.close()
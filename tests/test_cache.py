@@ -0,0 +1,141 @@
+# test_cache
+#
+# tests of the cache of source listings (krestcache):  listings used as
+# is while fresh, revalidated with conditional requests once stale, and
+# downloaded again when the server has no validators.
+#
+######################################################################
+import  os
+import  pytest
+import  krestcache
+from    krestcache import *
+
+class FakeResponse:
+    def __init__(self, t_status, t_data=None, t_headers=None):
+        self.status_code    = t_status
+        self.reason         = "reason"
+        self.headers        = t_headers or {}
+        self.data           = t_data
+
+    def json(self):
+        return self.data
+
+class FakeSession:
+    # Answers every GET with the next response of t_responseList and keeps the headers sent
+    def __init__(self, t_responseList):
+        self.responseList   = list(t_responseList)
+        self.headersList    = []
+
+    def get(self, t_url, headers=None):
+        self.headersList.append(headers)
+        return self.responseList.pop(0)
+
+@pytest.fixture
+def fakeSession(monkeypatch):
+    def setResponses(*t_responseList):
+        t_session = FakeSession(t_responseList)
+        monkeypatch.setattr(krestcache, "getSession", lambda t_host, t_port: t_session)
+        return t_session
+
+    return setResponses
+
+LISTING = {"total":1, "resources":[{"name":"CLIENT0"}]}
+
+def test_freshListing(tmp_path, fakeSession):
+    t_session   = fakeSession(FakeResponse(200, LISTING))
+    t_cache     = KRestListingCache(str(tmp_path))
+
+    assert t_cache.get("gklm", "443", "/clients", {"Authorization":"a"}).json() == LISTING
+    # the listing is cached per URL, and not per authorization string
+    t_response  = t_cache.get("gklm", "443", "/clients", {"Authorization":"b"})
+    assert isinstance(t_response, KRestCachedResponse) and t_response.json() == LISTING
+
+    assert len(t_session.headersList) == 1
+    assert t_cache.cntDict == {"hits":1, "revalidated":0, "downloaded":1}
+
+def test_revalidate(tmp_path, fakeSession):
+    t_session   = fakeSession(FakeResponse(200, LISTING, {"ETag":'"v1"', "Last-Modified":"Mon, 05 Oct 2026 10:00:00 GMT"}),
+                              FakeResponse(STATUS_CODE_NOT_MODIFIED))
+    t_cache     = KRestListingCache(str(tmp_path), t_ttl=0)
+
+    t_cache.get("gklm", "443", "/clients", {"Authorization":"a"})
+    assert t_cache.get("gklm", "443", "/clients", {"Authorization":"a"}).json() == LISTING
+
+    assert t_session.headersList[1] == {"Authorization":"a", "If-None-Match":'"v1"',
+                                        "If-Modified-Since":"Mon, 05 Oct 2026 10:00:00 GMT"}
+    # the caller's headers are not changed
+    assert t_session.headersList[0] == {"Authorization":"a"}
+    assert t_cache.cntDict == {"hits":0, "revalidated":1, "downloaded":1}
+
+def test_changedListing(tmp_path, fakeSession):
+    t_changed   = {"total":2, "resources":[{"name":"CLIENT0"}, {"name":"CLIENT1"}]}
+    t_session   = fakeSession(FakeResponse(200, LISTING, {"ETag":'"v1"'}), FakeResponse(200, t_changed, {"ETag":'"v2"'}),
+                              FakeResponse(STATUS_CODE_NOT_MODIFIED))
+    t_cache     = KRestListingCache(str(tmp_path), t_ttl=0)
+
+    t_cache.get("gklm", "443", "/clients", {})
+    assert t_cache.get("gklm", "443", "/clients", {}).json() == t_changed
+    assert t_cache.get("gklm", "443", "/clients", {}).json() == t_changed
+    assert t_session.headersList[2] == {"If-None-Match":'"v2"'}
+
+def test_noValidators(tmp_path, fakeSession):
+    t_session   = fakeSession(FakeResponse(200, LISTING), FakeResponse(200, LISTING))
+    t_cache     = KRestListingCache(str(tmp_path), t_ttl=0)
+
+    t_cache.get("gklm", "443", "/clients", {})
+    t_cache.get("gklm", "443", "/clients", {})
+    assert t_session.headersList == [{}, {}]
+    assert t_cache.cntDict["downloaded"] == 2
+
+def test_refresh(tmp_path, fakeSession):
+    fakeSession(FakeResponse(200, LISTING))
+    KRestListingCache(str(tmp_path)).get("gklm", "443", "/clients", {})
+
+    # every listing is downloaded again, and the cache updated
+    t_session   = fakeSession(FakeResponse(200, {"total":0, "resources":[]}))
+    t_cache     = KRestListingCache(str(tmp_path), t_refresh=True)
+    assert t_cache.get("gklm", "443", "/clients", {}).json()["total"] == 0
+    assert len(t_session.headersList) == 1
+
+    fakeSession()
+    assert KRestListingCache(str(tmp_path)).get("gklm", "443", "/clients", {}).json()["total"] == 0
+
+def test_failedListingIsNotCached(tmp_path, fakeSession):
+    fakeSession(FakeResponse(500), FakeResponse(200, LISTING))
+    t_cache = KRestListingCache(str(tmp_path))
+
+    assert t_cache.get("gklm", "443", "/clients", {}).status_code == 500
+    assert t_cache.get("gklm", "443", "/clients", {}).json() == LISTING
+    assert t_cache.cntDict == {"hits":0, "revalidated":0, "downloaded":1}
+
+def test_incompleteEntry(tmp_path, fakeSession):
+    t_cache = KRestListingCache(str(tmp_path))
+    with open(t_cache.getFileName("gklm", "443", "/clients"), "w") as t_file:
+        t_file.write('{"time": ')
+
+    fakeSession(FakeResponse(200, LISTING))
+    assert t_cache.get("gklm", "443", "/clients", {}).json() == LISTING
+    assert [t_name for t_name in os.listdir(str(tmp_path)) if t_name.endswith(".tmp")] == []
+
+def test_entryPerListing(tmp_path):
+    t_cache     = KRestListingCache(str(tmp_path))
+    t_fileName  = t_cache.getFileName("gklm", "443", "/clients/CLIENT0/objects")
+
+    assert t_fileName == t_cache.getFileName("gklm", 443, "/clients/CLIENT0/objects")
+    assert t_fileName != t_cache.getFileName("gklm", "443", "/clients/CLIENT1/objects")
+    assert t_fileName != t_cache.getFileName("gklm2", "443", "/clients/CLIENT0/objects")
+
+def test_getListing(tmp_path, fakeSession, monkeypatch):
+    # without the cache, every listing is downloaded
+    monkeypatch.setattr(krestcache, "_listingCache", None)
+    t_session = fakeSession(FakeResponse(200, LISTING), FakeResponse(200, LISTING))
+    getListing("gklm", "443", "/clients", {})
+    getListing("gklm", "443", "/clients", {})
+    assert len(t_session.headersList) == 2 and getListingCache() is None
+
+    t_cache = configureListingCache(str(tmp_path))
+    assert getListingCache() is t_cache
+    t_session = fakeSession(FakeResponse(200, LISTING))
+    getListing("gklm", "443", "/clients", {})
+    getListing("gklm", "443", "/clients", {})
+    assert len(t_session.headersList) == 1
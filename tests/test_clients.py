@@ -0,0 +1,56 @@
+# test_clients
+#
+# tests of the retrieval of the objects of one source client
+# (getSrcClientObjDataLists):  the ownership of the client is changed only
+# if needed, and is restored even if the retrieval fails.
+#
+######################################################################
+import  pytest
+import  krestcmds
+from    krestcmds import *
+
+@pytest.fixture
+def fakeSrcClient(monkeypatch):
+    # Records the changes of client users and returns one object per type,
+    # unless the type is in t_failTypeList
+    t_callList = []
+
+    def setFailures(*t_failTypeList):
+        def iterSrcObjDataListByClient(t_srcHost, t_srcPort, t_srcAuthStr, t_suuid, t_objectType, t_client, *t_argList):
+            t_callList.append(("get", t_client, t_objectType))
+            if t_objectType in t_failTypeList:
+                raise requests.exceptions.ConnectionError("reset")
+            yield {GKLMAttributeType.UUID.value:"%s-%s" %(t_objectType, t_client)}
+
+        monkeypatch.setattr(krestcmds, "iterSrcObjDataListByClient", iterSrcObjDataListByClient)
+        monkeypatch.setattr(krestcmds, "assignSrcClientUsers", lambda t_host, t_port, t_auth, t_client, t_userList: t_callList.append(("assign", t_client, list(t_userList))))
+        monkeypatch.setattr(krestcmds, "removeSrcClientUsers", lambda t_host, t_port, t_auth, t_client, t_userList: t_callList.append(("remove", t_client, list(t_userList))))
+        return t_callList
+
+    return setFailures
+
+def createClient(t_userList):
+    return {GKLMAttributeType.CLIENT_NAME.value:"CLIENT0", GKLMAttributeType.CLIENT_USERS.value:t_userList}
+
+def test_ownedClient(fakeSrcClient):
+    t_callList = fakeSrcClient()
+    t_keyList, t_secretList = getSrcClientObjDataLists("gklm", "443", "Bearer token", "user", createClient(["user"]), "", 1, 1, True, True)
+
+    assert len(t_keyList) == 1 and len(t_secretList) == 1
+    assert [t_call[0] for t_call in t_callList] == ["get", "get"]
+
+def test_ownershipRestored(fakeSrcClient):
+    t_callList = fakeSrcClient()
+    t_keyList, t_secretList = getSrcClientObjDataLists("gklm", "443", "Bearer token", "user", createClient(["other"]), "", 1, 1, False, True)
+
+    # secrets are not retrieved unless requested
+    assert len(t_keyList) == 1 and t_secretList == []
+    assert t_callList == [("assign", "CLIENT0", ["user"]), ("get", "CLIENT0", GKLMAttributeType.SYMMETRIC_KEY.value),
+                          ("remove", "CLIENT0", ["user"]), ("assign", "CLIENT0", ["other"])]
+
+def test_ownershipRestoredOnFailure(fakeSrcClient):
+    t_callList = fakeSrcClient(GKLMAttributeType.SECRET_DATA.value)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        getSrcClientObjDataLists("gklm", "443", "Bearer token", "user", createClient(["other"]), "", 1, 1, True, True)
+
+    assert t_callList[-2:] == [("remove", "CLIENT0", ["user"]), ("assign", "CLIENT0", ["other"])]
@@ -0,0 +1,53 @@
+# test_dstindex
+#
+# tests of the index of destination objects (krestcmds) used by
+# -skipExisting and -verify:  objects identical to, present in or
+# conflicting with the destination, as found from the fingerprints of its
+# listing.
+#
+######################################################################
+import  hashlib
+import  pytest
+from    krestcmds import *
+from    krestenums import *
+
+def createXObj(t_name, t_material):
+    return {CMAttributeType.NAME.value:t_name, CMAttributeType.MATERIAL.value:t_material}
+
+def createDstObj(t_name, t_material=None):
+    t_dstObj = {CMAttributeType.NAME.value:t_name}
+    if t_material is not None:
+        t_dstObj[CMAttributeType.SHA256_FINGERPRINT.value] = hashlib.sha256(bytes.fromhex(t_material)).hexdigest().upper()
+    return t_dstObj
+
+DST_OBJ_INDEX = createDstObjIndex([createDstObj("k1", "00ff"), createDstObj("k2"), createDstObj("k3", "00ff")])
+
+def test_createDstObjIndex():
+    # fingerprints are compared in lower case, and are empty if the listing has none
+    assert DST_OBJ_INDEX == {"k1":hashlib.sha256(b"\x00\xff").hexdigest(), "k2":"", "k3":hashlib.sha256(b"\x00\xff").hexdigest()}
+
+def test_getDataObjFingerprint():
+    assert getDataObjFingerprint(createXObj("k1", "00ff")) == hashlib.sha256(b"\x00\xff").hexdigest()
+    # material that is not hex (e.g. of a secret) is hashed as is
+    assert getDataObjFingerprint(createXObj("s1", "secret")) == hashlib.sha256(b"secret").hexdigest()
+
+@pytest.mark.parametrize("t_xObj, t_status", [
+    (createXObj("k1", "00ff"),  dstIndexStatus.IDENTICAL.value),
+    (createXObj("k1", "00FF"),  dstIndexStatus.IDENTICAL.value),
+    (createXObj("k2", "00ff"),  dstIndexStatus.PRESENT.value),
+    (createXObj("k3", "0011"),  dstIndexStatus.CONFLICT.value),
+    (createXObj("k4", "00ff"),  dstIndexStatus.ABSENT.value),
+])
+def test_checkDstObjIndex(t_xObj, t_status):
+    assert checkDstObjIndex(t_xObj, DST_OBJ_INDEX) == t_status
+
+@pytest.mark.parametrize("t_workers", [1, 4])
+def test_verifyDstObjList(t_workers):
+    # missing objects, objects with other material and objects without a fingerprint are told apart
+    t_xObjList = [createXObj("k%s" %(t_idx % 5), "00ff" if t_idx % 3 else "0011") for t_idx in range(30)]
+    assert verifyDstObjList(t_xObjList, DST_OBJ_INDEX, t_workers) == [checkDstObjIndex(t_xObj, DST_OBJ_INDEX) for t_xObj in t_xObjList]
+
+    assert verifyDstObjList([createXObj("k4", "00ff"), createXObj("k3", "0011"), createXObj("k2", "0011"), createXObj("k1", "00ff")],
+                            DST_OBJ_INDEX, t_workers) == \
+           [dstIndexStatus.ABSENT.value, dstIndexStatus.CONFLICT.value, dstIndexStatus.PRESENT.value, dstIndexStatus.IDENTICAL.value]
+    assert verifyDstObjList([], DST_OBJ_INDEX, t_workers) == []
@@ -0,0 +1,80 @@
+# test_dstlist
+#
+# tests of the paged listing of destination objects (getDstObjList):  the
+# pages read at the same time are assembled in order, with the page size
+# of the server, and a page that cannot be read is reported and skipped.
+#
+######################################################################
+import  random
+import  time
+from    urllib.parse import urlparse, parse_qs
+import  pytest
+import  krestcmds
+from    krestcmds import *
+
+class FakeResponse:
+    def __init__(self, t_status, t_data=None):
+        self.status_code    = t_status
+        self.reason         = "reason"
+        self.text           = ""
+        self.data           = t_data
+
+    def json(self):
+        return self.data
+
+class FakeListSession:
+    # Answers GET vault/keys2/?skip=&limit= with t_total objects, no more than
+    # t_serverLimit per page, and fails the pages of t_failSkipSet
+    def __init__(self, t_total, t_serverLimit=1000, t_failSkipSet=()):
+        self.total          = t_total
+        self.serverLimit    = t_serverLimit
+        self.failSkipSet    = set(t_failSkipSet)
+        self.skipList       = []
+
+    def get(self, t_url, headers=None):
+        t_query     = parse_qs(urlparse(t_url).query)
+        t_skip      = int(t_query["skip"][0])
+        t_limit     = min(int(t_query["limit"][0]), self.serverLimit)
+        self.skipList.append(t_skip)
+        time.sleep(random.Random(t_skip).random() * 0.01)
+        if t_skip in self.failSkipSet:
+            return FakeResponse(500)
+
+        t_resourceList = [{"name":"k%s" %(t_idx)} for t_idx in range(t_skip, min(t_skip + t_limit, self.total))]
+        return FakeResponse(200, {"total":self.total, "resources":t_resourceList})
+
+@pytest.fixture
+def fakeSession(monkeypatch):
+    def setSession(*t_argList, **t_argDict):
+        t_session = FakeListSession(*t_argList, **t_argDict)
+        monkeypatch.setattr(krestcmds, "getSession", lambda t_host, t_port: t_session)
+        return t_session
+
+    return setSession
+
+def getNameList(t_objList):
+    return [t_obj["name"] for t_obj in t_objList]
+
+@pytest.mark.parametrize("t_total", [0, 1, 10, 95, 100, 101])
+@pytest.mark.parametrize("t_workers", [1, 4])
+def test_pagesInOrder(fakeSession, t_total, t_workers):
+    t_session = fakeSession(t_total)
+    assert getNameList(getDstObjList("cm", "443", "Bearer token", 10, t_workers)) == ["k%s" %(t_idx) for t_idx in range(t_total)]
+    assert sorted(t_session.skipList) == list(range(0, max(t_total, 1), 10))
+
+def test_serverPageLimit(fakeSession):
+    # the server returns fewer objects per page than requested
+    t_session = fakeSession(45, t_serverLimit=10)
+    assert getNameList(getDstObjList("cm", "443", "Bearer token", 100, 4)) == ["k%s" %(t_idx) for t_idx in range(45)]
+    assert sorted(t_session.skipList) == [0, 10, 20, 30, 40]
+
+def test_failedPage(fakeSession, capsys):
+    fakeSession(50, t_failSkipSet={20})
+    assert getNameList(getDstObjList("cm", "443", "Bearer token", 10, 4)) == \
+           ["k%s" %(t_idx) for t_idx in list(range(20)) + list(range(30, 50))]
+    assert "WARNING: 1 destination listing page(s) could not be read.  40 of 50" in capsys.readouterr().out
+
+def test_failedFirstPage(fakeSession):
+    fakeSession(50, t_failSkipSet={0})
+    with pytest.raises(SystemExit):
+        getDstObjList("cm", "443", "Bearer token", 10, 4)
@@ -0,0 +1,66 @@
+# test_journal
+#
+# tests of the checkpoint journal (krestjournal):  the records written
+# for each object and the UUIDs that -resume skips, including after an
+# interrupted write.
+#
+######################################################################
+import  json
+from    krestenums import *
+from    krestjournal import *
+
+def test_record(tmp_path):
+    t_fileName  = str(tmp_path / "journal.jsonl")
+    t_journal   = KRestJournal(t_fileName, t_syncBatch=2)
+    t_journal.record("KEY-1", "k1", journalStatus.IMPORTED.value)
+    t_journal.record("KEY-2", "k2", journalStatus.FAILED.value)
+    assert t_journal.unsyncedCnt == 0
+    t_journal.record("KEY-3", "k3", journalStatus.IMPORTED.value)
+    assert t_journal.unsyncedCnt == 1
+    t_journal.close()
+
+    # records written after the journal is closed are ignored
+    t_journal.record("KEY-4", "k4", journalStatus.IMPORTED.value)
+    t_journal.close()
+
+    with open(t_fileName, encoding="utf-8") as t_file:
+        t_recordList = [json.loads(t_line) for t_line in t_file]
+    assert [(t_record[JOURNAL_UUID], t_record[JOURNAL_NAME], t_record[JOURNAL_STATUS]) for t_record in t_recordList] == \
+           [("KEY-1", "k1", "imported"), ("KEY-2", "k2", "failed"), ("KEY-3", "k3", "imported")]
+
+def test_appendAcrossRuns(tmp_path):
+    t_fileName = str(tmp_path / "journal.jsonl")
+    for t_uuid in ["KEY-1", "KEY-2"]:
+        t_journal = KRestJournal(t_fileName)
+        t_journal.record(t_uuid, t_uuid.lower(), journalStatus.IMPORTED.value)
+        t_journal.close()
+
+    assert readJournalImportedUUIDs(t_fileName) == {"KEY-1", "KEY-2"}
+
+def test_readImportedUUIDs(tmp_path):
+    t_fileName  = str(tmp_path / "journal.jsonl")
+    t_journal   = KRestJournal(t_fileName)
+    t_journal.record("KEY-1", "k1", journalStatus.IMPORTED.value)
+    t_journal.record("KEY-2", "k2", journalStatus.FAILED.value)
+    t_journal.record("KEY-3", "k3", journalStatus.IMPORTED.value)
+    t_journal.record("KEY-2", "k2", journalStatus.IMPORTED.value)     # imported by a later run
+    t_journal.close()
+
+    # the run was interrupted while a record was written
+    with open(t_fileName, "a", encoding="utf-8") as t_file:
+        t_file.write('{"uuid": "KEY-4", "name": "k4", "sta')
+
+    assert readJournalImportedUUIDs(t_fileName) == {"KEY-1", "KEY-2", "KEY-3"}
+
+def test_missingJournal(tmp_path):
+    assert readJournalImportedUUIDs(str(tmp_path / "none.jsonl")) == set()
+
+def test_existingObjectsAreDone(tmp_path):
+    # objects skipped by -skipExisting as already present are done, conflicts are not
+    t_fileName  = str(tmp_path / "journal.jsonl")
+    t_journal   = KRestJournal(t_fileName)
+    t_journal.record("KEY-1", "k1", journalStatus.EXISTS.value)
+    t_journal.record("KEY-2", "k2", journalStatus.CONFLICT.value)
+    t_journal.close()
+
+    assert readJournalImportedUUIDs(t_fileName) == {"KEY-1"}
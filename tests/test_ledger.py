@@ -0,0 +1,96 @@
+# test_ledger
+#
+# tests of the migration ledger (krestledger):  the listing digest, the
+# objects skipped by a delta and the outcomes kept across runs.
+#
+######################################################################
+import  sqlite3
+import  pytest
+from    krestenums import *
+from    krestledger import *
+
+def createSrcObj(t_uuid, t_usage="ENCRYPT DECRYPT"):
+    return {GKLMAttributeType.UUID.value:t_uuid, GKLMAttributeType.ALIAS.value:"[%s]" %(t_uuid),
+            GKLMAttributeType.CRYPTOGRAPHIC_USAGE_MASK.value:t_usage}
+
+def getStatus(t_fileName, t_srcUUID):
+    t_conn = sqlite3.connect(t_fileName)
+    try:
+        return t_conn.execute("SELECT status FROM objects WHERE src_uuid = ?", (t_srcUUID,)).fetchone()[0]
+    finally:
+        t_conn.close()
+
+@pytest.fixture
+def ledgerFile(tmp_path):
+    return str(tmp_path / "ledger.db")
+
+def migrate(t_fileName, t_srcObjList, t_skipUnchanged, t_import=True):
+    # One run:  the objects that pass the listing filter are (if t_import) imported.
+    # Returns the UUIDs of the objects that passed.
+    t_ledger    = KRestLedger(t_fileName)
+    t_uuidList  = [t_obj[GKLMAttributeType.UUID.value] for t_obj in t_srcObjList if t_ledger.filterSrcObj(t_obj, t_skipUnchanged)]
+    if t_import:
+        for t_uuid in t_uuidList:
+            t_ledger.recordResult(t_uuid, t_uuid, "fp-" + t_uuid, journalStatus.IMPORTED.value)
+    t_ledger.close()
+
+    return t_uuidList
+
+def test_listingDigest():
+    t_srcObj = createSrcObj("KEY-1")
+    t_digest = getSrcObjListingDigest(t_srcObj)
+
+    # the key block and the client name are not part of the listing
+    assert getSrcObjListingDigest(dict(t_srcObj, KEY_BLOCK={"KEY_MATERIAL":"00"}, clientName="CLIENT0")) == t_digest
+    assert getSrcObjListingDigest(createSrcObj("KEY-1", "ENCRYPT")) != t_digest
+
+def test_delta(ledgerFile):
+    t_srcObjList = [createSrcObj("KEY-%s" %(t_idx)) for t_idx in range(3)]
+    assert migrate(ledgerFile, t_srcObjList, True) == ["KEY-0", "KEY-1", "KEY-2"]
+
+    # unchanged objects are skipped, new and changed objects are not
+    t_srcObjList = [createSrcObj("KEY-0"), createSrcObj("KEY-1", "ENCRYPT"), createSrcObj("KEY-2"), createSrcObj("KEY-3")]
+    assert migrate(ledgerFile, t_srcObjList, True) == ["KEY-1", "KEY-3"]
+    assert migrate(ledgerFile, t_srcObjList, True) == []
+
+def test_failedObjectIsMigratedAgain(ledgerFile):
+    t_ledger = KRestLedger(ledgerFile)
+    assert t_ledger.filterSrcObj(createSrcObj("KEY-1"), True)
+    t_ledger.recordResult("KEY-1", "KEY-1", None, journalStatus.FAILED.value)
+    t_ledger.close()
+
+    assert migrate(ledgerFile, [createSrcObj("KEY-1")], True) == ["KEY-1"]
+
+def test_readKeepsOutcome(ledgerFile):
+    # A run that only reads the objects (without -delta, or -listOnly SOURCE) does not
+    # undo the outcome of the objects that have not changed
+    t_srcObjList = [createSrcObj("KEY-1"), createSrcObj("KEY-2")]
+    migrate(ledgerFile, t_srcObjList, True)
+
+    assert migrate(ledgerFile, [createSrcObj("KEY-1"), createSrcObj("KEY-2", "ENCRYPT")], False, t_import=False) == ["KEY-1", "KEY-2"]
+    assert getStatus(ledgerFile, "KEY-1") == journalStatus.IMPORTED.value
+    assert getStatus(ledgerFile, "KEY-2") == LEDGER_STATUS_READ
+
+    assert migrate(ledgerFile, [createSrcObj("KEY-1"), createSrcObj("KEY-2", "ENCRYPT")], True) == ["KEY-2"]
+
+def test_runs(ledgerFile):
+    migrate(ledgerFile, [createSrcObj("KEY-1"), createSrcObj("KEY-2")], True)
+    migrate(ledgerFile, [createSrcObj("KEY-1"), createSrcObj("KEY-3")], True)
+
+    t_conn = sqlite3.connect(ledgerFile)
+    try:
+        assert t_conn.execute("SELECT run_id, read_cnt, result_cnt FROM runs ORDER BY run_id").fetchall() == [(1, 2, 2), (2, 1, 1)]
+    finally:
+        t_conn.close()
+
+def test_commitBatch(ledgerFile):
+    # writes are committed in batches (and when the ledger is closed)
+    t_ledger = KRestLedger(ledgerFile, t_commitBatch=2, t_commitInterval=3600)
+    t_ledger.filterSrcObj(createSrcObj("KEY-1"), False)
+    assert t_ledger.pendingCnt == 1
+    t_ledger.filterSrcObj(createSrcObj("KEY-2"), False)
+    assert t_ledger.pendingCnt == 0
+    t_ledger.close()
+    t_ledger.close()
+
+    assert getStatus(ledgerFile, "KEY-2") == LEDGER_STATUS_READ
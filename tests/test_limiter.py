@@ -0,0 +1,160 @@
+# test_limiter
+#
+# tests of the adaptive concurrency limiter (krestlimiter):  the slow
+# start, the additive increase, the decreases on overload and rising
+# latency, and the threads and coroutines waiting for a slot.
+#
+######################################################################
+import  asyncio
+import  threading
+import  time
+from    krestlimiter import *
+from    krestmetrics import METRICS_STATUS_EXCEPTION
+
+def respond(t_limiter, t_cnt, t_secs=0.01, t_status=200):
+    # t_cnt requests, one at a time
+    for t_idx in range(t_cnt):
+        t_limiter.acquire()
+        t_limiter.release(t_secs, t_status)
+
+def test_slowStart():
+    t_limiter = KRestLimiter("server", 48)
+    assert t_limiter.getLimit() == DEFAULT_INITIAL_LIMIT
+
+    # the limit doubles after each window (of at least MIN_WINDOW_SAMPLES) ...
+    respond(t_limiter, MIN_WINDOW_SAMPLES - 1)
+    assert t_limiter.getLimit() == 4
+    respond(t_limiter, 1)
+    assert t_limiter.getLimit() == 8
+    respond(t_limiter, MIN_WINDOW_SAMPLES)
+    assert t_limiter.getLimit() == 16
+
+    # ... of at least the limit, and never exceeds the maximum
+    respond(t_limiter, 15)
+    assert t_limiter.getLimit() == 16
+    respond(t_limiter, 1)
+    assert t_limiter.getLimit() == 32
+    respond(t_limiter, 32)
+    assert t_limiter.getLimit() == 48
+
+def test_overloadDecrease():
+    t_limiter = KRestLimiter("server", 64, 8)
+    respond(t_limiter, 1, 0.0, 503)
+    assert t_limiter.getLimit() == 4 and t_limiter.overloadDecreaseCnt == 1
+
+    # a response to a request sent before the decrease does not lower the limit again
+    respond(t_limiter, 1, 3600.0, 429)
+    assert t_limiter.getLimit() == 4 and t_limiter.overloadDecreaseCnt == 1
+
+    # after a decrease, the limit is raised by one per window
+    respond(t_limiter, MIN_WINDOW_SAMPLES)
+    assert t_limiter.getLimit() == 5
+    respond(t_limiter, MIN_WINDOW_SAMPLES)
+    assert t_limiter.getLimit() == 6
+
+def test_overloadStatus():
+    for t_status in OVERLOAD_STATUS_LIST:
+        t_limiter = KRestLimiter("server", 64, 8)
+        respond(t_limiter, 1, 0.0, t_status)
+        assert t_limiter.getLimit() == 4
+
+    # failed requests that the server did not cause are not overload
+    t_limiter = KRestLimiter("server", 64, 8)
+    respond(t_limiter, 1, 0.0, 404)
+    respond(t_limiter, 1, 0.0, 500)
+    assert t_limiter.getLimit() == 8 and METRICS_STATUS_EXCEPTION in OVERLOAD_STATUS_LIST
+
+def test_minLimit():
+    t_limiter = KRestLimiter("server", 64, 8)
+    respond(t_limiter, 10, 0.0, 503)
+    assert t_limiter.getLimit() == MIN_LIMIT
+
+    # the limit is raised from the minimum again
+    respond(t_limiter, MIN_WINDOW_SAMPLES)
+    assert t_limiter.getLimit() == MIN_LIMIT + 1
+
+def test_latencyDecrease():
+    t_limiter = KRestLimiter("server", 64)
+    respond(t_limiter, MIN_WINDOW_SAMPLES, 0.01)
+    assert t_limiter.getLimit() == 8
+
+    # the p95 exceeds the baseline by more than LATENCY_TOLERANCE
+    respond(t_limiter, MIN_WINDOW_SAMPLES, 0.01 * LATENCY_TOLERANCE * 2)
+    assert t_limiter.getLimit() == int(8 * LATENCY_DECREASE) and t_limiter.latencyDecreaseCnt == 1
+
+    # within the tolerance, the limit is raised (by one, the slow start has ended)
+    respond(t_limiter, MIN_WINDOW_SAMPLES, 0.01 * LATENCY_TOLERANCE)
+    assert t_limiter.getLimit() == int(8 * LATENCY_DECREASE) + 1
+
+def test_acquireWaits():
+    t_limiter = KRestLimiter("server", 64, 1)
+    t_limiter.acquire()
+
+    t_acquiredEvent = threading.Event()
+    def acquire():
+        t_limiter.acquire()
+        t_acquiredEvent.set()
+
+    t_thread = threading.Thread(target=acquire)
+    t_thread.start()
+    assert not t_acquiredEvent.wait(0.2)
+
+    t_limiter.release(0.01, 200)
+    assert t_acquiredEvent.wait(5)
+    t_thread.join()
+    assert t_limiter.inFlight == 1
+
+def test_acquireAsync():
+    t_limiter   = KRestLimiter("server", 64, 2)
+    t_orderList = []
+
+    async def request(t_idx):
+        await t_limiter.acquireAsync()
+        t_orderList.append(("start", t_idx, t_limiter.inFlight))
+        await asyncio.sleep(0.01)
+        t_limiter.release(0.01, 200)
+
+    async def run():
+        await asyncio.gather(*[request(t_idx) for t_idx in range(6)])
+
+    asyncio.run(run())
+    assert [t_idx for t_event, t_idx, t_inFlight in t_orderList] == list(range(6))
+    assert max(t_inFlight for t_event, t_idx, t_inFlight in t_orderList) == 2
+    assert t_limiter.inFlight == 0
+
+def test_acquireAsyncCancelled():
+    t_limiter = KRestLimiter("server", 64, 1)
+
+    async def run():
+        await t_limiter.acquireAsync()
+        t_task = asyncio.ensure_future(t_limiter.acquireAsync())
+        await asyncio.sleep(0.01)
+        t_task.cancel()
+        await asyncio.gather(t_task, return_exceptions=True)
+
+        # the cancelled coroutine does not hold a slot
+        t_limiter.release(0.01, 200)
+        await asyncio.wait_for(t_limiter.acquireAsync(), 5)
+
+    asyncio.run(run())
+    assert t_limiter.inFlight == 1 and len(t_limiter.asyncWaiterList) == 0
+
+def test_summary():
+    t_limiter = KRestLimiter("server", 16)
+    respond(t_limiter, MIN_WINDOW_SAMPLES)
+    time.sleep(0.01)
+
+    assert t_limiter.getSummaryStr().startswith("limit 4 -> 8 (range 4-8, mean ")
+    assert t_limiter.getSummaryStr().endswith("of max 16), 0 overload and 0 latency decreases")
+
+    t_pointList = t_limiter.getTimelineStr(4).split(" ")
+    assert len(t_pointList) == 5
+    assert t_pointList[0] == "0s:4" and t_pointList[-1].endswith(":8")
+
+def test_configureLimiter():
+    # the source and destination on the same server share the limiter
+    t_limiter = configureLimiter("limited.test", "443", 8)
+    assert configureLimiter("limited.test", 443, 16) is t_limiter
+    assert t_limiter.maxLimit == 16
+    assert getSession("limited.test", "443").limiter is t_limiter
+    assert t_limiter in getLimiterList()
@@ -0,0 +1,77 @@
+# test_mapper
+#
+# tests of the object mapper (krestmapper):  the CM payloads of known
+# GKLM keys and secrets (golden output), and the parity of KRestMapper
+# with the previous per-object mapper kept in bench/bench_mapper.py.
+#
+######################################################################
+import  json
+import  os
+import  random
+import  sys
+import  pytest
+from    conftest import REPO_DIR
+from    krestcmds import getGroupPermissions
+from    krestmapper import *
+
+sys.path.insert(0, os.path.join(REPO_DIR, "bench"))
+
+import  bench_mapper
+
+SRC_KEY     = {"uuid":"KEY-1", "alias":"[k1]", "key type":"SYMMETRIC_KEY", "key algorithm":"AES", "key length (in bits)":"256",
+               "Cryptographic Usage Mask":"ENCRYPT DECRYPT ",
+               "Custom Attributes":"[[NAME x-NETAPP-NodeId] [[INDEX 0] [TYPE JAVA_STRING] [VALUE node1]]] "
+                                   "[[NAME x-OTHER-Tag] [[INDEX 0] [TYPE JAVA_STRING] [VALUE t1]]]",
+               "KEY_BLOCK":{"KEY_MATERIAL":"00ff", "KEY_FORMAT":"RAW"}}
+
+SRC_SECRET  = {"uuid":"SECRET-1", "Name":"[[INDEX 0] [TYPE UNINTERPRETED_TEXT_STRING] [VALUE s1]]", "Type":"PASSWORD",
+               "State":"PRE_ACTIVE", "Cryptographic Length":"64", "Cryptographic Usage Mask":"ENCRYPT",
+               "KEY_BLOCK":{"KEY_MATERIAL":"abcd", "KEY_FORMAT":"OPAQUE"}}
+
+# The payloads are compared as JSON, i.e. as they are imported (including the order of the fields)
+DST_KEY     = ('{"name": "k1", "usageMask": 12, "algorithm": "AES", "size": 256, "objectType": "Symmetric Key", "material": "00ff", '
+               '"format": "raw", "meta": {"ownerId": "local|u", "kmip": {"custom": [{"type": "TextString", "index": 0, "x-NETAPP-NodeId": "node1"}]}}}')
+
+DST_SECRET  = ('{"name": "s1", "aliases": [{"alias": "s1", "type": "string", "index": 0}], "usageMask": 4, "state": "Pre-Active", '
+               '"algorithm": "SECRETSEED", "objectType": "Secret Data", "size": 64, "dataType": "password", "material": "abcd", '
+               '"format": "opaque", "meta": {"ownerId": "local|u"}}')
+
+def test_mapKeyObj():
+    assert json.dumps(KRestMapper("local|u").mapKeyObj(SRC_KEY)) == DST_KEY
+    assert json.dumps(KRestMapper("local|u").mapObj(GKLMAttributeType.SYMMETRIC_KEY.value, SRC_KEY)) == DST_KEY
+
+def test_mapSecretObj():
+    assert json.dumps(KRestMapper("local|u").mapSecretObj(SRC_SECRET)) == DST_SECRET
+    assert json.dumps(KRestMapper("local|u").mapObj(GKLMAttributeType.SECRET_DATA.value, SRC_SECRET)) == DST_SECRET
+
+def test_mapWithGroup():
+    t_mapper    = KRestMapper("local|u", "Key Users")
+    t_xKeyObj   = t_mapper.mapKeyObj(SRC_KEY)
+    t_xSecretObj = t_mapper.mapSecretObj(SRC_SECRET)
+
+    assert t_xKeyObj[DST_META][DST_GROUP_PERMISSIONS] == getGroupPermissions("Key Users")
+    assert t_xKeyObj[DST_ALIASES] == [{DST_ALIAS:"k1", DST_ALIAS_TYPE:"string"}]
+    assert t_xSecretObj[DST_META][DST_GROUP_PERMISSIONS] == getGroupPermissions("Key Users")
+
+    # without the group, the payloads are those of the golden output
+    t_xKeyObj.pop(DST_ALIASES)
+    t_xKeyObj[DST_META].pop(DST_GROUP_PERMISSIONS)
+    assert json.dumps(t_xKeyObj) == DST_KEY
+
+@pytest.mark.parametrize("t_usageStr, t_usageMask", [("ENCRYPT DECRYPT ", 12), ("ENCRYPT", 4), (" SIGN VERIFY", 3),
+                                                     ("", 0), ("UNKNOWN ENCRYPT", 4)])
+def test_mapUsageMask(t_usageStr, t_usageMask):
+    assert mapUsageMask(t_usageStr) == t_usageMask
+
+def test_mapSrcObjName():
+    assert mapSrcObjName(SRC_KEY) == "k1"
+    assert mapSrcObjName(SRC_SECRET) == "s1"
+    assert mapSrcObjName({"uuid":"KEY-2"}) is None
+
+@pytest.mark.parametrize("t_dstGrp", [None, "Key Users"])
+def test_parityWithPreviousMapper(t_dstGrp):
+    t_random        = random.Random(7)
+    t_usageMaskList = bench_mapper.createUsageMaskList(t_random, 50)
+    t_recordList    = [bench_mapper.createSrcRecord(t_random, t_idx, t_usageMaskList) for t_idx in range(2000)]
+
+    assert bench_mapper.checkPayloads(t_recordList, "local|u", t_dstGrp) == 0
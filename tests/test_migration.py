@@ -0,0 +1,80 @@
+# test_migration
+#
+# end-to-end tests of k-rest.py against the mock servers (see conftest):
+# a client that fails is skipped, streaming imports what a batch run
+# imports, an interrupted run is resumed from its journal, objects already
+# in the destination are skipped and the quiet console keeps the counts.
+#
+######################################################################
+import  json
+import  pytest
+from    conftest import runKRest
+from    krestenums import *
+from    krestreport import *
+
+def readReportNames(t_fileName, t_stage, t_status=None):
+    with open(t_fileName, encoding="utf-8") as t_file:
+        t_recordList = [json.loads(t_line) for t_line in t_file]
+
+    return sorted([t_record[REPORT_NAME] for t_record in t_recordList
+                   if t_record[REPORT_STAGE] == t_stage and (t_status is None or t_record[REPORT_STATUS] == t_status)])
+
+def listDstNames(t_port, t_fileName):
+    runKRest(t_port, "-listOnly", listOnlyOption.DESTINATION.value, "-report", t_fileName)
+    return readReportNames(t_fileName, reportStage.DESTINATION.value)
+
+@pytest.mark.parametrize("t_engine", [engineOption.REQUESTS.value, engineOption.ASYNCIO.value])
+def test_failedClientIsSkipped(mockServers, t_engine):
+    # CLIENT1's users cannot be changed, so its objects cannot be retrieved.  The other clients are migrated.
+    t_port      = mockServers("-clients", 3, "-keys", 4, "-secrets", 0, "-failClient", "CLIENT1")
+    t_output    = runKRest(t_port, "-resolveSrcClientOwnership", "-engine", t_engine, "-srcClientWorkers", 2)
+
+    assert "Retrieval of objects for client CLIENT1 failed and was skipped" in t_output
+    assert "Number of Key Objects imported: 8 of 8" in t_output
+
+def test_streamImportsBatch(mockServers, tmp_path):
+    # -stream imports the same objects as a batch run
+    t_nameListList = []
+    for t_argList in [[], ["-stream", "-streamQueueSize", 4]]:
+        t_port = mockServers("-clients", 3, "-keys", 7, "-secrets", 2)
+        runKRest(t_port, "-includeSecrets", "-srcWorkers", 3, "-dstWorkers", 3, *t_argList)
+        t_nameListList.append(listDstNames(t_port, str(tmp_path / ("dst%s.jsonl" %(len(t_nameListList))))))
+
+    assert len(t_nameListList[0]) == 27
+    assert t_nameListList[0] == t_nameListList[1]
+
+def test_resume(mockServers, tmp_path):
+    # The run is interrupted after CLIENT0 (and while a record of the journal was written)
+    t_port      = mockServers("-clients", 3, "-keys", 5, "-secrets", 0)
+    t_journal   = str(tmp_path / "journal.jsonl")
+    runKRest(t_port, "-journal", t_journal, "-srcClientName", "CLIENT0")
+    with open(t_journal, "a", encoding="utf-8") as t_file:
+        t_file.write('{"uuid": "KEY-')
+
+    # listings include the objects already imported
+    runKRest(t_port, "-journal", t_journal, "-resume", "-listOnly", listOnlyOption.SOURCE.value, "-report", str(tmp_path / "src.jsonl"))
+    assert len(readReportNames(str(tmp_path / "src.jsonl"), reportStage.SOURCE.value)) == 15
+
+    # the resumed run imports only the objects of the other clients
+    t_output = runKRest(t_port, "-journal", t_journal, "-resume")
+    assert "Resume: 5 objects previously imported will be skipped" in t_output
+    assert "Number of Key Objects imported: 10 of 10" in t_output
+    assert len(listDstNames(t_port, str(tmp_path / "dst.jsonl"))) == 15
+
+def test_skipExisting(mockServers, tmp_path):
+    t_port = mockServers("-clients", 2, "-keys", 5, "-secrets", 1)
+    runKRest(t_port, "-includeSecrets")
+
+    t_output = runKRest(t_port, "-includeSecrets", "-skipExisting", "-report", str(tmp_path / "report.jsonl"))
+    assert "Objects skipped as already present in destination: 12 identical, 0 without fingerprint, 0 conflicting" in t_output
+    assert len(readReportNames(str(tmp_path / "report.jsonl"), reportStage.IMPORT.value, journalStatus.EXISTS.value)) == 12
+
+def test_quiet(mockServers):
+    t_port          = mockServers("-clients", 2, "-keys", 5, "-secrets", 0)
+    t_output        = runKRest(t_port, t_quiet=False)
+    t_port          = mockServers("-clients", 2, "-keys", 5, "-secrets", 0)
+    t_quietOutput   = runKRest(t_port)
+
+    assert "xKeyObjName" in t_output and "xKeyObjName" not in t_quietOutput
+    assert "Number of Key Objects imported: 10 of 10" in t_quietOutput
+    assert len(t_quietOutput) < len(t_output)
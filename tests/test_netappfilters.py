@@ -0,0 +1,39 @@
+# test_netappfilters
+#
+# tests of the NetApp filters of source objects:  on the retrieved objects
+# and on the source listing, which cannot exclude an object whose listing
+# does not carry its Custom Attributes.
+#
+######################################################################
+import  pytest
+from    krestenums import *
+from    netappfilters import *
+
+def createSrcObj(t_keyId, t_nodeId):
+    t_attribStr = "[[NAME x-NETAPP-KeyId] [[INDEX 0] [TYPE JAVA_STRING] [VALUE %s]]] " \
+                  "[[NAME x-NETAPP-NodeId] [[INDEX 0] [TYPE JAVA_STRING] [VALUE %s]]]" %(t_keyId, t_nodeId)
+    return {"uuid":"KEY-%s" %(t_keyId), GKLMAttributeType.CUSTOM_ATTRIBUTES.value:t_attribStr}
+
+SRC_OBJ = createSrcObj("00000002000005b6b927c7", "8d901e7e-741f-11eb")
+
+@pytest.mark.parametrize("t_filterDict, t_match", [
+    ({},                                                                True),
+    ({"x-NETAPP-KeyId":"05b6b9"},                                       True),
+    ({"x-NETAPP-KeyId":"05b6b9", "x-NETAPP-NodeId":"741f"},             True),
+    ({"x-NETAPP-KeyId":"05b6b9", "x-NETAPP-NodeId":"ffff"},             False),
+    ({"x-NETAPP-VserverId":"1"},                                        False),
+])
+def test_isSrcNetAppObjMatch(t_filterDict, t_match):
+    assert isSrcNetAppObjMatch(SRC_OBJ, t_filterDict) == t_match
+    assert isSrcNetAppListingMatch(SRC_OBJ, t_filterDict) == t_match
+
+def test_noCustomAttributes():
+    # a retrieved object without Custom Attributes never matches ...
+    assert not isSrcNetAppObjMatch({"uuid":"KEY-1"}, {"x-NETAPP-KeyId":"05"})
+    # ... but its listing cannot exclude it, so it is retrieved and filtered afterwards
+    assert isSrcNetAppListingMatch({"uuid":"KEY-1"}, {"x-NETAPP-KeyId":"05"})
+
+def test_filterSrcNetAppObjDataList():
+    t_srcObjList = [createSrcObj("0011", "node1"), {"uuid":"KEY-2"}, createSrcObj("0022", "node2"), createSrcObj("0033", "node1")]
+    assert [t_srcObj["uuid"] for t_srcObj in filterSrcNetAppObjDataList(t_srcObjList, {"x-NETAPP-NodeId":"node1"})] == \
+           ["KEY-0011", "KEY-0033"]
@@ -0,0 +1,80 @@
+# test_report
+#
+# tests of the run report (krestreport):  the JSONL and CSV records, the
+# counts per stage and status, and the quiet console.
+#
+######################################################################
+import  csv
+import  json
+import  pytest
+import  krestreport
+from    krestenums import *
+from    krestpipeline import printDstImportResult
+from    krestreport import *
+
+def recordAll(t_report):
+    t_report.record("source", "KEY-1", "k1", "SYMMETRIC_KEY", REPORT_STATUS_RETRIEVED)
+    t_report.record("import", "KEY-1", "k1", "SYMMETRIC_KEY", "imported")
+    t_report.record("import", "KEY-2", "k,2", "SECRET", "failed", 'status 500, "internal"')
+    t_report.record("import", "KEY-3", "k3", "SYMMETRIC_KEY", "imported")
+
+def test_jsonl(tmp_path):
+    t_fileName  = str(tmp_path / "report.jsonl")
+    t_report    = KRestReport(t_fileName, t_bufferSize=16)
+    recordAll(t_report)
+    t_report.close()
+
+    with open(t_fileName, encoding="utf-8") as t_file:
+        t_recordList = [json.loads(t_line) for t_line in t_file]
+    assert [list(t_record.keys()) for t_record in t_recordList] == [REPORT_FIELD_LIST] * 4
+    assert [(t_record[REPORT_STAGE], t_record[REPORT_NAME], t_record[REPORT_STATUS]) for t_record in t_recordList] == \
+           [("source", "k1", "retrieved"), ("import", "k1", "imported"), ("import", "k,2", "failed"), ("import", "k3", "imported")]
+    assert t_recordList[2][REPORT_DETAIL] == 'status 500, "internal"'
+
+def test_csv(tmp_path):
+    t_fileName  = str(tmp_path / "report.csv")
+    t_report    = KRestReport(t_fileName, reportFormatOption.CSV.value)
+    recordAll(t_report)
+    t_report.close()
+
+    with open(t_fileName, encoding="utf-8", newline="") as t_file:
+        t_rowList = list(csv.reader(t_file))
+    assert t_rowList[0] == REPORT_FIELD_LIST
+    assert [t_row[1:] for t_row in t_rowList[1:]] == [["source", "KEY-1", "k1", "SYMMETRIC_KEY", "retrieved", ""],
+                                                      ["import", "KEY-1", "k1", "SYMMETRIC_KEY", "imported", ""],
+                                                      ["import", "KEY-2", "k,2", "SECRET", "failed", 'status 500, "internal"'],
+                                                      ["import", "KEY-3", "k3", "SYMMETRIC_KEY", "imported", ""]]
+
+def test_counts(tmp_path):
+    t_report = KRestReport(str(tmp_path / "report.jsonl"))
+    recordAll(t_report)
+    assert t_report.getCountStr() == "source: 1 retrieved; import: 2 imported, 1 failed"
+
+    # records written after the report is closed are ignored
+    t_report.close()
+    t_report.record("import", "KEY-4", "k4", "SYMMETRIC_KEY", "imported")
+    t_report.close()
+    assert t_report.getCountStr() == "source: 1 retrieved; import: 2 imported, 1 failed"
+
+def test_reportObj(tmp_path, monkeypatch):
+    # without a report, the outcomes are not recorded
+    monkeypatch.setattr(krestreport, "_report", None)
+    reportObj("import", "KEY-1", "k1", "SYMMETRIC_KEY", "imported")
+    assert getReport() is None
+
+    t_report = configureReport(str(tmp_path / "report.jsonl"))
+    assert getReport() is t_report
+    reportObj("import", "KEY-1", "k1", "SYMMETRIC_KEY", "imported")
+    assert t_report.cntDict == {("import", "imported"):1}
+    t_report.close()
+
+def test_quiet(monkeypatch, capsys):
+    monkeypatch.setattr(krestreport, "_quiet", False)
+    t_xObj = {CMAttributeType.NAME.value:"k1"}
+    printDstImportResult(t_xObj, False, True)
+    assert "k1" in capsys.readouterr().out
+
+    setQuiet(True)
+    assert isQuiet()
+    printDstImportResult(t_xObj, False, True)
+    assert capsys.readouterr().out == ""
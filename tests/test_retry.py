@@ -0,0 +1,150 @@
+# test_retry
+#
+# tests of the retry policy (krestretry):  which failures are retried for
+# idempotent and non-idempotent requests, the backoff and the budget,
+# and the source reads that skip (rather than exit on) failed objects.
+#
+######################################################################
+import  pytest
+import  requests
+import  krestcmds
+from    conftest import runKRest
+from    krestcmds import *
+from    krestenums import *
+from    krestmetrics import METRICS_STATUS_EXCEPTION
+from    krestretry import *
+
+@pytest.mark.parametrize("t_method, t_status, t_idempotent, t_unsent, t_retryable", [
+    ("GET",     503,    None,   False,  True),
+    ("GET",     500,    None,   False,  True),
+    ("GET",     408,    None,   False,  True),
+    ("GET",     404,    None,   False,  False),
+    ("GET",     401,    None,   False,  False),
+    ("GET",     200,    None,   False,  False),
+    ("PUT",     502,    None,   False,  True),
+    ("GET",     METRICS_STATUS_EXCEPTION, None, False, True),
+    # imports:  only if not processed
+    ("POST",    500,    None,   False,  False),
+    ("POST",    504,    None,   False,  False),
+    ("POST",    429,    None,   False,  True),
+    ("POST",    503,    None,   False,  True),
+    ("POST",    METRICS_STATUS_EXCEPTION, None, False, False),
+    ("POST",    METRICS_STATUS_EXCEPTION, None, True,  True),
+    # CM exports and logins
+    ("POST",    500,    True,   False,  True),
+    ("POST",    METRICS_STATUS_EXCEPTION, True, False, True),
+    # GKLM key exports
+    ("POST",    502,    False,  False,  False),
+    ("POST",    503,    False,  False,  True),
+])
+def test_isRetryable(t_method, t_status, t_idempotent, t_unsent, t_retryable):
+    assert KRestRetryPolicy().isRetryable(t_method, t_status, t_idempotent, t_unsent) == t_retryable
+
+def test_backoff():
+    t_policy = KRestRetryPolicy(t_retries=10, t_budget=1000, t_baseDelay=0.5)
+    for t_attempt in range(10):
+        for t_idx in range(20):
+            t_delay = t_policy.getRetryDelay("GET", 503, t_attempt)
+            assert 0 <= t_delay <= min(MAX_RETRY_DELAY, 0.5 * 2 ** t_attempt)
+
+def test_retryAfter():
+    t_policy = KRestRetryPolicy(t_baseDelay=0.001)
+    assert t_policy.getRetryDelay("GET", 429, 0, t_retryAfter="2") >= 2
+    assert t_policy.getRetryDelay("GET", 429, 0, t_retryAfter="3600") == MAX_RETRY_DELAY
+    # an HTTP date is not used
+    assert t_policy.getRetryDelay("GET", 429, 0, t_retryAfter="Wed, 21 Oct 2015 07:28:00 GMT") <= 0.001
+
+def test_retriesPerRequest():
+    t_policy = KRestRetryPolicy(t_retries=2)
+    assert t_policy.getRetryDelay("GET", 503, 0) is not None
+    assert t_policy.getRetryDelay("GET", 503, 1) is not None
+    assert t_policy.getRetryDelay("GET", 503, 2) is None
+    assert (t_policy.retryCnt, t_policy.giveUpCnt) == (2, 1)
+
+def test_budget(capsys):
+    t_policy = KRestRetryPolicy(t_retries=4, t_budget=3)
+    assert [t_policy.getRetryDelay("GET", 503, 0) is not None for t_idx in range(5)] == [True, True, True, False, False]
+    assert capsys.readouterr().out.count("retry budget") == 1
+    assert t_policy.statusCntDict == {503:3}
+    assert "3 retries (503: 3)" in t_policy.getSummaryStr()
+
+def test_notRetryableIsNotCounted():
+    t_policy = KRestRetryPolicy(t_budget=1)
+    assert t_policy.getRetryDelay("POST", 500, 0) is None
+    assert t_policy.retryCnt == 0
+    assert t_policy.getRetryDelay("GET", 500, 0) is not None
+
+class FakeResponse:
+    def __init__(self, t_status, t_data):
+        self.status_code    = t_status
+        self.reason         = "reason"
+        self.text           = ""
+        self.data           = t_data
+
+    def json(self):
+        return self.data
+
+class FakeSession:
+    # Answers GET objects/{uuid} and POST keys/export/{alias} requests from t_responseDict
+    # (the last part of the URL -> response or exception)
+    def __init__(self, t_responseDict):
+        self.responseDict   = t_responseDict
+        self.idempotentList = []
+
+    def respond(self, t_url):
+        t_response = self.responseDict[t_url.rsplit("/", 1)[1]]
+        if isinstance(t_response, Exception):
+            raise t_response
+        return t_response
+
+    def get(self, t_url, **kwargs):
+        return self.respond(t_url)
+
+    def post(self, t_url, t_idempotent=None, **kwargs):
+        self.idempotentList.append(t_idempotent)
+        return self.respond(t_url)
+
+@pytest.fixture
+def fakeSession(monkeypatch):
+    def setResponses(t_responseDict):
+        t_session = FakeSession(t_responseDict)
+        monkeypatch.setattr(krestcmds, "getSession", lambda t_host, t_port: t_session)
+        return t_session
+
+    return setResponses
+
+def test_getSrcObjListFails(fakeSession):
+    fakeSession({"objects":FakeResponse(500, {})})
+    assert getSrcObjList("gklm", "443", "auth") is None
+
+    fakeSession({"objects":requests.exceptions.ConnectionError("down")})
+    assert getSrcObjList("gklm", "443", "auth") is None
+
+def test_getSrcObjDataSkips(fakeSession):
+    fakeSession({"KEY-1":FakeResponse(200, {MANAGED_OBJECT:{"uuid":"KEY-1"}}),
+                 "KEY-2":FakeResponse(503, {}),
+                 "KEY-3":requests.exceptions.ReadTimeout("slow"),
+                 "KEY-4":FakeResponse(200, {MANAGED_OBJECT:{"uuid":"KEY-4"}})})
+
+    t_dataList = getSrcObjData("gklm", "443", [{"uuid":"KEY-%s" %(t_idx)} for t_idx in range(1, 5)], "auth")
+    assert [t_data["uuid"] for t_data in t_dataList] == ["KEY-1", "KEY-4"]
+
+def test_getSrcKeyDataListSkips(fakeSession):
+    t_session = fakeSession({"k1":FakeResponse(200, {"alias":"k1"}),
+                             "k2":FakeResponse(500, {}),
+                             "k3":requests.exceptions.ConnectionError("reset"),
+                             "k4":FakeResponse(200, {"alias":"k4"})})
+
+    t_dataList = getSrcKeyDataList("gklm", "443", [{"alias":"k%s" %(t_idx)} for t_idx in range(1, 5)], "auth")
+    assert [t_data["alias"] for t_data in t_dataList] == ["k1", "k4"]
+
+    # each export writes a file on GKLM, so it is not retried as idempotent
+    assert t_session.idempotentList == [False] * 4
+
+def test_migrationWithErrors(mockServers):
+    # With 5% of the requests failing with 503, every object is still migrated
+    t_port      = mockServers("-clients", 3, "-keys", 30, "-secrets", 3, "-errorRate", 0.05)
+    t_output    = runKRest(t_port, "-includeSecrets", "-srcWorkers", 4, "-dstWorkers", 4)
+
+    assert "Number of Key Objects imported: 90 of 90" in t_output
+    assert "Number of Secret Objects imported: 9 of 9" in t_output
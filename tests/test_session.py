@@ -0,0 +1,43 @@
+# test_session
+#
+# tests of the shared sessions (krestsession):  one session per server,
+# kept (with its token managers and limiter) when it is configured again.
+#
+######################################################################
+import  requests
+from    urllib3.exceptions import NewConnectionError
+from    krestsession import *
+
+def getPoolMaxSize(t_session):
+    return t_session.session.adapters["https://"]._pool_maxsize
+
+def test_configureSessionTwice():
+    t_session = configureSession("same-server.test", "443", 4, 30)
+    t_session.addAuth("auth")
+    t_session.limiter = "limiter"
+
+    # e.g. source and destination on the same server
+    assert configureSession("same-server.test", "443", 8, 30) is t_session
+    assert (t_session.authList, t_session.limiter) == (["auth"], "limiter")
+    assert t_session.poolSize == 8 and getPoolMaxSize(t_session) == 8
+
+    # the pool is never made smaller
+    configureSession("same-server.test", "443", 2, 30)
+    assert t_session.poolSize == 8 and getPoolMaxSize(t_session) == 8
+
+def test_getSession():
+    t_session = configureSession("configured.test", 8443, 6, 10)
+
+    # the port may be given as a string or a number
+    assert getSession("configured.test", "8443") is t_session
+    assert (t_session.poolSize, t_session.timeout) == (6, 10)
+
+    t_default = getSession("unconfigured.test", "443")
+    assert (t_default.poolSize, t_default.timeout) == (DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT)
+    assert getSession("unconfigured.test", "443") is t_default
+
+def test_isUnsentError():
+    assert isUnsentError(requests.exceptions.ConnectTimeout())
+    assert isUnsentError(requests.exceptions.ConnectionError(type("Reason", (), {"reason":NewConnectionError(None, "refused")})()))
+    assert not isUnsentError(requests.exceptions.ConnectionError("connection reset"))
+    assert not isUnsentError(requests.exceptions.ReadTimeout())
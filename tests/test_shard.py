@@ -0,0 +1,121 @@
+# test_shard
+#
+# tests of the sharding of a migration (krestshard): the assignment of
+# objects to shards, the merge of the shard reports and, against the
+# mock servers, runs of every shard whose merged report covers the
+# whole source and destination.
+#
+######################################################################
+import  json
+import  uuid
+import  pytest
+from    conftest import runKRest
+from    krestenums import *
+from    krestreport import *
+from    krestshard import *
+
+def createReportFile(t_fileName, t_recordList, t_format=reportFormatOption.JSONL.value):
+    t_report = KRestReport(str(t_fileName), t_format)
+    for t_stage, t_uuid, t_name, t_status in t_recordList:
+        t_report.record(t_stage, t_uuid, t_name, "Symmetric Key", t_status)
+    t_report.close()
+
+    return str(t_fileName)
+
+def readReport(t_fileName):
+    return list(iterReportRecords(t_fileName))
+
+def test_parseShard():
+    t_shard = parseShard("2/4", shardKeyOption.CLIENT.value)
+    assert (t_shard.index, t_shard.count, t_shard.key) == (2, 4, shardKeyOption.CLIENT.value)
+    assert str(t_shard) == "2/4 (by CLIENT)"
+
+@pytest.mark.parametrize("t_shardStr", ["0/2", "3/2", "1/0", "a/2", "2", "1/2/3", ""])
+def test_parseShardInvalid(t_shardStr):
+    with pytest.raises(ValueError):
+        parseShard(t_shardStr)
+
+def test_everyObjectHasOneShard():
+    t_uuidList      = ["KEY-%s" %(uuid.UUID(int=t_idx)) for t_idx in range(2000)]
+    t_shardList     = [KRestShard(t_idx, 3) for t_idx in range(1, 4)]
+    t_ownerCntList  = [sum(t_shard.isObjOwned({GKLMAttributeType.UUID.value:t_uuid}) for t_shard in t_shardList) for t_uuid in t_uuidList]
+    assert set(t_ownerCntList) == {1}
+
+    # the objects are spread evenly
+    for t_shard in t_shardList:
+        assert 500 < sum(t_shard.isOwned(t_uuid) for t_uuid in t_uuidList) < 833
+
+def test_shardIsStable():
+    # the owner does not depend on the process (hash() would)
+    assert [KRestShard(t_idx, 4).isOwned("KEY-0") for t_idx in range(1, 5)] == [False, False, True, False]
+
+def test_shardKey():
+    t_uuidShard     = KRestShard(1, 2, shardKeyOption.UUID.value)
+    t_clientShard   = KRestShard(1, 2, shardKeyOption.CLIENT.value)
+    t_obj           = {GKLMAttributeType.UUID.value:"KEY-0"}
+
+    # sharded by UUID, every client is listed;  by CLIENT, every object of a listed client is retrieved
+    assert all(t_uuidShard.isClientOwned("CLIENT%s" %(t_idx)) for t_idx in range(10))
+    assert t_clientShard.isObjOwned(t_obj)
+    assert 0 < sum(t_clientShard.isClientOwned("CLIENT%s" %(t_idx)) for t_idx in range(10)) < 10
+
+@pytest.mark.parametrize("t_format", [reportFormatOption.JSONL.value, reportFormatOption.CSV.value])
+def test_mergeReports(tmp_path, t_format):
+    t_fileList  = [createReportFile(tmp_path / "s1", [(reportStage.SOURCE.value, "KEY-1", "k1", REPORT_STATUS_RETRIEVED),
+                                                      (reportStage.IMPORT.value, "KEY-1", "k1", journalStatus.IMPORTED.value)], t_format),
+                   createReportFile(tmp_path / "s2", [(reportStage.SOURCE.value, "KEY-2", "k2", REPORT_STATUS_RETRIEVED),
+                                                      (reportStage.IMPORT.value, "KEY-2", "k2", journalStatus.IMPORTED.value)], t_format)]
+
+    t_report, t_overlapCnt = mergeReports(t_fileList, str(tmp_path / "merged"), t_format)
+    assert t_overlapCnt == 0
+    assert t_report.cntDict == {(reportStage.SOURCE.value, REPORT_STATUS_RETRIEVED):2, (reportStage.IMPORT.value, journalStatus.IMPORTED.value):2}
+    assert [t_record[REPORT_UUID] for t_record in iterReportRecords(str(tmp_path / "merged"), t_format)] == ["KEY-1", "KEY-1", "KEY-2", "KEY-2"]
+
+def test_mergeReportsOverlap(tmp_path):
+    t_recordList    = [(reportStage.IMPORT.value, "KEY-1", "k1", journalStatus.IMPORTED.value)]
+    t_fileList      = [createReportFile(tmp_path / "s1", t_recordList), createReportFile(tmp_path / "s2", t_recordList)]
+
+    assert mergeReports(t_fileList, str(tmp_path / "merged"))[1] == 1
+
+@pytest.mark.parametrize("t_shardKey", [shardKeyOption.UUID.value, shardKeyOption.CLIENT.value])
+def test_shardsCoverMigration(mockServers, tmp_path, t_shardKey):
+    # The shards import every object exactly once, and each shard exports only its own objects
+    t_port          = mockServers("-clients", 4, "-keys", 6, "-secrets", 2)
+    t_shardCnt      = 3
+    t_fileList      = []
+    for t_idx in range(1, t_shardCnt + 1):
+        t_fileList.append(str(tmp_path / ("s%s.jsonl" %(t_idx))))
+        runKRest(t_port, "-includeSecrets", "-shard", "%s/%s" %(t_idx, t_shardCnt), "-shardKey", t_shardKey, "-report", t_fileList[-1])
+
+    t_report, t_overlapCnt = mergeReports(t_fileList, str(tmp_path / "merged.jsonl"))
+    assert t_overlapCnt == 0
+    assert t_report.cntDict == {(reportStage.SOURCE.value, REPORT_STATUS_RETRIEVED):32, (reportStage.IMPORT.value, journalStatus.IMPORTED.value):32,
+                                (reportStage.DESTINATION.value, REPORT_STATUS_LISTED):32}
+
+def test_shardsListOnly(mockServers, tmp_path):
+    # With -listOnly BOTH nothing is imported, but each shard still lists the destination objects
+    # of its source objects, and the merged report lists the whole destination once
+    t_port = mockServers("-clients", 3, "-keys", 6, "-secrets", 1)
+    runKRest(t_port, "-includeSecrets")
+
+    t_fileList = []
+    for t_idx in range(1, 3):
+        t_fileList.append(str(tmp_path / ("s%s.jsonl" %(t_idx))))
+        t_output = runKRest(t_port, "-includeSecrets", "-listOnly", listOnlyOption.BOTH.value, "-shard", "%s/2" %(t_idx), "-report", t_fileList[-1])
+        assert "Dst Objects of Shard %s/2 (by UUID): 0" %(t_idx) not in t_output
+
+    t_report, t_overlapCnt = mergeReports(t_fileList, str(tmp_path / "merged.jsonl"))
+    assert t_report.cntDict == {(reportStage.SOURCE.value, REPORT_STATUS_RETRIEVED):21, (reportStage.DESTINATION.value, REPORT_STATUS_LISTED):21}
+
+    t_srcNameList = [t_record[REPORT_NAME] for t_record in readReport(str(tmp_path / "merged.jsonl")) if t_record[REPORT_STAGE] == reportStage.SOURCE.value]
+    t_dstNameList = [t_record[REPORT_NAME] for t_record in readReport(str(tmp_path / "merged.jsonl")) if t_record[REPORT_STAGE] == reportStage.DESTINATION.value]
+    assert sorted(t_srcNameList) == sorted(t_dstNameList)
+
+def test_shardsResume(mockServers, tmp_path):
+    # Objects skipped by -resume (already imported) are still exported by their shard
+    t_port = mockServers("-clients", 2, "-keys", 5, "-secrets", 0)
+    runKRest(t_port, "-shard", "1/2", "-journal", str(tmp_path / "j1.jsonl"))
+
+    t_output = runKRest(t_port, "-shard", "1/2", "-journal", str(tmp_path / "j1.jsonl"), "-resume", "-report", str(tmp_path / "s1.jsonl"))
+    t_importCnt = len([t_line for t_line in open(tmp_path / "j1.jsonl") if len(t_line.strip()) > 0])
+    assert "Dst Objects of Shard 1/2 (by UUID): %s" %(t_importCnt) in t_output
@@ -0,0 +1,185 @@
+# test_workers
+#
+# tests of the worker pools (krestworkers) and of the REST Commands that
+# use them:  results keep the order of the items, and an item that fails
+# is reported on its own without affecting the other items.
+#
+######################################################################
+import  random
+import  threading
+import  time
+import  pytest
+import  requests
+import  krestcmds
+import  krestpipeline
+from    krestcmds import *
+from    krestpipeline import *
+from    krestworkers import *
+
+def sleepAndDouble(t_item):
+    # items complete in a different order than they were submitted
+    time.sleep(random.Random(t_item).random() * 0.01)
+    return t_item * 2
+
+@pytest.mark.parametrize("t_workers", [1, 4, 50])
+def test_runConcurrentlyOrder(t_workers):
+    assert runConcurrently(sleepAndDouble, list(range(40)), t_workers) == [t_item * 2 for t_item in range(40)]
+    assert runConcurrently(sleepAndDouble, [], t_workers) == []
+
+def test_runConcurrentlyWorkers():
+    t_lock          = threading.Lock()
+    t_runningList   = [0, 0]    # running, most running at once
+    t_threadSet     = set()
+
+    def run(t_item):
+        with t_lock:
+            t_runningList[0] = t_runningList[0] + 1
+            t_runningList[1] = max(t_runningList[1], t_runningList[0])
+            t_threadSet.add(threading.get_ident())
+        time.sleep(0.01)
+        with t_lock:
+            t_runningList[0] = t_runningList[0] - 1
+
+    runConcurrently(run, list(range(20)), 3)
+    assert t_runningList[1] == 3
+
+    # one worker processes the items in the calling thread
+    t_threadSet.clear()
+    runConcurrently(run, list(range(5)), 1)
+    assert t_threadSet == {threading.get_ident()}
+
+@pytest.mark.parametrize("t_workers", [1, 4])
+def test_iterConcurrentlyOrder(t_workers):
+    assert list(iterConcurrently(sleepAndDouble, iter(range(40)), t_workers)) == [t_item * 2 for t_item in range(40)]
+
+def test_iterConcurrentlyBounded():
+    # no more than 2 x workers items are taken from the iterator ahead of the results
+    t_takenList = []
+
+    def iterItems():
+        for t_item in range(100):
+            t_takenList.append(t_item)
+            yield t_item
+
+    for t_idx, t_result in enumerate(iterConcurrently(sleepAndDouble, iterItems(), 3)):
+        assert t_result == t_idx * 2
+        assert len(t_takenList) <= t_idx + 1 + 2 * 3
+
+def test_iterConcurrentlyStopped():
+    # items not yet started are cancelled when the caller stops consuming the results
+    t_calledList = []
+
+    def call(t_item):
+        t_calledList.append(t_item)
+        time.sleep(0.01)
+        return t_item
+
+    t_resultIter = iterConcurrently(call, iter(range(1000)), 2)
+    assert [next(t_resultIter) for t_idx in range(3)] == [0, 1, 2]
+    t_resultIter.close()
+
+    assert len(t_calledList) < 20
+
+def test_runConcurrentlyRaises():
+    def failOdd(t_item):
+        if t_item % 2 == 1:
+            raise ValueError(t_item)
+        return t_item
+
+    # the pool raises the exception of an item to the caller, so each caller
+    # reports the errors of its items itself (see the tests below)
+    with pytest.raises(ValueError):
+        runConcurrently(failOdd, list(range(10)), 4)
+
+def createSrcObjList(t_cnt):
+    return [{GKLMAttributeType.UUID.value:"KEY-%s" %(t_idx)} for t_idx in range(t_cnt)]
+
+@pytest.mark.parametrize("t_workers", [1, 4])
+def test_getSrcObjDetailList(monkeypatch, t_workers):
+    def getSrcObjDetail(t_srcHost, t_srcPort, t_srcAuthStr, t_srcObjID, t_callerName):
+        time.sleep(random.Random(t_srcObjID).random() * 0.01)
+        return {GKLMAttributeType.UUID.value:t_srcObjID}
+
+    monkeypatch.setattr(krestcmds, "getSrcObjDetail", getSrcObjDetail)
+
+    t_dataList = getSrcObjDetailList("gklm", "443", "Bearer token", createSrcObjList(20), "", "CLIENT0", "test", t_workers)
+    assert [t_data[GKLMAttributeType.UUID.value] for t_data in t_dataList] == ["KEY-%s" %(t_idx) for t_idx in range(20)]
+    assert all(t_data[GKLMAttributeType.CLIENT_NAME.value] == "CLIENT0" for t_data in t_dataList)
+
+    # only the objects that match the -srcuuid filter are kept
+    t_dataList = getSrcObjDetailList("gklm", "443", "Bearer token", createSrcObjList(20), "KEY-1", "CLIENT0", "test", t_workers)
+    assert [t_data[GKLMAttributeType.UUID.value] for t_data in t_dataList] == ["KEY-1"] + ["KEY-%s" %(t_idx) for t_idx in range(10, 20)]
+
+@pytest.mark.parametrize("t_workers", [1, 4])
+def test_getSrcObjDetailListFailure(monkeypatch, capsys, t_workers):
+    # An object that cannot be read is reported and skipped without affecting the objects that follow it
+    def getSrcObjDetail(t_srcHost, t_srcPort, t_srcAuthStr, t_srcObjID, t_callerName):
+        time.sleep(random.Random(t_srcObjID).random() * 0.01)
+        if t_srcObjID == "KEY-5":
+            return None
+        return {GKLMAttributeType.UUID.value:t_srcObjID}
+
+    monkeypatch.setattr(krestcmds, "getSrcObjDetail", getSrcObjDetail)
+
+    t_dataList = getSrcObjDetailList("gklm", "443", "Bearer token", createSrcObjList(20), "", "CLIENT0", "test", t_workers)
+    assert [t_data[GKLMAttributeType.UUID.value] for t_data in t_dataList] == ["KEY-%s" %(t_idx) for t_idx in range(20) if t_idx != 5]
+    assert "WARNING: 1 of 20 objects of CLIENT0 could not be retrieved and were skipped." in capsys.readouterr().out
+
+class FakeAuth:
+    def getAuthStr(self):
+        return "Bearer token"
+
+def test_importDstObjList(monkeypatch):
+    # A failed import (or one that raises) is reported for its object only
+    def importObj(t_dstHost, t_dstPort, t_dstUser, t_dstAuthStr, t_xObj):
+        time.sleep(random.Random(t_xObj["name"]).random() * 0.01)
+        if t_xObj["name"] == "k3":
+            raise requests.exceptions.ConnectionError("reset")
+        return t_xObj["name"] != "k5"
+
+    monkeypatch.setattr(krestpipeline, "importDstDataKeyObject", importObj)
+
+    t_xObjList      = [{"name":"k%s" %(t_idx)} for t_idx in range(8)]
+    t_resultList    = []
+    t_successList   = importDstObjList("cm", "443", "user", FakeAuth(), t_xObjList, False, t_workers=4,
+                                       t_srcUUIDList=["KEY-%s" %(t_idx) for t_idx in range(8)],
+                                       t_resultFn=lambda t_srcUUID, t_xObj, t_success: t_resultList.append((t_srcUUID, t_xObj["name"], t_success)))
+
+    assert t_successList == [True, True, True, False, True, False, True, True]
+    assert t_resultList == [("KEY-%s" %(t_idx), "k%s" %(t_idx), t_success) for t_idx, t_success in enumerate(t_successList)]
+
+class FakeResponse:
+    def __init__(self, t_status, t_data):
+        self.status_code    = t_status
+        self.reason         = "reason"
+        self.text           = ""
+        self.data           = t_data
+
+    def json(self):
+        return self.data
+
+class FakeExportSession:
+    # Answers POST vault/keys2/{id}/export requests, except for the ids of t_failDict
+    def __init__(self, t_failDict):
+        self.failDict = t_failDict
+
+    def post(self, t_url, **kwargs):
+        t_id = t_url.split("/")[-2]
+        time.sleep(random.Random(t_id).random() * 0.01)
+        t_failure = self.failDict.get(t_id)
+        if isinstance(t_failure, Exception):
+            raise t_failure
+        if t_failure is not None:
+            return FakeResponse(t_failure, {})
+        return FakeResponse(200, {"id":t_id, "material":"00"})
+
+def test_exportDstObjData(monkeypatch):
+    t_session = FakeExportSession({"id3":500, "id6":requests.exceptions.ReadTimeout("slow")})
+    monkeypatch.setattr(krestcmds, "getSession", lambda t_host, t_port: t_session)
+    monkeypatch.setattr(krestcmds, "getDstAuth", lambda t_host, t_port, t_user, t_pass: FakeAuth())
+
+    t_dstObjList = [{"id":"id%s" %(t_idx), "unexportable":t_idx == 1} for t_idx in range(10)]
+    t_dataList   = exportDstObjData("cm", "443", t_dstObjList, "user", "pass", 4)
+
+    # unexportable and failed objects are left out, the others keep their order
+    assert [t_data["id"] for t_data in t_dataList] == ["id0", "id2", "id4", "id5", "id7", "id8", "id9"]